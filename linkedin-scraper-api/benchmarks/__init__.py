@@ -0,0 +1,8 @@
+"""
+Offline benchmark suite: runs the full scrape pipelines against saved
+LinkedIn pages served by a local fixture server.
+
+Usage (from the linkedin-scraper-api directory):
+    python -m benchmarks.run --type profile --concurrency 2 --iterations 20
+    python -m benchmarks.compare benchmarks/results/old.json benchmarks/results/new.json
+"""
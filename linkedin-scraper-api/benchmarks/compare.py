@@ -0,0 +1,80 @@
+"""
+Compare two benchmark result files and flag regressions.
+
+Exits with status 1 when a metric got worse by more than --threshold
+(relative), so it can gate a CI job.
+
+Usage: python -m benchmarks.compare BASELINE.json CANDIDATE.json [--threshold 0.1]
+"""
+
+import argparse
+import json
+import sys
+
+# (label, path into a per-type result, True when higher is better)
+METRICS = [
+    ("latency p50 ms", ("latency_ms", "p50"), False),
+    ("latency p95 ms", ("latency_ms", "p95"), False),
+    ("latency p99 ms", ("latency_ms", "p99"), False),
+    ("throughput/min", ("throughput_per_minute",), True),
+    ("error rate", ("error_rate",), False),
+    ("chrome CPU s", ("chrome", "cpu_seconds_per_instance"), False),
+    ("chrome RSS MB", ("chrome", "rss_mb_mean_per_instance"), False),
+    ("chrome peak MB", ("chrome", "rss_mb_peak_per_instance"), False),
+]
+
+
+def _get(result, path):
+    for key in path:
+        if not isinstance(result, dict):
+            return None
+        result = result.get(key)
+    return result
+
+
+def compare(baseline, candidate, threshold=0.1):
+    """Rows of (type, metric, old, new, relative change, regressed)"""
+    rows = []
+    for scrape_type, old_result in baseline["results"].items():
+        new_result = candidate["results"].get(scrape_type)
+        if new_result is None:
+            continue
+        for label, path, higher_is_better in METRICS:
+            old, new = _get(old_result, path), _get(new_result, path)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old if old else (0.0 if new == old else float("inf"))
+            worse = -change if higher_is_better else change
+            rows.append((scrape_type, label, old, new, change, worse > threshold))
+    return rows
+
+
+def compare_files(baseline_path, candidate_path, threshold=0.1):
+    """Print the comparison of two result files, returns True on any regression"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(candidate_path, encoding="utf-8") as f:
+        candidate = json.load(f)
+
+    print(f"\nBaseline  {baseline_path} ({baseline.get('git_revision') or '?'}, {baseline['timestamp']})")
+    print(f"Candidate {candidate_path} ({candidate.get('git_revision') or '?'}, {candidate['timestamp']})")
+    if baseline.get("config") != candidate.get("config"):
+        print("Note: the runs used different settings, compare with care")
+    rows = compare(baseline, candidate, threshold)
+    for scrape_type, label, old, new, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"  {scrape_type:<8} {label:<15} {old:>10} -> {new:>10}  {change:+.1%}{flag}")
+    return any(row[-1] for row in rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.1, help="relative change counted as a regression")
+    args = parser.parse_args()
+    return 1 if compare_files(args.baseline, args.candidate, args.threshold) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+import http.server
+import os
+import threading
+import time
+
+# Bundled synthetic pages; saved pages (e.g. test/htmls) can be used instead
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+NOT_FOUND_PAGE = b"<!DOCTYPE html><html><body><h1>Page not found</h1></body></html>"
+
+
+def load_corpus(corpus_dir):
+    """{"profile": {id: path}, "company": {id: path}} for a corpus directory.
+
+    Profiles are read from `profiles/` and companies from `companies/`; a
+    directory without those subdirectories (like test/htmls) is treated as a
+    flat directory of profile pages. Each page is served under its file name.
+    """
+    def pages(directory):
+        if not os.path.isdir(directory):
+            return {}
+        return {
+            filename[:-len(".html")]: os.path.join(directory, filename)
+            for filename in sorted(os.listdir(directory))
+            if filename.endswith(".html")
+        }
+
+    profiles_dir = os.path.join(corpus_dir, "profiles")
+    companies_dir = os.path.join(corpus_dir, "companies")
+    if not os.path.isdir(profiles_dir) and not os.path.isdir(companies_dir):
+        return {"profile": pages(corpus_dir), "company": {}}
+    return {"profile": pages(profiles_dir), "company": pages(companies_dir)}
+
+
+class FixtureServer(http.server.ThreadingHTTPServer):
+    """Serves a corpus under LinkedIn's URL layout (/in/<id>/, /company/<id>/).
+
+    `latency` seconds are added to every page response to approximate a
+    network round-trip. Unknown ids get a "Page not found" page, like LinkedIn.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, corpus_dir=DEFAULT_CORPUS, latency=0.0):
+        super().__init__(("127.0.0.1", 0), FixtureHandler)
+        self.corpus = load_corpus(corpus_dir)
+        self.latency = latency
+        self._pages = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+
+    @property
+    def base_url(self):
+        # "localhost" rather than the IP, so the session cookie can be scoped to it
+        return f"http://localhost:{self.server_address[1]}"
+
+    def page(self, scrape_type, linkedin_id):
+        path = self.corpus[scrape_type].get(linkedin_id)
+        if path is None:
+            return None
+        with self._lock:
+            if path not in self._pages:
+                with open(path, "rb") as f:
+                    self._pages[path] = f.read()
+            return self._pages[path]
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class FixtureHandler(http.server.BaseHTTPRequestHandler):
+    ROUTES = {"in": "profile", "company": "company"}
+
+    def do_GET(self):
+        with self.server._lock:
+            self.server.requests += 1
+        parts = [part for part in self.path.split("?")[0].split("/") if part]
+        if len(parts) == 2 and parts[0] in self.ROUTES:
+            time.sleep(self.server.latency)
+            body = self.server.page(self.ROUTES[parts[0]], parts[1])
+            self._send(200 if body else 404, "text/html; charset=utf-8", body or NOT_FOUND_PAGE)
+        elif parts[:1] == ["static"]:
+            # Images are normally blocked by the scraper; answer cheaply if they are not
+            self._send(200, "image/jpeg", b"\xff\xd8\xff\xd9")
+        else:
+            self._send(200, "text/html; charset=utf-8", b"<!DOCTYPE html><html><body></body></html>")
+
+    def _send(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
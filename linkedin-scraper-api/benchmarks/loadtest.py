@@ -0,0 +1,266 @@
+"""
+Load-test the FastAPI service with the fake scraper backend (SCRAPER_BACKEND=fake),
+so capacity can be planned without Chrome or LinkedIn quota.
+
+For every uvicorn worker count a server is started with the fake backend,
+then POST /scrape is driven at every concurrency level:
+  closed: N clients each send their next request as soon as the last returns
+  burst:  N requests at once every --burst-interval seconds, like a batch
+          submitted by the frontend
+Throughput and latency percentiles per level (the throughput/latency curves)
+are printed and written as JSON; the executor queue depth is sampled from
+/health during each level.
+
+Usage: python -m benchmarks.loadtest [--workers 1,2] [--concurrency 1,2,4,8,16]
+                                     [--duration 30] [--pattern closed|burst]
+                                     [--latency 2] [--jitter 0.4] [--error-rate 0.02]
+                                     [--hot-ratio 0.2] [--slo-ms 10000] [--url URL]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+
+from benchmarks.run import RESULTS_DIR, git_revision, percentiles
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Ids reused by --hot-ratio of the requests, to exercise the cache and coalescing
+HOT_IDS = [f"hot-{i}" for i in range(10)]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def server_env(args, jobs_db):
+    env = dict(os.environ)
+    env.update({
+        "SCRAPER_BACKEND": "fake",
+        "FAKE_SCRAPER_LATENCY": str(args.latency),
+        "FAKE_SCRAPER_JITTER": str(args.jitter),
+        "FAKE_SCRAPER_ERROR_RATE": str(args.error_rate),
+        "FAKE_SCRAPER_NOT_FOUND_RATE": str(args.not_found_rate),
+        "FAKE_SCRAPER_THROTTLE_RATE": str(args.throttle_rate),
+        "LOG_LEVEL": "warning" if args.server_logs else "critical",
+        "RELOAD": "false",
+        "JOBS_DB_PATH": jobs_db,
+        "SELECTOR_STATS_PATH": "",
+    })
+    if not args.keep_rate_limits:
+        env["RATE_LIMIT_PER_MINUTE"] = str(10**6)
+        env["RATE_LIMIT_BURST"] = str(10**6)
+    return env
+
+
+def start_server(workers, args, jobs_db):
+    """Start uvicorn with the fake backend, returns (process, base url)"""
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=SERVICE_DIR, env=server_env(args, jobs_db),
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server with {workers} workers exited with {process.returncode}")
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return process, base_url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    process.terminate()
+    raise RuntimeError(f"Server with {workers} workers did not become healthy")
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def next_payload(args):
+    if random.random() < args.hot_ratio:
+        linkedin_id = random.choice(HOT_IDS)
+    else:
+        linkedin_id = f"load-{uuid.uuid4().hex[:12]}"
+    path = "in" if args.type == "profile" else "company"
+    return {"url": f"https://www.linkedin.com/{path}/{linkedin_id}/", "type": args.type}
+
+
+async def send(client, args, samples):
+    start = time.perf_counter()
+    try:
+        response = await client.post("/scrape", json=next_payload(args))
+        status = response.status_code
+        cache = response.headers.get("X-Cache")
+    except httpx.TimeoutException:
+        status, cache = "timeout", None
+    except httpx.HTTPError as e:
+        status, cache = type(e).__name__, None
+    samples.append((time.perf_counter() - start, status, cache))
+
+
+async def closed_loop(client, args, concurrency, samples):
+    end = time.monotonic() + args.duration
+
+    async def user():
+        while time.monotonic() < end:
+            await send(client, args, samples)
+
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+
+
+async def bursts(client, args, concurrency, samples):
+    end = time.monotonic() + args.duration
+    tasks = []
+    while time.monotonic() < end:
+        tasks += [asyncio.create_task(send(client, args, samples)) for _ in range(concurrency)]
+        await asyncio.sleep(args.burst_interval)
+    await asyncio.gather(*tasks)
+
+
+async def watch_health(client, peaks, stop):
+    """Record the deepest executor queue /health reported during a level"""
+    while not stop.is_set():
+        try:
+            executor = (await client.get("/health")).json()["scrape_executor"]
+            peaks["queued"] = max(peaks["queued"], executor["queued"])
+            peaks["running"] = max(peaks["running"], executor["running"])
+        except Exception:
+            pass
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=1)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_level(base_url, args, concurrency):
+    samples = []
+    peaks = {"queued": 0, "running": 0}
+    limits = httpx.Limits(max_connections=concurrency * 4 + 10)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        stop = asyncio.Event()
+        watcher = asyncio.create_task(watch_health(client, peaks, stop))
+        start = time.perf_counter()
+        if args.pattern == "burst":
+            await bursts(client, args, concurrency, samples)
+        else:
+            await closed_loop(client, args, concurrency, samples)
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await watcher
+
+    statuses = {}
+    for _, status, _ in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    ok = [seconds for seconds, status, _ in samples if status == 200]
+    return {
+        "concurrency": concurrency,
+        "requests": len(samples),
+        "statuses": statuses,
+        "error_rate": round(1 - len(ok) / len(samples), 4) if samples else 0.0,
+        "cache_hits": sum(1 for _, _, cache in samples if cache in ("HIT", "STALE")),
+        "throughput_per_second": round(len(ok) / elapsed, 3) if elapsed else 0.0,
+        "latency_ms": percentiles([seconds for seconds, _, _ in samples]),
+        "ok_latency_ms": percentiles(ok),
+        "peak_executor_queue": peaks["queued"],
+        "peak_executor_running": peaks["running"],
+    }
+
+
+def capacity(levels, slo_ms):
+    """Highest concurrency whose p95 stays within the SLO"""
+    within = [level["concurrency"] for level in levels
+              if level["latency_ms"] and level["latency_ms"]["p95"] <= slo_ms]
+    return max(within) if within else None
+
+
+def print_levels(label, levels):
+    print(f"\n{label}")
+    print(f"  {'conc':>5} {'req':>6} {'ok/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'err':>6} {'queue':>6}")
+    for level in levels:
+        latency = level["latency_ms"] or {}
+        print(f"  {level['concurrency']:>5} {level['requests']:>6} {level['throughput_per_second']:>8} "
+              f"{latency.get('p50', '-'):>9} {latency.get('p95', '-'):>9} {latency.get('p99', '-'):>9} "
+              f"{level['error_rate']:>6.1%} {level['peak_executor_queue']:>6}")
+
+
+def int_list(value):
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int_list, default=[1], help="uvicorn worker counts, e.g. 1,2,4")
+    parser.add_argument("--concurrency", type=int_list, default=[1, 2, 4, 8, 16], help="concurrency levels")
+    parser.add_argument("--duration", type=float, default=30, help="seconds per level")
+    parser.add_argument("--pattern", choices=["closed", "burst"], default="closed")
+    parser.add_argument("--burst-interval", type=float, default=5, help="seconds between bursts")
+    parser.add_argument("--type", choices=["profile", "company"], default="profile")
+    parser.add_argument("--hot-ratio", type=float, default=0.0, help="share of requests for 10 repeated ids")
+    parser.add_argument("--latency", type=float, default=2.0, help="median fake scrape seconds")
+    parser.add_argument("--jitter", type=float, default=0.4, help="lognormal sigma of the fake scrape time")
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    parser.add_argument("--not-found-rate", type=float, default=0.03)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--keep-rate-limits", action="store_true", help="keep RATE_LIMIT_PER_MINUTE/BURST")
+    parser.add_argument("--timeout", type=float, default=300, help="client timeout per request")
+    parser.add_argument("--slo-ms", type=float, help="report the highest concurrency with p95 within this")
+    parser.add_argument("--url", help="test an already running server instead of starting one")
+    parser.add_argument("--server-logs", action="store_true", help="show the server's warnings and errors")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/loadtest-<timestamp>.json)")
+    args = parser.parse_args()
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "runs": [],
+    }
+    targets = [("external", args.url)] if args.url else [(workers, None) for workers in args.workers]
+    for workers, url in targets:
+        process = None
+        with tempfile.TemporaryDirectory() as tmp:
+            if url is None:
+                process, url = start_server(workers, args, os.path.join(tmp, "jobs.db"))
+            try:
+                levels = [asyncio.run(run_level(url, args, concurrency)) for concurrency in args.concurrency]
+            finally:
+                if process is not None:
+                    stop_server(process)
+        run = {"workers": workers, "levels": levels}
+        if args.slo_ms:
+            run["capacity_at_slo"] = capacity(levels, args.slo_ms)
+        report["runs"].append(run)
+        print_levels(f"workers={workers} pattern={args.pattern}", levels)
+        if args.slo_ms:
+            print(f"  highest concurrency with p95 <= {args.slo_ms:g} ms: {run['capacity_at_slo']}")
+
+    output = args.output or os.path.join(RESULTS_DIR, "loadtest-" + datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+import os
+import threading
+
+try:
+    import psutil
+except ImportError:  # optional: CPU/RSS figures are skipped without it
+    psutil = None
+
+
+class ChromeSampler:
+    """Samples CPU time and RSS of every Chrome instance started by this process.
+
+    Each chromedriver child process and its descendants (Chrome browser,
+    renderer and GPU processes) count as one instance; with the CDP engine
+    the Chrome child itself is the instance, tabs included. CPU time is summed per
+    process over the run, so renderers that exit mid-run are still counted.
+    """
+
+    def __init__(self, interval=0.5):
+        self.interval = interval
+        self.available = psutil is not None
+        self._stop = threading.Event()
+        self._thread = None
+        self._cpu_start = {}   # pid -> cpu seconds when first seen
+        self._cpu_last = {}    # pid -> cpu seconds at the last sample
+        self._instance_of = {}  # pid -> chromedriver pid
+        self._rss = {}         # chromedriver pid -> [rss bytes per sample]
+
+    @staticmethod
+    def _cpu_seconds(process):
+        times = process.cpu_times()
+        return times.user + times.system
+
+    def _instances(self):
+        for child in psutil.Process(os.getpid()).children():
+            try:
+                name = child.name().lower()
+                # "chromedriver", or Chrome itself with the CDP engine
+                if "chrome" in name or "chromium" in name:
+                    yield child
+            except psutil.Error:
+                continue
+
+    def sample(self, baseline=False):
+        for driver_process in self._instances():
+            rss = 0
+            try:
+                tree = [driver_process] + driver_process.children(recursive=True)
+            except psutil.Error:
+                continue
+            for process in tree:
+                try:
+                    cpu = self._cpu_seconds(process)
+                    rss += process.memory_info().rss
+                except psutil.Error:
+                    continue
+                if process.pid not in self._cpu_start:
+                    # Processes started during the run count from zero
+                    self._cpu_start[process.pid] = cpu if baseline else 0.0
+                self._cpu_last[process.pid] = cpu
+                self._instance_of[process.pid] = driver_process.pid
+            self._rss.setdefault(driver_process.pid, []).append(rss)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def start(self):
+        if not self.available:
+            return self
+        self.sample(baseline=True)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop sampling and return the per-instance report (None without psutil)"""
+        if not self.available:
+            return None
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.sample()
+
+        instances = []
+        for driver_pid, samples in self._rss.items():
+            cpu = sum(
+                self._cpu_last[pid] - self._cpu_start[pid]
+                for pid, instance in self._instance_of.items() if instance == driver_pid
+            )
+            instances.append({
+                "cpu_seconds": round(cpu, 3),
+                "rss_mb_mean": round(sum(samples) / len(samples) / 2**20, 1),
+                "rss_mb_peak": round(max(samples) / 2**20, 1),
+            })
+        if not instances:
+            return {"instances": 0}
+        count = len(instances)
+        return {
+            "instances": count,
+            "cpu_seconds_per_instance": round(sum(i["cpu_seconds"] for i in instances) / count, 3),
+            "rss_mb_mean_per_instance": round(sum(i["rss_mb_mean"] for i in instances) / count, 1),
+            "rss_mb_peak_per_instance": round(max(i["rss_mb_peak"] for i in instances), 1),
+            "per_instance": instances,
+        }
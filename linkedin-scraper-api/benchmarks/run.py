@@ -0,0 +1,222 @@
+"""
+Run the full scrape_linkedin_profile / scrape_linkedin_company pipelines
+against a local fixture server and report latency percentiles, throughput
+and per-Chrome CPU/RSS (the latter needs psutil).
+
+Every setting of config.py can be changed through the environment as usual,
+e.g. EXTRACTION_MODE=lxml, PAGE_LOAD_STRATEGY=normal or COMPANY_BACKEND=http.
+Rate limits, the selector stats file and the accounts file are disabled for
+the run, and the throttle is pinned to --concurrency.
+
+Usage: python -m benchmarks.run [--type profile] [--concurrency 2] [--iterations 20]
+                                [--corpus DIR] [--latency 0.05] [--fields name,headline,avatar]
+                                [--output FILE] [--compare BASELINE.json]
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import partial
+
+from benchmarks.fixture_server import FixtureServer, DEFAULT_CORPUS
+from benchmarks.resources import ChromeSampler
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def configure(base_url, concurrency):
+    """Point the scraper at the fixture server; must run before any services import"""
+    # The fixture server does not care about the token, but config.py requires one
+    os.environ.setdefault("LINKEDIN_ACCESS_TOKEN", "benchmark")
+    os.environ.setdefault("LINKEDIN_ACCESS_TOKEN_EXP", str(int(time.time()) + 86400))
+    from config import settings
+    settings.LINKEDIN_BASE_URL = base_url
+    settings.LINKEDIN_ACCOUNTS_FILE = ""
+    settings.SCRAPER_MAX_WORKERS = concurrency
+    settings.DRIVER_POOL_SIZE = concurrency
+    settings.THROTTLE_MIN_CONCURRENCY = concurrency
+    settings.THROTTLE_MAX_CONCURRENCY = concurrency
+    settings.RATE_LIMIT_PER_MINUTE = 10**6
+    settings.RATE_LIMIT_BURST = 10**6
+    settings.SELECTOR_STATS_PATH = ""
+    return settings
+
+
+def percentiles(values):
+    """p50/p95/p99, mean and max of a list of seconds, in milliseconds"""
+    if not values:
+        return None
+    if len(values) == 1:
+        cuts = values * 99
+    else:
+        cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {
+        "p50": round(cuts[49] * 1000, 1),
+        "p95": round(cuts[94] * 1000, 1),
+        "p99": round(cuts[98] * 1000, 1),
+        "mean": round(statistics.fmean(values) * 1000, 1),
+        "max": round(max(values) * 1000, 1),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_scrapes(scrape, ids, iterations, concurrency):
+    """Run `iterations` scrapes round-robin over `ids`, returns (samples, wall seconds)"""
+    def timed(linkedin_id):
+        start = time.perf_counter()
+        result = scrape(linkedin_id)
+        return time.perf_counter() - start, result
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="bench") as executor:
+        samples = list(executor.map(timed, [ids[i % len(ids)] for i in range(iterations)]))
+    return samples, time.perf_counter() - start
+
+
+def summarize(samples, wall_seconds, chrome):
+    durations = [seconds for seconds, _ in samples]
+    errors = {}
+    phases = {}
+    for _, result in samples:
+        if "error" in result:
+            errors[result["error"]] = errors.get(result["error"], 0) + 1
+            continue
+        for phase, seconds in (result.get("timings") or {}).items():
+            phases.setdefault(phase, []).append(seconds)
+    return {
+        "scrapes": len(samples),
+        "errors": sum(errors.values()),
+        "error_rate": round(sum(errors.values()) / len(samples), 4) if samples else 0.0,
+        "error_messages": errors,
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_per_minute": round(len(samples) / wall_seconds * 60, 2) if wall_seconds else 0.0,
+        "latency_ms": percentiles(durations),
+        "phases_ms": {phase: percentiles(values) for phase, values in sorted(phases.items())},
+        "chrome": chrome,
+    }
+
+
+def print_summary(scrape_type, summary):
+    latency = summary["latency_ms"] or {}
+    print(f"\n{scrape_type}: {summary['scrapes']} scrapes, {summary['errors']} errors, "
+          f"{summary['throughput_per_minute']} scrapes/min")
+    print(f"  latency ms  p50 {latency.get('p50')}  p95 {latency.get('p95')}  p99 {latency.get('p99')}")
+    for phase, values in summary["phases_ms"].items():
+        print(f"  {phase:<16} p50 {values['p50']:>9}  p95 {values['p95']:>9}")
+    chrome = summary["chrome"]
+    if chrome is None:
+        print("  chrome: install psutil for CPU/RSS figures")
+    elif chrome["instances"]:
+        print(f"  chrome: {chrome['instances']} instances, {chrome['cpu_seconds_per_instance']} CPU s, "
+              f"{chrome['rss_mb_mean_per_instance']} MB mean / {chrome['rss_mb_peak_per_instance']} MB peak RSS each")
+    for message, count in summary["error_messages"].items():
+        print(f"  error x{count}: {message}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--type", choices=["profile", "company", "all"], default="all")
+    parser.add_argument("--concurrency", type=int, default=2, help="scrapes (and Chrome instances) running at once")
+    parser.add_argument("--iterations", type=int, default=20, help="measured scrapes per type")
+    parser.add_argument("--warmup", type=int, default=0, help="unmeasured scrapes per type before the run")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="directory of saved pages (profiles/, companies/)")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every page response")
+    parser.add_argument("--fields", help="comma-separated profile fields to scrape, like the fields of /scrape")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against an earlier result file")
+    parser.add_argument("--verbose", action="store_true", help="show the scraper's own log lines")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    server = FixtureServer(args.corpus, latency=args.latency).start()
+    settings = configure(server.base_url, args.concurrency)
+
+    from services.account_registry import account_registry
+    from services.driver_pool import driver_pool
+    from services.browser_engine import browser_engine
+    from services.scrape_dispatcher import SCRAPERS
+    from services.html_parser import shutdown_parse_executor
+    from services.page_extractor import normalize_fields
+
+    try:
+        fields = normalize_fields(args.fields.split(",")) if args.fields else None
+    except ValueError as e:
+        server.stop()
+        parser.error(str(e))
+    pipelines = dict(SCRAPERS)
+    if fields:
+        pipelines["profile"] = partial(SCRAPERS["profile"], fields=fields)
+    types = list(pipelines) if args.type == "all" else [args.type]
+    types = [scrape_type for scrape_type in types if server.corpus[scrape_type]]
+    if not types:
+        print(f"No {args.type} pages in {args.corpus}")
+        return 1
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "version": settings.API_VERSION,
+        "git_revision": git_revision(),
+        "config": {
+            "concurrency": args.concurrency,
+            "iterations": args.iterations,
+            "warmup": args.warmup,
+            "latency": args.latency,
+            "fields": fields,
+            "corpus": os.path.relpath(args.corpus),
+            "extraction_mode": settings.EXTRACTION_MODE,
+            "browser_engine": settings.BROWSER_ENGINE,
+            "page_load_strategy": settings.PAGE_LOAD_STRATEGY,
+            "backends": {"profile": settings.PROFILE_BACKEND, "company": settings.COMPANY_BACKEND},
+            "resource_block_types": settings.RESOURCE_BLOCK_TYPES,
+        },
+        "results": {},
+    }
+    try:
+        start = time.perf_counter()
+        browser_engine.start()
+        driver_pool.start(account_registry.accounts)
+        report["pool_start_seconds"] = round(time.perf_counter() - start, 3)
+        for scrape_type in types:
+            ids = list(server.corpus[scrape_type])
+            if args.warmup:
+                run_scrapes(pipelines[scrape_type], ids, args.warmup, args.concurrency)
+            sampler = ChromeSampler().start()
+            samples, wall_seconds = run_scrapes(pipelines[scrape_type], ids, args.iterations, args.concurrency)
+            report["results"][scrape_type] = summarize(samples, wall_seconds, sampler.stop())
+            print_summary(scrape_type, report["results"][scrape_type])
+    finally:
+        driver_pool.close()
+        browser_engine.close()
+        shutdown_parse_executor()
+        server.stop()
+
+    output = args.output or os.path.join(RESULTS_DIR, datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        from benchmarks.compare import compare_files
+        return 1 if compare_files(args.compare, output) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,15 +8,47 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv(override=True)
 
+
+def tabs_for_memory(budget_mb, browser_mb, tab_mb, tabs_per_browser):
+    """Tabs that fit a memory budget, with a Chrome process per `tabs_per_browser` tabs"""
+    full_browser_mb = browser_mb + tabs_per_browser * tab_mb
+    full, left = divmod(budget_mb, full_browser_mb)
+    extra = min(tabs_per_browser, max(0, (left - browser_mb) // tab_mb))
+    return max(1, int(full * tabs_per_browser + extra))
+
+
 class Settings:
     """Unified application settings"""
     
     # LinkedIn API Configuration
     LINKEDIN_ACCESS_TOKEN: str = os.getenv('LINKEDIN_ACCESS_TOKEN') or ""
     LINKEDIN_ACCESS_TOKEN_EXP: str = os.getenv('LINKEDIN_ACCESS_TOKEN_EXP') or ""
+    # Site the scrapers navigate to; point it at a local fixture server for offline benchmarks
+    LINKEDIN_BASE_URL: str = os.getenv('LINKEDIN_BASE_URL', 'https://www.linkedin.com').rstrip('/')
+    # JSON list of {"name", "token", "expires"[, "rate_per_minute"]}; replaces the single token above
+    LINKEDIN_ACCOUNTS_FILE: str = os.getenv('LINKEDIN_ACCOUNTS_FILE', '')
+    # An account rests ACCOUNT_COOLDOWN seconds after ACCOUNT_ERROR_THRESHOLD
+    # consecutive failed scrapes (doubling with every further failure)
+    ACCOUNT_COOLDOWN: int = int(os.getenv('ACCOUNT_COOLDOWN', '60'))
+    ACCOUNT_ERROR_THRESHOLD: int = int(os.getenv('ACCOUNT_ERROR_THRESHOLD', '3'))
+    # Seconds before a session marked expired is probed again with one scrape
+    SESSION_RECHECK_INTERVAL: int = int(os.getenv('SESSION_RECHECK_INTERVAL', '300'))
     
     # Browser Configuration
     HEADLESS: bool = os.getenv('HEADLESS', 'True').lower() == 'true'
+    # "normal", "eager" or "none"; the scrapers wait for the elements they need
+    PAGE_LOAD_STRATEGY: str = os.getenv('PAGE_LOAD_STRATEGY', 'eager').lower()
+    # Resource blocking: types ("image", "font", "media", "stylesheet") and
+    # domains that are never fetched, plus domains whose images still load
+    RESOURCE_BLOCK_TYPES: List[str] = [t.strip() for t in os.getenv('RESOURCE_BLOCK_TYPES', 'image,font,media').split(',') if t.strip()]
+    RESOURCE_BLOCK_DOMAINS: List[str] = [d.strip() for d in os.getenv(
+        'RESOURCE_BLOCK_DOMAINS',
+        'doubleclick.net,google-analytics.com,googletagmanager.com,px.ads.linkedin.com,'
+        'snap.licdn.com,bat.bing.com,connect.facebook.net,sb.scorecardresearch.com,demdex.net,omtrdc.net'
+    ).split(',') if d.strip()]
+    RESOURCE_ALLOW_DOMAINS: List[str] = [d.strip() for d in os.getenv('RESOURCE_ALLOW_DOMAINS', '').split(',') if d.strip()]
+    # Pinned chromedriver binary; when empty it is resolved by webdriver-manager at startup
+    CHROMEDRIVER_PATH: str = os.getenv('CHROMEDRIVER_PATH', '')
     
     # FastAPI Application Configuration
     API_TITLE: str = "LinkedIn Scraper API"
@@ -28,6 +60,12 @@ class Settings:
     PORT: int = int(os.getenv("PORT", "8000"))
     RELOAD: bool = os.getenv("RELOAD", "true").lower() == "true"
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "info")
+    # "json" (one object per line) or "text"
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json").lower()
+    # Fraction of per-item debug lines (selectors, section items) that are emitted
+    LOG_SAMPLE_RATE: float = float(os.getenv("LOG_SAMPLE_RATE", "0.05"))
+    # Log full scraped payloads instead of their field names (may contain personal data)
+    LOG_PAYLOADS: bool = os.getenv("LOG_PAYLOADS", "false").lower() == "true"
     
     # CORS Configuration
     FRONTEND_URL: str = os.getenv('FRONTEND_URL', 'http://localhost:3000')
@@ -38,21 +76,134 @@ class Settings:
     ]
     
     # Rate Limiting
+    # Scrapes per minute per LinkedIn account, with bursts of up to RATE_LIMIT_BURST
     RATE_LIMIT_PER_MINUTE: int = int(os.getenv("RATE_LIMIT_PER_MINUTE", "60"))
+    RATE_LIMIT_BURST: int = int(os.getenv("RATE_LIMIT_BURST", "5"))
     BATCH_SIZE_LIMIT: int = int(os.getenv("BATCH_SIZE_LIMIT", "10"))
     
     # Scraping Configuration
     SCRAPER_TIMEOUT: int = int(os.getenv("SCRAPER_TIMEOUT", "30"))
+    # Attempts for retried operations (browser launch); SCRAPER_DELAY is the base
+    # of the jittered exponential backoff used for retries and LinkedIn pushback
     SCRAPER_RETRY_ATTEMPTS: int = int(os.getenv("SCRAPER_RETRY_ATTEMPTS", "3"))
     SCRAPER_DELAY: int = int(os.getenv("SCRAPER_DELAY", "2"))
+    # "script": one in-page execute_script for all profile fields (per-XPath fallback)
+    # "xpath": one WebDriver round-trip per selector
+    # "lxml": snapshot page_source, release the browser, parse offline with lxml
+    EXTRACTION_MODE: str = os.getenv("EXTRACTION_MODE", "script").lower()
+    # Learned order of the XPath fallback chains (empty disables persistence)
+    SELECTOR_STATS_PATH: str = os.getenv("SELECTOR_STATS_PATH", "selector_stats.json")
+    # Lookups of a chain between two reorders, and the window checked for drift:
+    # a chain drifts when its top selector's recent hit rate falls below
+    # SELECTOR_DRIFT_THRESHOLD times its historical hit rate
+    SELECTOR_REORDER_EVERY: int = int(os.getenv("SELECTOR_REORDER_EVERY", "20"))
+    SELECTOR_DRIFT_WINDOW: int = int(os.getenv("SELECTOR_DRIFT_WINDOW", "100"))
+    SELECTOR_DRIFT_THRESHOLD: float = float(os.getenv("SELECTOR_DRIFT_THRESHOLD", "0.5"))
+    # "selenium", or "fake" for load tests: no Chrome, scrapes sleep for a
+    # lognormal time (median FAKE_SCRAPER_LATENCY seconds, sigma FAKE_SCRAPER_JITTER)
+    # and fail at the given rates
+    SCRAPER_BACKEND: str = os.getenv("SCRAPER_BACKEND", "selenium").lower()
+    FAKE_SCRAPER_LATENCY: float = float(os.getenv("FAKE_SCRAPER_LATENCY", "8"))
+    FAKE_SCRAPER_JITTER: float = float(os.getenv("FAKE_SCRAPER_JITTER", "0.4"))
+    FAKE_SCRAPER_ERROR_RATE: float = float(os.getenv("FAKE_SCRAPER_ERROR_RATE", "0.02"))
+    FAKE_SCRAPER_NOT_FOUND_RATE: float = float(os.getenv("FAKE_SCRAPER_NOT_FOUND_RATE", "0.03"))
+    FAKE_SCRAPER_THROTTLE_RATE: float = float(os.getenv("FAKE_SCRAPER_THROTTLE_RATE", "0"))
+    # Per scrape type: "selenium", or "http" to fetch the server-rendered page with
+    # a keep-alive requests session and parse it with lxml (plus its JSON-LD),
+    # using Selenium only when required fields are missing
+    PROFILE_BACKEND: str = os.getenv("PROFILE_BACKEND", "selenium").lower()
+    COMPANY_BACKEND: str = os.getenv("COMPANY_BACKEND", "selenium").lower()
+    HTTP_TIMEOUT: float = float(os.getenv("HTTP_TIMEOUT", "15"))
+    HTTP_USER_AGENT: str = os.getenv(
+        "HTTP_USER_AGENT",
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+    )
+    # "selenium": one Chrome per pooled driver, through chromedriver
+    # "cdp": one Chrome driven over the DevTools protocol from the server's
+    # event loop, every pooled driver is a tab in its own browser context
+    BROWSER_ENGINE: str = os.getenv("BROWSER_ENGINE", "selenium").lower()
+    # Multi-tab mode (BROWSER_ENGINE=cdp): up to TABS_PER_BROWSER tabs share a
+    # long-lived Chrome, so a crash only takes down that many scrapes. With a
+    # BROWSER_MEMORY_BUDGET_MB, SCRAPER_MAX_WORKERS defaults to the tabs that
+    # fit it (BROWSER_BASE_MEMORY_MB per Chrome, TAB_MEMORY_MB per tab)
+    TABS_PER_BROWSER: int = int(os.getenv("TABS_PER_BROWSER", "8"))
+    BROWSER_MEMORY_BUDGET_MB: int = int(os.getenv("BROWSER_MEMORY_BUDGET_MB", "0"))
+    BROWSER_BASE_MEMORY_MB: int = int(os.getenv("BROWSER_BASE_MEMORY_MB", "250"))
+    TAB_MEMORY_MB: int = int(os.getenv("TAB_MEMORY_MB", "150"))
+    # Seconds a scrape may hold a tab before the tab is killed (0 disables)
+    TAB_TIMEOUT: int = int(os.getenv("TAB_TIMEOUT", str(SCRAPER_TIMEOUT * 3)))
+    # Worker processes used to parse page snapshots in "lxml" mode
+    PARSER_WORKERS: int = int(os.getenv("PARSER_WORKERS", "2"))
+    # Number of Selenium scrapes allowed to run at once (scrape executor threads)
+    SCRAPER_MAX_WORKERS: int = int(os.getenv("SCRAPER_MAX_WORKERS", str(
+        tabs_for_memory(BROWSER_MEMORY_BUDGET_MB, BROWSER_BASE_MEMORY_MB, TAB_MEMORY_MB, TABS_PER_BROWSER)
+        if BROWSER_ENGINE == "cdp" and BROWSER_MEMORY_BUDGET_MB > 0 else 2
+    )))
+    
+    # WebDriver Pool Configuration
+    DRIVER_POOL_SIZE: int = int(os.getenv("DRIVER_POOL_SIZE", str(SCRAPER_MAX_WORKERS)))
+    DRIVER_MAX_USES: int = int(os.getenv("DRIVER_MAX_USES", "50"))
+    DRIVER_ACQUIRE_TIMEOUT: int = int(os.getenv("DRIVER_ACQUIRE_TIMEOUT", "60"))
+    
+    # Multi-process mode: "local" scrapes inside the API process; "shared" hands
+    # scrapes to browser worker processes (python worker.py) through a SQLite queue
+    SCHEDULER_MODE: str = os.getenv("SCHEDULER_MODE", "local").lower()
+    SCHEDULER_DB_PATH: str = os.getenv("SCHEDULER_DB_PATH", "scheduler.db")
+    # Scrapes running at once across all worker processes (0: one per browser slot)
+    SCHEDULER_MAX_CONCURRENCY: int = int(os.getenv("SCHEDULER_MAX_CONCURRENCY", "0"))
+    SCHEDULER_POLL_INTERVAL: float = float(os.getenv("SCHEDULER_POLL_INTERVAL", "0.2"))
+    # Seconds the API waits for a result, and without heartbeat before a task (or a
+    # job of another API process) is re-queued
+    SCHEDULER_TASK_TIMEOUT: int = int(os.getenv("SCHEDULER_TASK_TIMEOUT", "300"))
+    SCHEDULER_STALE_AFTER: int = int(os.getenv("SCHEDULER_STALE_AFTER", "60"))
+    SCHEDULER_RESULT_TTL: int = int(os.getenv("SCHEDULER_RESULT_TTL", "600"))
+    # Browser worker processes, each running SCRAPER_MAX_WORKERS browsers; "auto"
+    # sizes them by CPU cores and available memory (CHROME_MEMORY_MB per browser)
+    WORKER_PROCESSES: str = os.getenv("WORKER_PROCESSES", "auto").lower()
+    CHROME_MEMORY_MB: int = int(os.getenv("CHROME_MEMORY_MB", "600"))
+    
+    # Job Queue (POST /jobs)
+    JOBS_DB_PATH: str = os.getenv("JOBS_DB_PATH", "jobs.db")
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", str(SCRAPER_MAX_WORKERS)))
+    # Bulk jobs may use at most this many workers; at least one always stays free
+    # for interactive jobs, so with a single worker bulk jobs are refused
+    JOB_BULK_WORKERS: int = int(os.getenv("JOB_BULK_WORKERS", str(JOB_WORKERS - 1)))
+    JOB_CALLBACK_TIMEOUT: int = int(os.getenv("JOB_CALLBACK_TIMEOUT", "10"))
+    # Seconds a finished job (and its result) is kept before it is deleted
+    JOB_RESULT_TTL: int = int(os.getenv("JOB_RESULT_TTL", "604800"))
     
     # Security
     API_KEY_HEADER: str = "X-API-Key"
     API_KEY: str = os.getenv("API_KEY", "")
     
     # Database (if needed for caching)
+    # A sqlite:///path/to/file.db URL enables the on-disk scrape cache tier
     DATABASE_URL: str = os.getenv("DATABASE_URL", "")
     
+    # Adaptive Throttle (AIMD concurrency, backoff and circuit breaker)
+    THROTTLE_MIN_CONCURRENCY: int = int(os.getenv("THROTTLE_MIN_CONCURRENCY", "1"))
+    THROTTLE_MAX_CONCURRENCY: int = int(os.getenv("THROTTLE_MAX_CONCURRENCY", str(SCRAPER_MAX_WORKERS)))
+    THROTTLE_MAX_BACKOFF: int = int(os.getenv("THROTTLE_MAX_BACKOFF", "300"))
+    # Consecutive throttled/blocked responses that open the circuit, and for how long
+    THROTTLE_BREAKER_THRESHOLD: int = int(os.getenv("THROTTLE_BREAKER_THRESHOLD", "5"))
+    THROTTLE_BREAKER_RESET: int = int(os.getenv("THROTTLE_BREAKER_RESET", "300"))
+    # Consecutive "/unavailable" redirects counted as one throttled response
+    THROTTLE_SOFT_LIMIT: int = int(os.getenv("THROTTLE_SOFT_LIMIT", "3"))
+    
+    # Scrape Result Cache
+    CACHE_ENABLED: bool = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+    CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", "1000"))
+    CACHE_TTL_PROFILE: int = int(os.getenv("CACHE_TTL_PROFILE", "86400"))
+    CACHE_TTL_COMPANY: int = int(os.getenv("CACHE_TTL_COMPANY", "604800"))
+    # How long an expired entry may still be served while it is refreshed
+    CACHE_STALE_TTL: int = int(os.getenv("CACHE_STALE_TTL", "86400"))
+    # Seconds a result is kept in the SQLite tier (for incremental re-scrapes)
+    # before it is purged; never less than the longest TTL plus CACHE_STALE_TTL
+    CACHE_DB_RETENTION: int = int(os.getenv("CACHE_DB_RETENTION", "2592000"))
+    # Re-scrapes of a cached profile expand and extract only the sections whose
+    # fingerprint changed, reusing the rest from the previous result
+    INCREMENTAL_RESCRAPE: bool = os.getenv("INCREMENTAL_RESCRAPE", "false").lower() == "true"
+    
     # Monitoring
     ENABLE_METRICS: bool = os.getenv("ENABLE_METRICS", "false").lower() == "true"
     
@@ -68,6 +219,14 @@ class Settings:
     @classmethod
     def validate_required_settings(cls):
         """Validate required environment variables"""
+        if cls.SCRAPER_BACKEND == "fake":
+            return
+        
+        if cls.LINKEDIN_ACCOUNTS_FILE:
+            if not os.path.isfile(cls.LINKEDIN_ACCOUNTS_FILE):
+                raise ValueError(f"LINKEDIN_ACCOUNTS_FILE {cls.LINKEDIN_ACCOUNTS_FILE} does not exist")
+            return
+        
         if not cls.LINKEDIN_ACCESS_TOKEN:
             raise ValueError("LINKEDIN_ACCESS_TOKEN environment variable is required")
         
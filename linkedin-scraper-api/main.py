@@ -1,14 +1,56 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, validator
+from fastapi.responses import StreamingResponse
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, ValidationError, validator
 from typing import Optional, Dict, Any, List, Union
 import uvicorn
 import re
-from datetime import datetime
-from services.candidate_scraper import scrape_linkedin_profile
-from services.company_scraper import scrape_linkedin_company
+import json
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from services.driver_pool import driver_pool
+from services.scrape_executor import scrape_executor, executor_stats
+from services.scrape_cache import scrape_cache
+from services.scrape_dispatcher import dispatch_scrape, coalescing_stats
+from services.account_registry import account_registry
+from services.throttle import throttle
+from services.job_queue import job_queue, PRIORITIES
+from services.html_parser import shutdown_parse_executor
+from services.selector_stats import selector_telemetry
+from services.scheduler import shared_scheduler
+from services.http_scraper import http_sessions, http_backend_stats
+from services.scraping_utils import ChromeDriverNotFoundError
+from services.browser_engine import browser_engine
+from services.page_extractor import normalize_fields, PROFILE_FIELDS
+from services.logging_setup import setup_logging, stop_logging, request_id_var, new_request_id, redact
+from services.metrics import register_stats, render_metrics
 from config import settings
 
+setup_logging()
+logger = logging.getLogger(__name__)
+
+# Process start, for the uptime reported by /health
+STARTED_AT = time.time()
+
+# The same numbers /health reports, exported as gauges on /metrics
+register_stats({
+    "driver_pool": driver_pool.stats,
+    "scrape_executor": executor_stats,
+    "cache": scrape_cache.stats,
+    "coalescing": coalescing_stats,
+    "jobs": job_queue.stats,
+    "accounts": account_registry.summary,
+    "throttle": throttle.stats,
+    "selectors": selector_telemetry.summary,
+    "http_backend": http_backend_stats,
+    "browser_engine": browser_engine.stats,
+})
+if settings.SCHEDULER_MODE == "shared":
+    register_stats({"scheduler": shared_scheduler.stats})
+
 app = FastAPI(
     title=settings.API_TITLE,
     description=settings.API_DESCRIPTION,
@@ -24,12 +66,26 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID"],
 )
 
+@app.middleware("http")
+async def request_id_middleware(request: Request, call_next):
+    """Tag every log line of a request with its X-Request-ID (generated if absent)"""
+    request_id = request.headers.get("X-Request-ID") or new_request_id()
+    token = request_id_var.set(request_id)
+    try:
+        response = await call_next(request)
+    finally:
+        request_id_var.reset(token)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
 # Request Models
 class ScrapeRequest(BaseModel):
     url: str
     type: str = "profile"  # "profile" or "company"
+    fields: Optional[List[str]] = None  # profile fields to scrape, e.g. ["name", "headline", "avatar"]; all when omitted
 
     @validator('url')
     def validate_linkedin_url(cls, v):
@@ -43,6 +99,58 @@ class ScrapeRequest(BaseModel):
             raise ValueError('Type must be either "profile" or "company"')
         return v
 
+    @validator('fields')
+    def validate_fields(cls, v, values):
+        if v is None:
+            return v
+        if values.get('type') != 'profile':
+            raise ValueError('fields can only be selected for profile scrapes')
+        return normalize_fields(v)
+
+class JobRequest(ScrapeRequest):
+    priority: str = "interactive"  # "interactive" or "bulk"
+    callback_url: Optional[str] = None
+
+    @validator('priority')
+    def validate_priority(cls, v):
+        if v not in PRIORITIES:
+            raise ValueError('Priority must be either "interactive" or "bulk"')
+        return v
+
+    @validator('callback_url')
+    def validate_callback_url(cls, v):
+        if v and not v.startswith(("http://", "https://")):
+            raise ValueError('callback_url must be an http(s) URL')
+        return v
+
+def infer_scrape_type(url: str) -> str:
+    """Guess the scrape type from a LinkedIn URL"""
+    return "company" if "/company/" in url else "profile"
+
+class BatchScrapeRequest(BaseModel):
+    type: Optional[str] = None  # applied to every URL; inferred per URL when omitted
+    urls: List[str]
+
+    @validator('urls')
+    def validate_urls(cls, v, values):
+        if not v:
+            raise ValueError('urls must contain at least one LinkedIn URL')
+        if len(v) > settings.BATCH_SIZE_LIMIT:
+            raise ValueError(f'A batch can contain at most {settings.BATCH_SIZE_LIMIT} URLs')
+        # Every URL must pass the same rules as a single /scrape request
+        errors = []
+        for index, url in enumerate(v):
+            try:
+                ScrapeRequest(url=url, type=values.get('type') or infer_scrape_type(url))
+            except ValidationError as e:
+                errors.append(f"urls[{index}]: {e.errors()[0]['msg']}")
+        if errors:
+            raise ValueError("; ".join(errors))
+        return v
+
+    def scrape_requests(self) -> List[ScrapeRequest]:
+        return [ScrapeRequest(url=url, type=self.type or infer_scrape_type(url)) for url in self.urls]
+
 # Response Models
 class ProfileResponse(BaseModel):
     linkedin_id: str
@@ -52,11 +160,19 @@ class ProfileResponse(BaseModel):
     about: Optional[str] = None
     experience: Optional[Dict[str, Any]] = None
     education: Optional[Dict[str, Any]] = None
+    sections: Optional[Dict[str, List[str]]] = None  # INCREMENTAL_RESCRAPE: reused/scraped sections
     scraped_at: datetime
 
+    class Config:
+        # /scrape returns Union[ProfileResponse, CompanyResponse]; without this a
+        # company result validates as a profile and loses its company fields
+        extra = "forbid"
+
 class CompanyResponse(BaseModel):
     linkedin_id: str
     name: str
+    industry: Optional[str] = None
+    about: Optional[str] = None
     description: Optional[str] = None
     size: Optional[str] = None
     founded: Optional[str] = None
@@ -68,11 +184,57 @@ class ErrorResponse(BaseModel):
     detail: Optional[str] = None
     timestamp: datetime
 
+class JobResponse(BaseModel):
+    job_id: str
+    status: str  # "queued", "running", "done" or "failed"
+    url: str
+    type: str
+    fields: Optional[List[str]] = None
+    priority: str
+    callback_url: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+class AccountResponse(BaseModel):
+    name: str
+    valid: bool
+    reason: Optional[str] = None
+    expires: Optional[str] = None
+    in_flight: int
+    scrapes: int
+    errors: int
+    rate_per_minute: int
+    budget_remaining: float
+    cooldown_remaining: float
+
+class SelectorChainResponse(BaseModel):
+    hits: Dict[str, int]
+    misses: int
+    order: Optional[List[str]] = None
+    top: Optional[str] = None
+    recent_lookups: int
+    recent_miss_rate: Optional[float] = None
+    drifting: bool
+    top_recent_hit_rate: Optional[float] = None
+
 class HealthResponse(BaseModel):
     status: str
     version: str
     timestamp: datetime
     uptime: float
+    driver_pool: Dict[str, int]
+    scrape_executor: Dict[str, int]
+    cache: Dict[str, int]
+    coalescing: Dict[str, int]
+    jobs: Dict[str, int]
+    accounts: Dict[str, int]
+    throttle: Dict[str, Any]
+    scheduler: Optional[Dict[str, int]] = None
+    http_backend: Dict[str, int]
+    browser_engine: Dict[str, int]
 
 # Utility Functions
 def extract_linkedin_id(url: str) -> str:
@@ -92,6 +254,44 @@ def extract_linkedin_id(url: str) -> str:
     
     raise ValueError("Invalid LinkedIn URL format")
 
+# Lifecycle
+@app.on_event("startup")
+async def startup_event():
+    """Start the browser engine, pre-launch the WebDriver pool and start the job workers"""
+    loop = asyncio.get_running_loop()
+    if settings.SCHEDULER_MODE == "shared":
+        logger.info(f"SCHEDULER_MODE=shared: scrapes run on the browser workers ({settings.SCHEDULER_DB_PATH})")
+        await job_queue.start(run_job)
+        return
+    if settings.SCRAPER_BACKEND == "fake":
+        logger.warning("SCRAPER_BACKEND=fake: scrapes return simulated results, no browser is started")
+        await job_queue.start(run_job)
+        return
+    try:
+        # The CDP engine drives its browser from this event loop
+        await loop.run_in_executor(None, browser_engine.start, loop)
+    except ChromeDriverNotFoundError as e:
+        logger.error(f"Startup aborted, chromedriver is not available: {e}")
+        raise
+    selector_telemetry.load()
+    await loop.run_in_executor(None, driver_pool.start, account_registry.accounts)
+    logger.info(f"WebDriver pool ready: {driver_pool.stats()}")
+    await job_queue.start(run_job)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the job workers, stop accepting scrapes and quit all pooled drivers"""
+    await job_queue.stop()
+    scrape_executor.shutdown(wait=False)
+    shutdown_parse_executor()
+    # Off the event loop: closing CDP tabs waits on protocol replies handled by this loop
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, driver_pool.close)
+    await loop.run_in_executor(None, browser_engine.close)
+    http_sessions.close()
+    selector_telemetry.save()
+    stop_logging()
+
 # API Endpoints
 @app.get("/", response_model=Dict[str, str])
 async def root():
@@ -106,33 +306,73 @@ async def root():
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint"""
-    import time
     return HealthResponse(
         status="healthy",
         version=settings.API_VERSION,
         timestamp=datetime.utcnow(),
-        uptime=time.time()
+        uptime=time.time() - STARTED_AT,
+        driver_pool=driver_pool.stats(),
+        scrape_executor=executor_stats(),
+        cache=scrape_cache.stats(),
+        coalescing=coalescing_stats(),
+        jobs=job_queue.stats(),
+        accounts=account_registry.summary(),
+        throttle=throttle.stats(),
+        scheduler=shared_scheduler.stats() if settings.SCHEDULER_MODE == "shared" else None,
+        http_backend=http_backend_stats(),
+        browser_engine=browser_engine.stats()
     )
 
-@app.post("/scrape", response_model=Union[ProfileResponse, CompanyResponse])
-async def scrape_linkedin_endpoint(request: ScrapeRequest):
-    # Log incoming request
-    print(f"[INFO] Received scrape request: type={request.type}, url={request.url}")
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics (enabled with ENABLE_METRICS=true)"""
+    if not settings.ENABLE_METRICS:
+        raise HTTPException(status_code=404, detail="Metrics are disabled, set ENABLE_METRICS=true")
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+@app.get("/accounts", response_model=List[AccountResponse])
+async def list_accounts():
+    """Per-account usage, remaining rate budget and session status (tokens are never shown)"""
+    return account_registry.stats()
+
+@app.get("/selectors", response_model=Dict[str, SelectorChainResponse])
+async def list_selectors():
+    """Hit counts, learned order and drift of every XPath fallback chain"""
+    return selector_telemetry.stats()
+
+async def scrape_one(request: ScrapeRequest):
+    """Scrape a single validated request.
+
+    Returns (response model, cache status, cache age) and raises HTTPException
+    with the same status codes as /scrape when scraping fails.
+    """
     try:
         linkedin_id = extract_linkedin_id(str(request.url))
-        print(f"[INFO] Extracted LinkedIn ID: {linkedin_id}")
+        logger.info(f"Extracted LinkedIn ID: {linkedin_id}")
+        
+        scraped_data, cache_status, cache_age = await dispatch_scrape(request.type, linkedin_id, request.fields)
+        logger.info(f"Cache {cache_status} for {request.type} {linkedin_id}")
+        scraped_at = datetime.utcnow() - timedelta(seconds=cache_age)
         
         if request.type == "profile":
-            profile_data = await scrape_linkedin_profile(linkedin_id)
-            print(f"[INFO] Scraped profile data: {profile_data}")
+            profile_data = scraped_data
+            logger.debug("Scraped profile data: %s", redact(profile_data))
             
             if "error" in profile_data:
-                print(f"[ERROR] Profile scraping failed: {profile_data['error']}")
+                logger.error(f"Profile scraping failed: {profile_data['error']}")
                 raise HTTPException(
                     status_code=422,
                     detail=f"Profile scraping failed: {profile_data['error']}"
                 )
             
+            if request.fields:
+                # A cached full scrape holds more than was asked for
+                profile_data = {
+                    key: value for key, value in profile_data.items()
+                    if key not in PROFILE_FIELDS or key in request.fields
+                }
+            
             # Type-safe extraction of education, experience, and about data
             education_data = profile_data.get("education")
             experience_data = profile_data.get("experience")
@@ -145,7 +385,12 @@ async def scrape_linkedin_endpoint(request: ScrapeRequest):
                 if positions:
                     about_text = positions[0]  # About text is stored in the first position
             
-            print(f"[INFO] Returning ProfileResponse for {linkedin_id}")
+            sections = profile_data.get("sections")
+            if sections and cache_status != "MISS":
+                # Served from the cache: nothing was scraped for this response
+                sections = {"reused": sections.get("reused", []) + sections.get("scraped", []), "scraped": []}
+            
+            logger.info(f"Returning ProfileResponse for {linkedin_id}")
             return ProfileResponse(
                 linkedin_id=profile_data.get("linkedin_id", linkedin_id),
                 name=profile_data.get("name", ""),
@@ -154,57 +399,146 @@ async def scrape_linkedin_endpoint(request: ScrapeRequest):
                 about=about_text,
                 experience=experience_data if isinstance(experience_data, dict) else None,
                 education=education_data if isinstance(education_data, dict) else None,
-                scraped_at=datetime.utcnow()
-            )
+                sections=sections,
+                scraped_at=scraped_at
+            ), cache_status, cache_age
         
         elif request.type == "company":
-            company_data = scrape_linkedin_company(linkedin_id)
-            print(f"[INFO] Scraped company data: {company_data}")
+            company_data = scraped_data
+            logger.debug("Scraped company data: %s", redact(company_data))
             
             if "error" in company_data:
-                print(f"[ERROR] Company scraping failed: {company_data['error']}")
+                logger.error(f"Company scraping failed: {company_data['error']}")
                 raise HTTPException(
                     status_code=422,
                     detail=f"Company scraping failed: {company_data['error']}"
                 )
             
-            print(f"[INFO] Returning CompanyResponse for {linkedin_id}")
+            logger.info(f"Returning CompanyResponse for {linkedin_id}")
             return CompanyResponse(
                 linkedin_id=company_data.get("linkedin_id", linkedin_id),
                 name=company_data.get("name", ""),
+                industry=company_data.get("industry"),
+                about=company_data.get("about"),
                 description=company_data.get("description"),
                 size=company_data.get("size"),
                 founded=company_data.get("founded"),
                 website=company_data.get("website"),
-                scraped_at=datetime.utcnow()
-            )
+                scraped_at=scraped_at
+            ), cache_status, cache_age
         
     except ValueError as e:
-        print(f"[ERROR] ValueError in scrape endpoint: {e}")
+        logger.error(f"ValueError in scrape endpoint: {e}")
         raise HTTPException(
             status_code=400,
             detail=f"Invalid LinkedIn URL: {str(e)}"
         )
     except HTTPException as he:
-        print(f"[ERROR] HTTPException in scrape endpoint: {he.detail}")
+        logger.error(f"HTTPException in scrape endpoint: {he.detail}")
         raise
     except Exception as e:
-        print(f"[ERROR] Unexpected error in scrape endpoint: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"Unexpected error in scrape endpoint: {e}")
         raise HTTPException(
             status_code=500,
             detail=f"Internal server error: {str(e)}"
         )
 
+@app.post("/scrape", response_model=Union[ProfileResponse, CompanyResponse])
+async def scrape_linkedin_endpoint(request: ScrapeRequest, response: Response):
+    # Log incoming request
+    logger.info(f"Received scrape request: type={request.type}, url={request.url}")
+    result, cache_status, cache_age = await scrape_one(request)
+    response.headers["X-Cache"] = cache_status
+    response.headers["Age"] = str(int(cache_age))
+    return result
+
+@app.post("/scrape/batch")
+async def batch_scrape_endpoint(request: BatchScrapeRequest):
+    """
+    Scrape several profile and/or company URLs.
+    Results are streamed as NDJSON, one line per URL, in completion order.
+    """
+    items = request.scrape_requests()
+    logger.info(f"Received batch scrape request with {len(items)} URLs")
+
+    async def scrape_item(index, item):
+        line = {"index": index, "url": item.url, "type": item.type}
+        try:
+            result, cache_status, _ = await scrape_one(item)
+            line.update(status="ok", cache=cache_status, data=jsonable_encoder(result))
+        except HTTPException as he:
+            line.update(status="error", status_code=he.status_code, error=he.detail)
+        return line
+
+    async def stream():
+        # All items are scheduled at once; the scrape executor bounds how many
+        # browsers actually run, and cached or coalesced items return early
+        tasks = [asyncio.create_task(scrape_item(index, item)) for index, item in enumerate(items)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield json.dumps(await next_done) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+def job_response(job: Dict[str, Any]) -> JobResponse:
+    timestamps = {
+        field: datetime.utcfromtimestamp(job[field]) if job[field] is not None else None
+        for field in ("created_at", "started_at", "finished_at")
+    }
+    return JobResponse(
+        job_id=job["id"],
+        status=job["status"],
+        url=job["url"],
+        type=job["type"],
+        fields=job["fields"],
+        priority=job["priority"],
+        callback_url=job["callback_url"],
+        result=job["result"],
+        error=job["error"],
+        **timestamps
+    )
+
+async def run_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Job queue handler: scrape the job's URL like /scrape would"""
+    result, _, _ = await scrape_one(ScrapeRequest(url=job["url"], type=job["type"], fields=job["fields"]))
+    return jsonable_encoder(result)
+
+@app.post("/jobs", response_model=JobResponse, status_code=202)
+async def submit_job_endpoint(request: JobRequest):
+    """
+    Queue a scrape and return immediately with a job id.
+    Poll GET /jobs/{job_id}, or pass callback_url to be notified when it finishes.
+    """
+    try:
+        extract_linkedin_id(request.url)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid LinkedIn URL: {str(e)}")
+    try:
+        job = await job_queue.submit(request.url, request.type, request.priority, request.callback_url, request.fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    logger.info(f"Queued job {job['id']} ({request.priority}) for {request.url}")
+    return job_response(job)
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job_endpoint(job_id: str):
+    """Job status, and the scrape result once it is done"""
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job_response(job)
+
 # Legacy endpoint for backward compatibility (redirects to new unified endpoint)
 @app.post("/scrape/legacy", response_model=ProfileResponse)
-async def legacy_scrape_endpoint(request: ScrapeRequest):
+async def legacy_scrape_endpoint(request: ScrapeRequest, response: Response):
     """
     Legacy endpoint for backward compatibility.
     Redirects to the new unified /scrape endpoint
     """
-    return await scrape_linkedin_endpoint(request)
+    return await scrape_linkedin_endpoint(request, response)
 
 if __name__ == "__main__":
     uvicorn.run(
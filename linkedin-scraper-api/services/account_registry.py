@@ -0,0 +1,226 @@
+import json
+import logging
+import threading
+import time
+from services.session_state import SessionState, SESSION_EXPIRED_ERROR
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class AccountUnavailableError(Exception):
+    """Raised when no account can take a scrape (all expired or out of budget)"""
+
+
+class TokenBucket:
+    """Refills `rate_per_minute` tokens per minute, holding at most `burst`"""
+
+    def __init__(self, rate_per_minute, burst):
+        self.rate = rate_per_minute / 60.0
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self):
+        self._refill()
+        return self.tokens
+
+    def take(self):
+        self._refill()
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def wait_time(self):
+        """Seconds until one token is available"""
+        self._refill()
+        if self.tokens >= 1:
+            return 0.0
+        if self.rate <= 0:
+            return float("inf")
+        return (1 - self.tokens) / self.rate
+
+
+class Account:
+    """One LinkedIn session token with its budget, cool-down and usage counters"""
+
+    def __init__(self, name, token, expires, rate_per_minute, burst):
+        self.name = name
+        self.token = token
+        self.expires = expires
+        self.rate_per_minute = rate_per_minute
+        self.bucket = TokenBucket(rate_per_minute, burst)
+        self.session = SessionState(recheck_interval=settings.SESSION_RECHECK_INTERVAL)
+        self.in_flight = 0
+        self.scrapes = 0
+        self.errors = 0
+        self.consecutive_errors = 0
+        self.cooldown_until = 0.0
+
+    def cooldown_remaining(self):
+        return max(0.0, self.cooldown_until - time.monotonic())
+
+    def stats(self):
+        session = self.session.stats()
+        return {
+            "name": self.name,
+            "valid": session["valid"],
+            "reason": session["reason"],
+            "expires": self.expires,
+            "in_flight": self.in_flight,
+            "scrapes": self.scrapes,
+            "errors": self.errors,
+            "rate_per_minute": self.rate_per_minute,
+            "budget_remaining": round(self.bucket.available(), 2),
+            "cooldown_remaining": round(self.cooldown_remaining(), 1),
+        }
+
+
+def load_accounts():
+    """Accounts from LINKEDIN_ACCOUNTS_FILE, or the single LINKEDIN_ACCESS_TOKEN.
+
+    The file is a JSON list of {"name", "token", "expires"} objects, optionally
+    with a per-account "rate_per_minute" overriding RATE_LIMIT_PER_MINUTE.
+    """
+    if settings.LINKEDIN_ACCOUNTS_FILE:
+        with open(settings.LINKEDIN_ACCOUNTS_FILE, encoding="utf-8") as f:
+            entries = json.load(f)
+    else:
+        entries = [{
+            "name": "default",
+            # The fake scraper backend never sends the token anywhere
+            "token": settings.LINKEDIN_ACCESS_TOKEN or ("fake" if settings.SCRAPER_BACKEND == "fake" else ""),
+            "expires": settings.LINKEDIN_ACCESS_TOKEN_EXP,
+        }]
+    accounts = []
+    for index, entry in enumerate(entries):
+        if not entry.get("token"):
+            raise ValueError(f"Account #{index} in {settings.LINKEDIN_ACCOUNTS_FILE} has no token")
+        accounts.append(Account(
+            name=entry.get("name") or f"account-{index}",
+            token=entry["token"],
+            expires=str(entry.get("expires", "")),
+            rate_per_minute=int(entry.get("rate_per_minute", settings.RATE_LIMIT_PER_MINUTE)),
+            burst=settings.RATE_LIMIT_BURST,
+        ))
+    return accounts
+
+
+class AccountRegistry:
+    """Routes each scrape to the least-loaded healthy account.
+
+    An account is eligible when its session is valid (or due for a probe),
+    it is not cooling down after `error_threshold` consecutive failed scrapes
+    and its token bucket has budget.
+    `acquire` blocks (it runs on the scrape executor) until an account is
+    eligible or `acquire_timeout` passes.
+    """
+
+    def __init__(self, accounts, cooldown, error_threshold, acquire_timeout):
+        self.accounts = accounts
+        self.cooldown = cooldown
+        self.error_threshold = max(1, error_threshold)
+        self.acquire_timeout = acquire_timeout
+        self._lock = threading.Lock()
+
+    def share(self, parts):
+        """Split every account's rate budget across `parts` processes using it"""
+        if parts <= 1:
+            return
+        for account in self.accounts:
+            account.bucket = TokenBucket(account.rate_per_minute / parts, max(1, settings.RATE_LIMIT_BURST // parts))
+
+    def _pick(self):
+        """Eligible account with the fewest scrapes in flight, or None"""
+        candidates = [
+            account for account in self.accounts
+            if account.cooldown_remaining() == 0 and account.bucket.available() >= 1
+        ]
+        candidates.sort(key=lambda account: (account.in_flight, -account.bucket.available()))
+        for account in candidates:
+            if account.session.allow_scrape():
+                return account
+        return None
+
+    def _wait_time(self):
+        """Seconds until some account might become eligible"""
+        waits = [
+            max(account.cooldown_remaining(), account.bucket.wait_time())
+            for account in self.accounts if account.session.stats()["valid"]
+        ]
+        return min(waits) if waits else None
+
+    def acquire(self):
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            with self._lock:
+                account = self._pick()
+                if account is not None:
+                    account.bucket.take()
+                    account.in_flight += 1
+                    return account
+                wait = self._wait_time()
+            if wait is None:
+                raise AccountUnavailableError(SESSION_EXPIRED_ERROR)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or wait > remaining:
+                raise AccountUnavailableError("Rate limit budget exhausted for every LinkedIn account")
+            time.sleep(max(wait, 0.05))
+
+    def release(self, account, outcome):
+        """Record a scrape's outcome (see throttle.py for the classification).
+
+        "aborted" (browser crash, no driver) says nothing about the account.
+        """
+        with self._lock:
+            account.in_flight -= 1
+            account.scrapes += 1
+            if outcome in ("error", "throttled", "blocked"):
+                account.errors += 1
+                account.consecutive_errors += 1
+                if outcome == "blocked":
+                    # A security challenge is aimed at this account: rest it right away
+                    account.consecutive_errors = max(account.consecutive_errors, self.error_threshold)
+                if account.consecutive_errors >= self.error_threshold:
+                    # Doubles with every further consecutive error, capped at 10 minutes
+                    cooldown = min(600, self.cooldown * 2 ** (account.consecutive_errors - self.error_threshold))
+                    account.cooldown_until = time.monotonic() + cooldown
+                    logger.error(f"Account {account.name} cooling down for {cooldown}s after {account.consecutive_errors} errors")
+            elif outcome in ("ok", "not_found", "unavailable"):
+                account.consecutive_errors = 0
+
+    def mark_expired(self, account, reason):
+        account.session.mark_expired(f"{account.name}: {reason}")
+
+    def mark_valid(self, account):
+        account.session.mark_valid()
+
+    def stats(self):
+        """Per-account usage and budget, reported by /accounts"""
+        with self._lock:
+            return [account.stats() for account in self.accounts]
+
+    def summary(self):
+        """Account counts, reported by /health"""
+        accounts = self.stats()
+        return {
+            "total": len(accounts),
+            "valid": sum(1 for account in accounts if account["valid"]),
+            "cooling_down": sum(1 for account in accounts if account["cooldown_remaining"] > 0),
+            "in_flight": sum(account["in_flight"] for account in accounts),
+        }
+
+
+# Global registry shared by the profile and company scrapers
+account_registry = AccountRegistry(
+    accounts=load_accounts(),
+    cooldown=settings.ACCOUNT_COOLDOWN,
+    error_threshold=settings.ACCOUNT_ERROR_THRESHOLD,
+    acquire_timeout=settings.DRIVER_ACQUIRE_TIMEOUT,
+)
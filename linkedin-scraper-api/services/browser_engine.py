@@ -0,0 +1,129 @@
+import logging
+import threading
+from selenium import webdriver
+from services.scraping_utils import options, get_chrome_service, resolve_chromedriver_path
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Browser engines the driver pool launches drivers from (BROWSER_ENGINE).
+# Either engine hands out objects with the same WebDriver methods, so the
+# scrapers, extractors and page waits don't care which one is in use.
+
+
+class SeleniumEngine:
+    """One Chrome per driver, driven through chromedriver (the default)"""
+
+    name = "selenium"
+
+    def start(self, loop=None):
+        resolve_chromedriver_path()
+
+    def launch(self):
+        return webdriver.Chrome(service=get_chrome_service(), options=options)
+
+    def set_deadline(self, driver):
+        # Selenium has no way to stop a running command; SCRAPER_TIMEOUT bounds page loads
+        pass
+
+    def clear_deadline(self, driver):
+        pass
+
+    def release_objects(self, driver):
+        # WebDriver element references die with the page
+        pass
+
+    def close(self):
+        pass
+
+    def stats(self):
+        return {}
+
+
+class CdpEngine:
+    """Long-lived Chromes driven over the DevTools protocol; every driver is a tab.
+
+    A new tab goes to the least busy browser with fewer than
+    `tabs_per_browser` tabs, otherwise another Chrome is started, so one
+    browser crash takes down at most that many scrapes. A dead browser is
+    dropped on the next launch; its tabs fail their health check and are
+    recycled by the pool. `start` takes the event loop the protocol traffic
+    should run on (the server's, in main.py).
+    """
+
+    name = "cdp"
+
+    def __init__(self, tabs_per_browser, tab_timeout):
+        self.tabs_per_browser = max(1, tabs_per_browser)
+        self.tab_timeout = tab_timeout
+        self._browsers = []
+        self._loop = None
+        self._lock = threading.Lock()
+        self._started = 0
+        # Counters of browsers that are gone, so stats survive restarts
+        self._retired = {"tab_crashes": 0, "tab_timeouts": 0}
+
+    def _start_browser(self):
+        # Imported here so the Selenium engine does not need websockets
+        from services.cdp_browser import CdpBrowser
+        browser = CdpBrowser().start(self._loop)
+        self._browsers.append(browser)
+        self._started += 1
+        return browser
+
+    def _retire(self, browser):
+        self._browsers.remove(browser)
+        if browser.connection is not None:
+            self._retired["tab_crashes"] += browser.connection.crashes
+            self._retired["tab_timeouts"] += browser.connection.timeouts
+        browser.quit()
+
+    def start(self, loop=None):
+        with self._lock:
+            self._loop = loop
+            self._start_browser()
+
+    def launch(self):
+        with self._lock:
+            for browser in [browser for browser in self._browsers if not browser.alive]:
+                logger.error(f"Chrome {browser.process.pid} of the CDP engine is gone, dropping it")
+                self._retire(browser)
+            free = [browser for browser in self._browsers if browser.tabs < self.tabs_per_browser]
+            browser = min(free, key=lambda b: b.tabs) if free else self._start_browser()
+            return browser.new_tab()
+
+    def set_deadline(self, driver):
+        if self.tab_timeout > 0:
+            driver.set_deadline(self.tab_timeout)
+
+    def clear_deadline(self, driver):
+        if self.tab_timeout > 0:
+            driver.clear_deadline()
+
+    def release_objects(self, driver):
+        driver.release_objects()
+
+    def close(self):
+        with self._lock:
+            for browser in list(self._browsers):
+                self._retire(browser)
+
+    def stats(self):
+        """Browsers, tabs, crashes and tab timeouts, reported by /health"""
+        with self._lock:
+            live = [browser for browser in self._browsers if browser.connection is not None]
+            return {
+                "browsers": sum(1 for browser in self._browsers if browser.alive),
+                "tabs": sum(browser.tabs for browser in self._browsers),
+                "browsers_started": self._started,
+                "tab_crashes": self._retired["tab_crashes"] + sum(b.connection.crashes for b in live),
+                "tab_timeouts": self._retired["tab_timeouts"] + sum(b.connection.timeouts for b in live),
+            }
+
+
+# Global engine the driver pool launches from
+if settings.BROWSER_ENGINE == "cdp":
+    browser_engine = CdpEngine(tabs_per_browser=settings.TABS_PER_BROWSER, tab_timeout=settings.TAB_TIMEOUT)
+else:
+    browser_engine = SeleniumEngine()
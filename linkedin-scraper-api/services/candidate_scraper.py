@@ -1,108 +1,240 @@
-from selenium import webdriver
-from time import sleep
-from services.scraping_utils import options, get_chrome_service, search_for_candidate_name, search_for_candidate_headline, search_for_candidate_avatar, search_for_section, add_session_cookie
+import logging
+from services.page_extractor import extract_profile_fields, section_fingerprints, PROFILE_SECTIONS
+from services.scraping_utils import section_xpaths
+from services.scrape_cache import scrape_cache
+from services.html_parser import parse_profile_html, parse_in_worker
+from config import settings
+from services.driver_pool import driver_pool
+from services.account_registry import account_registry, AccountUnavailableError
+from services.session_state import SESSION_EXPIRED_ERROR
+from services.throttle import throttle, classify_page, ThrottleError
+from services.page_waits import (
+    wait_for_any_xpath, all_xpaths_present, wait_for_height_change, wait_until_expanded, Deadline,
+    PAGE_READY_TIMEOUT, SCROLL_TIMEOUT, EXPAND_TIMEOUT, STEP_TIMEOUT,
+)
+from services.timing import PhaseTimer
+from services.metrics import record_outcome, record_fields
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.wait import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-import asyncio
 
+logger = logging.getLogger(__name__)
 
-def scroll_to_bottom(driver, pause_time=1.5, max_attempts=12):
-    """多次缓慢滚动到底部，直到页面高度不再变化"""
+
+# The top card is rendered once any of these is present
+PROFILE_READY_XPATHS = [
+    "//main//h1",
+    "//h1[contains(@class, 't-24')]",
+]
+# Lazy-loaded sections we extract; scrolling stops once all of them are in the DOM
+PROFILE_SECTION_XPATHS = {
+    "About": "//div[@id='about']",
+    "Experience": "//div[@id='experience']",
+    "Education": "//div[@id='education']",
+}
+
+
+def scroll_to_bottom(driver, timeout=SCROLL_TIMEOUT, max_attempts=12, target_xpaths=None):
+    """多次滚动到底部，直到目标section都已加载或页面高度不再变化"""
+    deadline = Deadline(timeout)
     last_height = driver.execute_script("return document.body.scrollHeight")
     for _ in range(max_attempts):
+        if target_xpaths and all_xpaths_present(driver, target_xpaths):
+            break
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        sleep(pause_time)
-        new_height = driver.execute_script("return document.body.scrollHeight")
-        if new_height == last_height:
+        new_height = wait_for_height_change(driver, last_height, deadline.remaining(STEP_TIMEOUT))
+        if new_height == last_height or deadline.expired():
             break
         last_height = new_height
 
 
-def click_all_show_more(driver):
-    """点击所有可见的Show more按钮"""
+SHOW_MORE_XPATH = "//button[contains(., 'Show more') or contains(., '...see more')]"
+
+
+def _show_more_buttons(driver, sections=None):
+    """Show more buttons of the whole page, or only those inside `sections`"""
+    if sections is None:
+        return driver.find_elements(By.XPATH, SHOW_MORE_XPATH)
+    buttons = []
+    for name in sections:
+        for xpath in section_xpaths(name):
+            found = driver.find_elements(By.XPATH, xpath)
+            if found:
+                buttons.extend(found[0].find_elements(By.XPATH, "." + SHOW_MORE_XPATH))
+                break
+    return buttons
+
+
+def click_all_show_more(driver, timeout=EXPAND_TIMEOUT, sections=None):
+    """点击所有可见的Show more按钮，并等待每个按钮展开完成"""
+    deadline = Deadline(timeout)
     try:
-        buttons = driver.find_elements(By.XPATH, "//button[contains(., 'Show more') or contains(., '...see more')]")
+        buttons = _show_more_buttons(driver, sections)
         for btn in buttons:
+            if deadline.expired():
+                break
             try:
                 if btn.is_displayed() and btn.is_enabled():
                     driver.execute_script("arguments[0].scrollIntoView(true);", btn)
-                    sleep(0.5)
                     btn.click()
-                    sleep(1)
+                    wait_until_expanded(driver, btn, deadline.remaining(STEP_TIMEOUT))
             except Exception:
                 continue
     except Exception:
         pass
 
 
-# Global semaphore to limit concurrent Chrome instances
-scrape_semaphore = asyncio.Semaphore(2)
+def plan_sections(previous, fingerprints, sections=PROFILE_SECTIONS):
+    """Split `sections` into (reused, changed) against the previous scrape.
 
-async def scrape_linkedin_profile(linkedin_id):
-    """Scraping linkedIn profile data"""
-    max_retries = 3
-    driver = None
-    async with scrape_semaphore:
-        for attempt in range(max_retries):
-            try:
-                print(f"[INFO] Attempt {attempt + 1} to create WebDriver for LinkedIn ID: {linkedin_id}")
-                driver = webdriver.Chrome(service=get_chrome_service(), options=options)
-                print(f"[INFO] WebDriver created successfully for LinkedIn ID: {linkedin_id}")
-                break
-            except Exception as e:
-                print(f"[ERROR] Attempt {attempt + 1} failed to create WebDriver: {e}")
-                if attempt == max_retries - 1:
-                    print(f"[ERROR] Failed to create WebDriver after {max_retries} attempts: {str(e)}")
-                    return {"error": f"Failed to create WebDriver after {max_retries} attempts: {str(e)}"}
-                import time
-                time.sleep(2)  # Wait before retry
-        if driver is None:
-            return {"error": "WebDriver could not be created."}
-        try:
-            print(f"[INFO] Loading session cookies for LinkedIn ID: {linkedin_id}")
-            add_session_cookie(driver)
-            print(f"[INFO] Scraping data for LinkedIn profile: {linkedin_id}")
-            profile_url = f"https://www.linkedin.com/in/{linkedin_id}/"
+    A section is reused when its fingerprint is unchanged; a changed top card
+    (name, headline, ...) re-scrapes every section.
+    """
+    old = (previous or {}).get("fingerprints") or {}
+    if not fingerprints.get("top_card") or old.get("top_card") != fingerprints["top_card"]:
+        return [], list(sections)
+    reused = [
+        name for name in sections
+        if fingerprints.get(name.lower()) and old.get(name.lower()) == fingerprints[name.lower()]
+        and name.lower() in previous
+    ]
+    return reused, [name for name in sections if name not in reused]
+
+
+def scrape_linkedin_profile(linkedin_id, fields=None):
+    """Scraping linkedIn profile data (blocking, run it on the scrape executor).
+
+    `fields` (see normalize_fields) limits the sections that are loaded,
+    expanded and extracted; the top card is always extracted.
+    """
+    timer = PhaseTimer("profile")
+    sections = [name for name in PROFILE_SECTIONS if fields is None or name.lower() in fields]
+    try:
+        with timer.phase("throttle_wait"):
+            throttle.acquire()
+    except ThrottleError as e:
+        record_outcome("profile", "rejected")
+        logger.error(f"Throttled before scraping profile {linkedin_id}: {e}")
+        return {"error": str(e)}
+    try:
+        with timer.phase("account_wait"):
+            account = account_registry.acquire()
+    except AccountUnavailableError as e:
+        throttle.release("aborted")
+        record_outcome("profile", "rejected")
+        logger.error(f"No LinkedIn account available for profile {linkedin_id}: {e}")
+        return {"error": str(e)}
+    try:
+        logger.info(f"Borrowing pooled WebDriver ({account.name}) for LinkedIn ID: {linkedin_id}")
+        with timer.phase("driver_acquire"):
+            pooled = driver_pool.acquire(account)
+    except Exception as e:
+        account_registry.release(account, "aborted")
+        throttle.release("aborted")
+        record_outcome("profile", "aborted")
+        logger.error(f"Could not get a WebDriver for LinkedIn ID {linkedin_id}: {e}")
+        return {"error": f"WebDriver could not be created: {str(e)}"}
+    driver = pooled.driver
+    broken = False
+    outcome = "error"
+    try:
+        logger.info(f"Scraping data for LinkedIn profile: {linkedin_id}")
+        profile_url = f"{settings.LINKEDIN_BASE_URL}/in/{linkedin_id}/"
+        with timer.phase("navigation"):
             driver.get(profile_url)
-            print(f"[INFO] Navigated to profile URL: {profile_url}")
-            if "/404" in driver.current_url or "Page not found" in driver.page_source:
-                print(f"[ERROR] Profile for {linkedin_id} not found (404)")
-                return {"error": f"Profile for {linkedin_id} not found."}
-            from time import sleep
-            sleep(2)
-            print(f"[INFO] Scrolling to bottom and clicking all 'Show more' buttons for {linkedin_id}")
-            scroll_to_bottom(driver, pause_time=1.5, max_attempts=8)
-            click_all_show_more(driver)
-            sleep(1)
+        logger.info(f"Navigated to profile URL: {profile_url}")
+        pushback, reason = classify_page(driver)
+        if pushback == "expired":
+            account_registry.mark_expired(account, reason)
+            outcome = "expired"
+            return {"error": SESSION_EXPIRED_ERROR}
+        if pushback:
+            logger.error(f"LinkedIn pushed back on profile {linkedin_id}: {reason}")
+            outcome = pushback
+            return {"error": f"LinkedIn is rate limiting requests ({pushback}), retry later"}
+        account_registry.mark_valid(account)
+        if "/404" in driver.current_url or "Page not found" in driver.page_source:
+            logger.error(f"Profile for {linkedin_id} not found (404)")
+            outcome = "not_found"
+            return {"error": f"Profile for {linkedin_id} not found."}
+        with timer.phase("page_ready"):
+            if not wait_for_any_xpath(driver, PROFILE_READY_XPATHS, PAGE_READY_TIMEOUT):
+                logger.error(f"Top card for {linkedin_id} did not render within {PAGE_READY_TIMEOUT:.1f}s")
+        if sections:
+            logger.info(f"Scrolling to bottom and clicking all 'Show more' buttons for {linkedin_id}")
+            with timer.phase("scroll"):
+                scroll_to_bottom(
+                    driver, max_attempts=8, target_xpaths=[PROFILE_SECTION_XPATHS[name] for name in sections],
+                )
+        else:
+            logger.info(f"Only the top card of {linkedin_id} was requested, skipping scroll and expansion")
+        previous, fingerprints, reused = None, None, []
+        if settings.INCREMENTAL_RESCRAPE and sections:
             try:
-                print(f"[INFO] Extracting profile details for {linkedin_id}")
-                name = search_for_candidate_name(driver)
-                if not name:
-                    print(f"[ERROR] Could not find name for {linkedin_id}, possibly due to XPath failure or page structure change")
-                    return {"error": "Could not find name, possibly due to XPath failure or page structure change"}
-                avatar = search_for_candidate_avatar(driver)
-                headline = search_for_candidate_headline(driver)
-                education = search_for_section(driver, "Education")
-                experience = search_for_section(driver, "Experience")
-                about = search_for_section(driver, "About")
+                with timer.phase("fingerprint"):
+                    fingerprints = section_fingerprints(driver)
+                    previous = scrape_cache.previous("profile", linkedin_id)
+                    reused, sections = plan_sections(previous, fingerprints, sections)
             except Exception as e:
-                print(f"[ERROR] Exception while scraping details for {linkedin_id}: {e}")
-                return {"error": f"Error searching for details for {linkedin_id}"}
-            print(f"[INFO] Successfully fetched details for profile {linkedin_id}")
-            return {
-                "linkedin_id": linkedin_id,
-                "name": name,
-                "avatar": avatar,
-                "headline": headline,
-                "about": about,
-                "education": education,
-                "experience": experience,
-            }
+                logger.error(f"Could not fingerprint sections of {linkedin_id}, scraping all of them: {e}")
+            if reused:
+                logger.info(f"Sections of {linkedin_id} unchanged since the last scrape: {', '.join(reused)}")
+        if sections:
+            with timer.phase("expand"):
+                # When some sections are reused or not requested, only the rest is expanded
+                click_all_show_more(driver, sections=None if sections == list(PROFILE_SECTIONS) else sections)
+        try:
+            logger.info(f"Extracting profile details for {linkedin_id}")
+            if settings.EXTRACTION_MODE == "lxml":
+                # Snapshot the expanded DOM, give the browser back, parse offline
+                with timer.phase("snapshot"):
+                    page_source = driver.page_source
+                driver_pool.release(pooled)
+                pooled = None
+                with timer.phase("extract"):
+                    values = parse_in_worker(parse_profile_html, page_source)
+            else:
+                with timer.phase("extract"):
+                    values = extract_profile_fields(driver, sections=sections)
+            for name in PROFILE_SECTIONS:
+                if name not in sections:
+                    values.pop(name.lower(), None)
+            record_fields("profile", values)
+            for name in reused:
+                values[name.lower()] = previous[name.lower()]
+            if not values.get("name"):
+                logger.error(f"Could not find name for {linkedin_id}, possibly due to XPath failure or page structure change")
+                return {"error": "Could not find name, possibly due to XPath failure or page structure change"}
         except Exception as e:
-            print(f"[ERROR] Exception while fetching details for {linkedin_id}: {e}")
-            return {"error": f"Error fetching profile details for {linkedin_id}"}
-        finally:
-            if driver is not None:
-                print(f"[INFO] Quitting WebDriver for LinkedIn ID: {linkedin_id}")
-                driver.quit()
\ No newline at end of file
+            logger.error(f"Exception while scraping details for {linkedin_id}: {e}")
+            return {"error": f"Error searching for details for {linkedin_id}"}
+        logger.info(f"Successfully fetched details for profile {linkedin_id}")
+        outcome = "ok"
+        result = {
+            "linkedin_id": linkedin_id,
+            "name": values["name"],
+            "avatar": values.get("avatar"),
+            "headline": values.get("headline"),
+            "about": values.get("about"),
+            "education": values.get("education"),
+            "experience": values.get("experience"),
+            "timings": timer.report(),
+        }
+        if fingerprints is not None:
+            result["fingerprints"] = fingerprints
+            result["sections"] = {
+                "reused": [name.lower() for name in reused],
+                "scraped": [name.lower() for name in sections],
+            }
+        return result
+    except Exception as e:
+        logger.error(f"Exception while fetching details for {linkedin_id}: {e}")
+        broken = True
+        outcome = "aborted"
+        return {"error": f"Error fetching profile details for {linkedin_id}"}
+    finally:
+        logger.info(f"Phase timings for {linkedin_id}: {timer.report()}")
+        if pooled is not None:
+            logger.info(f"Returning WebDriver to pool for LinkedIn ID: {linkedin_id}")
+            driver_pool.release(pooled, broken=broken)
+        account_registry.release(account, outcome)
+        throttle.release(outcome)
+        record_outcome("profile", outcome)
@@ -0,0 +1,549 @@
+import asyncio
+import concurrent.futures
+import itertools
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import websockets
+from selenium.common.exceptions import (
+    JavascriptException, NoSuchElementException, StaleElementReferenceException, TimeoutException,
+)
+from services.scraping_utils import DEFAULT_CHROME_BINARIES
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Chrome DevTools Protocol engine (BROWSER_ENGINE=cdp). Each Chrome process is
+# driven over a single websocket from an asyncio event loop; every pooled
+# "driver" is a tab in its own browser context (separate cookies, so tabs can
+# hold different accounts). A crashed or timed-out tab only fails its own
+# scrape. CdpDriver and CdpElement mirror the part of
+# Selenium's WebDriver / WebElement API the scrapers use, so the extractors
+# and page_waits.py work unchanged on either engine.
+
+# Seconds a single protocol command may take (navigation has its own timeout)
+COMMAND_TIMEOUT = 30
+# Seconds to wait for Chrome to open its DevTools port
+LAUNCH_TIMEOUT = 30
+
+# Page event that ends driver.get() for each PAGE_LOAD_STRATEGY
+LOAD_EVENTS = {"normal": "Page.loadEventFired", "eager": "Page.domContentEventFired", "none": None}
+
+# Nodes matching a locator below `root`, as an array
+FIND_ELEMENTS_JS = """function(by, value, root) {
+    root = root || document;
+    if (by === 'css selector') return Array.from(root.querySelectorAll(value));
+    const result = document.evaluate(value, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    const nodes = [];
+    for (let i = 0; i < result.snapshotLength; i++) nodes.push(result.snapshotItem(i));
+    return nodes;
+}"""
+ELEMENT_TEXT_JS = "function() { return (this.innerText ?? this.textContent ?? '').trim(); }"
+# Like Selenium: the property when it is a plain value, else the attribute
+ELEMENT_ATTRIBUTE_JS = """function(name) {
+    const value = this[name];
+    if (value !== undefined && value !== null && typeof value !== 'object' && typeof value !== 'function') {
+        return String(value);
+    }
+    return this.getAttribute(name);
+}"""
+ELEMENT_DISPLAYED_JS = """function() {
+    const style = window.getComputedStyle(this);
+    return style.visibility !== 'hidden' && style.display !== 'none' && this.getClientRects().length > 0;
+}"""
+ELEMENT_ENABLED_JS = "function() { return !this.disabled; }"
+ELEMENT_CLICK_JS = "function() { this.scrollIntoView({block: 'center'}); this.click(); }"
+# Remote objects (found elements) are created in this group and released
+# together when the pool takes the tab back, so a long-lived tab doesn't
+# keep every node it ever returned alive
+OBJECT_GROUP = "scrape"
+
+
+class CdpError(Exception):
+    """Raised when Chrome rejects a protocol command or the connection is lost"""
+
+
+def resolve_chrome_binary():
+    """CHROME_BINARY, the platform default, or the first Chrome/Chromium on PATH"""
+    candidates = [os.environ.get("CHROME_BINARY"), DEFAULT_CHROME_BINARIES.get(sys.platform)]
+    candidates += [shutil.which(name) for name in ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser")]
+    for candidate in candidates:
+        if candidate and os.path.isfile(candidate):
+            return candidate
+    raise CdpError("No Chrome binary found, set CHROME_BINARY")
+
+
+class CdpConnection:
+    """One websocket to the browser, multiplexing flat-mode target sessions"""
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.closed = False
+        self._ids = itertools.count(1)
+        # command id -> (future, session id)
+        self._pending = {}
+        # (session id, event) -> futures waiting for it
+        self._waiters = {}
+        # session id -> reason, for sessions whose target crashed or went away
+        self._lost = {}
+        self.crashes = 0
+        self.timeouts = 0
+        self._reader = asyncio.get_running_loop().create_task(self._read())
+
+    async def send(self, method, params=None, session_id=None):
+        if self.closed:
+            raise CdpError("Browser connection is closed")
+        if session_id in self._lost:
+            raise CdpError(f"Tab is gone: {self._lost[session_id]}")
+        command_id = next(self._ids)
+        message = {"id": command_id, "method": method, "params": params or {}}
+        if session_id:
+            message["sessionId"] = session_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[command_id] = (future, session_id)
+        try:
+            await self.websocket.send(json.dumps(message))
+            return await future
+        finally:
+            self._pending.pop(command_id, None)
+
+    def expect(self, session_id, event):
+        """Future resolved with the params of the next `event` on a session"""
+        future = asyncio.get_running_loop().create_future()
+        waiters = self._waiters.setdefault((session_id, event), [])
+        waiters[:] = [waiter for waiter in waiters if not waiter.done()]
+        waiters.append(future)
+        return future
+
+    def _fail_session(self, session_id, reason):
+        self._lost[session_id] = reason
+        for future, command_session in list(self._pending.values()):
+            if command_session == session_id and not future.done():
+                future.set_exception(CdpError(f"Tab is gone: {reason}"))
+        for (waiter_session, _), waiters in self._waiters.items():
+            if waiter_session == session_id:
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_exception(CdpError(f"Tab is gone: {reason}"))
+
+    def expire(self, session_id, target_id, reason):
+        """Fail a tab's pending calls and close it, e.g. when its scrape ran too long"""
+        self.timeouts += 1
+        self._fail_session(session_id, reason)
+        closing = asyncio.ensure_future(self.send("Target.closeTarget", {"targetId": target_id}))
+        # The tab may already be gone; nothing waits for this reply
+        closing.add_done_callback(lambda future: future.cancelled() or future.exception())
+
+    def forget(self, session_id):
+        self._lost.pop(session_id, None)
+        for key in [key for key in self._waiters if key[0] == session_id]:
+            del self._waiters[key]
+
+    async def _read(self):
+        try:
+            async for raw in self.websocket:
+                message = json.loads(raw)
+                if "id" in message:
+                    future, _ = self._pending.get(message["id"], (None, None))
+                    if future is None or future.done():
+                        continue
+                    if "error" in message:
+                        future.set_exception(CdpError(message["error"].get("message", str(message["error"]))))
+                    else:
+                        future.set_result(message.get("result", {}))
+                    continue
+                method, params = message.get("method"), message.get("params", {})
+                session_id = message.get("sessionId")
+                if method == "Target.detachedFromTarget":
+                    self._fail_session(params.get("sessionId"), "detached from target")
+                elif method == "Inspector.targetCrashed":
+                    self.crashes += 1
+                    logger.error("A CDP tab's renderer crashed, failing only that tab's scrape")
+                    self._fail_session(session_id, "renderer crashed")
+                for waiter in self._waiters.pop((session_id, method), []):
+                    if not waiter.done():
+                        waiter.set_result(params)
+        except websockets.ConnectionClosed:
+            pass
+        except Exception as e:
+            logger.error(f"CDP reader stopped: {e}")
+        finally:
+            self.closed = True
+            for future, _ in list(self._pending.values()):
+                if not future.done():
+                    future.set_exception(CdpError("Browser connection closed"))
+            for waiters in self._waiters.values():
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_exception(CdpError("Browser connection closed"))
+
+    async def close(self):
+        self.closed = True
+        await self.websocket.close()
+        self._reader.cancel()
+
+
+class CdpBrowser:
+    """A Chrome process driven over CDP, with a blocking facade for scraper threads.
+
+    The protocol traffic runs on `loop` (the server's event loop when started
+    from main.py), or on a private loop thread when no loop is given, e.g. in
+    worker.py or the benchmarks. Blocking calls must come from other threads.
+    """
+
+    def __init__(self):
+        self.loop = None
+        self.connection = None
+        self.process = None
+        self._user_data_dir = None
+        self._loop_thread = None
+        self._tabs_lock = threading.Lock()
+        self.tabs = 0
+
+    @property
+    def alive(self):
+        return (
+            self.connection is not None and not self.connection.closed
+            and self.process is not None and self.process.poll() is None
+        )
+
+    def start(self, loop=None):
+        if loop is None:
+            loop = asyncio.new_event_loop()
+            self._loop_thread = threading.Thread(target=loop.run_forever, name="cdp-loop", daemon=True)
+            self._loop_thread.start()
+        self.loop = loop
+        self._user_data_dir = tempfile.mkdtemp(prefix="cdp-chrome-")
+        args = [
+            resolve_chrome_binary(),
+            "--remote-debugging-port=0",
+            f"--user-data-dir={self._user_data_dir}",
+            "--no-first-run",
+            "--no-default-browser-check",
+            "--no-sandbox",
+            "--disable-dev-shm-usage",
+            "--disable-gpu",
+            "--window-size=1920,1080",
+            "--ignore-certificate-errors",
+        ]
+        if settings.HEADLESS:
+            args.append("--headless=new")
+        if "image" in settings.RESOURCE_BLOCK_TYPES:
+            # Same effect as the content setting in build_chrome_options: <img src> stays in the DOM
+            args.append("--blink-settings=imagesEnabled=false")
+        self.process = subprocess.Popen(args + ["about:blank"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        websocket_url = self._devtools_url()
+        self.connection = self.run(self._connect(websocket_url))
+        logger.info(f"Chrome {self.process.pid} started for the CDP engine ({websocket_url})")
+        return self
+
+    def _devtools_url(self):
+        """Read the browser endpoint Chrome writes to DevToolsActivePort"""
+        path = os.path.join(self._user_data_dir, "DevToolsActivePort")
+        deadline = time.monotonic() + LAUNCH_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise CdpError(f"Chrome exited with {self.process.returncode} during startup")
+            try:
+                with open(path) as f:
+                    lines = f.read().split()
+                if len(lines) >= 2:
+                    return f"ws://127.0.0.1:{lines[0]}{lines[1]}"
+            except OSError:
+                pass
+            time.sleep(0.05)
+        raise CdpError(f"Chrome did not open its DevTools port within {LAUNCH_TIMEOUT}s")
+
+    @staticmethod
+    async def _connect(websocket_url):
+        # Page sources can be several MB, so no message size limit
+        websocket = await websockets.connect(websocket_url, max_size=None, ping_interval=None)
+        return CdpConnection(websocket)
+
+    def run(self, coroutine, timeout=COMMAND_TIMEOUT):
+        """Run a coroutine on the engine's loop and wait for its result"""
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            coroutine.close()
+            raise CdpError("Blocking CDP call made from the event loop thread, use run_in_executor")
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise TimeoutException(f"CDP call did not finish within {timeout}s")
+
+    def send(self, method, params=None, session_id=None, timeout=COMMAND_TIMEOUT):
+        return self.run(self.connection.send(method, params, session_id), timeout)
+
+    def new_tab(self):
+        """Open a tab in a fresh browser context and return its driver"""
+        tab = self.run(self._new_tab())
+        with self._tabs_lock:
+            self.tabs += 1
+        return tab
+
+    def tab_closed(self):
+        with self._tabs_lock:
+            self.tabs -= 1
+
+    async def _new_tab(self):
+        connection = self.connection
+        context = await connection.send("Target.createBrowserContext", {"disposeOnDetach": True})
+        context_id = context["browserContextId"]
+        target = await connection.send(
+            "Target.createTarget", {"url": "about:blank", "browserContextId": context_id}
+        )
+        session = await connection.send(
+            "Target.attachToTarget", {"targetId": target["targetId"], "flatten": True}
+        )
+        session_id = session["sessionId"]
+        await asyncio.gather(
+            connection.send("Page.enable", {}, session_id),
+            connection.send("Runtime.enable", {}, session_id),
+            connection.send("Inspector.enable", {}, session_id),
+        )
+        return CdpDriver(self, target["targetId"], session_id, context_id)
+
+    def quit(self):
+        if self.connection is not None and not self.connection.closed:
+            try:
+                self.run(self.connection.send("Browser.close"), timeout=10)
+            except Exception:
+                pass
+            try:
+                self.run(self.connection.close(), timeout=5)
+            except Exception:
+                pass
+        if self.process is not None:
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        if self._loop_thread is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._loop_thread = None
+        if self._user_data_dir:
+            shutil.rmtree(self._user_data_dir, ignore_errors=True)
+            self._user_data_dir = None
+
+
+class CdpDriver:
+    """One browser tab with the WebDriver methods the scrapers call"""
+
+    def __init__(self, browser, target_id, session_id, context_id):
+        self.browser = browser
+        self.target_id = target_id
+        self.session_id = session_id
+        self.context_id = context_id
+        self._watchdog = None
+        self._closed = False
+
+    def set_deadline(self, seconds):
+        """Kill the tab if it is still in use after `seconds` (the per-tab scrape timeout)"""
+        self.browser.loop.call_soon_threadsafe(self._arm, seconds)
+
+    def clear_deadline(self):
+        self.browser.loop.call_soon_threadsafe(self._disarm)
+
+    def _arm(self, seconds):
+        self._disarm()
+        self._watchdog = self.browser.loop.call_later(seconds, self._expire, seconds)
+
+    def _disarm(self):
+        if self._watchdog is not None:
+            self._watchdog.cancel()
+            self._watchdog = None
+
+    def _expire(self, seconds):
+        self._watchdog = None
+        logger.error(f"CDP tab {self.target_id} exceeded the {seconds}s tab timeout, closing it")
+        self.browser.connection.expire(self.session_id, self.target_id, f"tab timeout of {seconds}s")
+
+    def execute_cdp_cmd(self, cmd, cmd_args):
+        return self.browser.send(cmd, cmd_args, self.session_id)
+
+    def _evaluate(self, expression, by_value=True):
+        result = self.execute_cdp_cmd("Runtime.evaluate", {
+            "expression": expression, "returnByValue": by_value, "awaitPromise": True,
+            "objectGroup": OBJECT_GROUP,
+        })
+        return _unwrap(result, by_value)
+
+    def get(self, url):
+        event = LOAD_EVENTS.get(settings.PAGE_LOAD_STRATEGY, LOAD_EVENTS["normal"])
+        self.browser.run(self._navigate(url, event), timeout=settings.SCRAPER_TIMEOUT + 5)
+
+    async def _navigate(self, url, event):
+        connection = self.browser.connection
+        loaded = connection.expect(self.session_id, event) if event else None
+        result = await connection.send("Page.navigate", {"url": url}, self.session_id)
+        if result.get("errorText"):
+            if loaded is not None:
+                loaded.cancel()
+            raise CdpError(f"Navigation to {url} failed: {result['errorText']}")
+        if loaded is not None:
+            try:
+                await asyncio.wait_for(loaded, settings.SCRAPER_TIMEOUT)
+            except asyncio.TimeoutError:
+                raise TimeoutException(f"Page load of {url} timed out after {settings.SCRAPER_TIMEOUT}s")
+
+    @property
+    def current_url(self):
+        return self._evaluate("location.href")
+
+    @property
+    def page_source(self):
+        return self._evaluate("document.documentElement ? document.documentElement.outerHTML : ''")
+
+    def execute_script(self, script, *args):
+        """Run a script body with `arguments`, like WebDriver; returns its value"""
+        function = f"function() {{\n{script}\n}}"
+        elements = [arg for arg in args if isinstance(arg, CdpElement)]
+        if not elements:
+            return self._evaluate(f"({function}).apply(null, {json.dumps(list(args))})")
+        result = self.execute_cdp_cmd("Runtime.callFunctionOn", {
+            "functionDeclaration": function,
+            "objectId": elements[0].object_id,
+            "arguments": [_call_argument(arg) for arg in args],
+            "returnByValue": True,
+            "awaitPromise": True,
+            "objectGroup": OBJECT_GROUP,
+        })
+        return _unwrap(result, True)
+
+    def _find(self, by, value, root=None):
+        if root is None:
+            array = self._evaluate(f"({FIND_ELEMENTS_JS})({json.dumps(by)}, {json.dumps(value)})", by_value=False)
+        else:
+            array = root._call(f"function(by, value) {{ return ({FIND_ELEMENTS_JS})(by, value, this); }}",
+                               by, value, by_value=False)
+        if not array:
+            return []
+        properties = self.execute_cdp_cmd("Runtime.getProperties", {"objectId": array, "ownProperties": True})
+        # Array indices, back in document order
+        items = sorted(
+            (int(prop["name"]), prop["value"]["objectId"])
+            for prop in properties.get("result", [])
+            if prop["name"].isdigit() and prop.get("value", {}).get("objectId")
+        )
+        return [CdpElement(self, object_id) for _, object_id in items]
+
+    def find_elements(self, by, value):
+        return self._find(by, value)
+
+    def find_element(self, by, value):
+        elements = self._find(by, value)
+        if not elements:
+            raise NoSuchElementException(f"No element for {by} {value}")
+        return elements[0]
+
+    def release_objects(self):
+        """Free the remote objects the last scrape created (its found elements)"""
+        self.execute_cdp_cmd("Runtime.releaseObjectGroup", {"objectGroup": OBJECT_GROUP})
+
+    def get_cookie(self, name):
+        cookies = self.execute_cdp_cmd("Network.getCookies", {}).get("cookies", [])
+        return next((cookie for cookie in cookies if cookie["name"] == name), None)
+
+    def add_cookie(self, cookie):
+        cookie = {key: value for key, value in cookie.items() if key != "expirationDate"}
+        self.execute_cdp_cmd("Network.setCookie", cookie)
+
+    def delete_all_cookies(self):
+        self.execute_cdp_cmd("Network.clearBrowserCookies", {})
+
+    def quit(self):
+        """Close the tab and dispose of its browser context"""
+        if self._closed:
+            return
+        self._closed = True
+        self.browser.tab_closed()
+        try:
+            if self.browser.alive:
+                self.clear_deadline()
+                try:
+                    self.browser.send("Target.closeTarget", {"targetId": self.target_id}, timeout=10)
+                except CdpError:
+                    # Already closed by a tab timeout or a crash
+                    pass
+                self.browser.send("Target.disposeBrowserContext", {"browserContextId": self.context_id}, timeout=10)
+        finally:
+            if self.browser.connection is not None and self.browser.loop.is_running():
+                self.browser.loop.call_soon_threadsafe(self.browser.connection.forget, self.session_id)
+
+
+class CdpElement:
+    """A DOM node held by a tab, with the WebElement methods the scrapers call"""
+
+    def __init__(self, driver, object_id):
+        self.driver = driver
+        self.object_id = object_id
+
+    def _call(self, function, *args, by_value=True):
+        try:
+            result = self.driver.execute_cdp_cmd("Runtime.callFunctionOn", {
+                "functionDeclaration": function,
+                "objectId": self.object_id,
+                "arguments": [_call_argument(arg) for arg in args],
+                "returnByValue": by_value,
+                "objectGroup": OBJECT_GROUP,
+            })
+        except CdpError as e:
+            if "object" in str(e).lower() or "context" in str(e).lower():
+                raise StaleElementReferenceException(str(e))
+            raise
+        return _unwrap(result, by_value)
+
+    @property
+    def text(self):
+        return self._call(ELEMENT_TEXT_JS)
+
+    def get_attribute(self, name):
+        return self._call(ELEMENT_ATTRIBUTE_JS, name)
+
+    def is_displayed(self):
+        return bool(self._call(ELEMENT_DISPLAYED_JS))
+
+    def is_enabled(self):
+        return bool(self._call(ELEMENT_ENABLED_JS))
+
+    def click(self):
+        self._call(ELEMENT_CLICK_JS)
+
+    def find_elements(self, by, value):
+        return self.driver._find(by, value, root=self)
+
+    def find_element(self, by, value):
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"No element for {by} {value}")
+        return elements[0]
+
+
+def _call_argument(arg):
+    if isinstance(arg, CdpElement):
+        return {"objectId": arg.object_id}
+    return {"value": arg}
+
+
+def _unwrap(result, by_value):
+    """Value (or remote object id) of a Runtime.evaluate / callFunctionOn result"""
+    if "exceptionDetails" in result:
+        details = result["exceptionDetails"]
+        message = details.get("exception", {}).get("description") or details.get("text")
+        raise JavascriptException(message)
+    remote = result.get("result", {})
+    if by_value:
+        return remote.get("value")
+    return remote.get("objectId")
@@ -1,58 +1,137 @@
-from selenium import webdriver
-from time import sleep
-from services.scraping_utils import options, get_chrome_service, search_for_company_name, search_for_company_industry, search_for_company_about, add_session_cookie
+import logging
+from services.scraping_utils import search_for_company_name, search_for_company_industry, search_for_company_about
+from services.driver_pool import driver_pool
+from services.account_registry import account_registry, AccountUnavailableError
+from services.session_state import SESSION_EXPIRED_ERROR
+from services.throttle import throttle, classify_page, ThrottleError
+from services.page_waits import wait_for_any_xpath, PAGE_READY_TIMEOUT
+from services.timing import PhaseTimer
+from services.metrics import record_outcome, record_fields
+from services.html_parser import parse_company_html, parse_in_worker
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# The company top card is rendered once any of these is present
+COMPANY_READY_XPATHS = [
+    "//h1[contains(@class, 'org-top-card-summary__title')]",
+    "//h1[contains(@class, 'company-name')]",
+    "//main//h1",
+]
 
 
 def scrape_linkedin_company(linkedin_id):
     """Scraping linkedIn company data"""
+    timer = PhaseTimer("company")
     try:
-        print(f"[INFO] Creating WebDriver for company ID: {linkedin_id}")
-        # Setup Selenium WebDriver
-        driver = webdriver.Chrome(service=get_chrome_service(), options=options)
-        print(f"[INFO] WebDriver created successfully for company ID: {linkedin_id}")
-
-        # Load cookies from the file
-        print(f"[INFO] Loading session cookies for company ID: {linkedin_id}")
-        add_session_cookie(driver)
-
-        print(f"[INFO] Scraping data for company ID: {linkedin_id}")
+        with timer.phase("throttle_wait"):
+            throttle.acquire()
+    except ThrottleError as e:
+        record_outcome("company", "rejected")
+        logger.error(f"Throttled before scraping company {linkedin_id}: {e}")
+        return {"error": str(e)}
+    try:
+        with timer.phase("account_wait"):
+            account = account_registry.acquire()
+    except AccountUnavailableError as e:
+        throttle.release("aborted")
+        record_outcome("company", "rejected")
+        logger.error(f"No LinkedIn account available for company {linkedin_id}: {e}")
+        return {"error": str(e)}
+    try:
+        logger.info(f"Borrowing pooled WebDriver ({account.name}) for company ID: {linkedin_id}")
+        with timer.phase("driver_acquire"):
+            pooled = driver_pool.acquire(account)
+    except Exception as e:
+        account_registry.release(account, "aborted")
+        throttle.release("aborted")
+        record_outcome("company", "aborted")
+        logger.error(f"Could not get a WebDriver for company ID {linkedin_id}: {e}")
+        return {"error": f"WebDriver could not be created: {str(e)}"}
+    driver = pooled.driver
+    broken = False
+    outcome = "error"
+    try:
+        logger.info(f"Scraping data for company ID: {linkedin_id}")
 
         # LinkedIn URL for the company
-        company_url = f"https://www.linkedin.com/company/{linkedin_id}/"
+        company_url = f"{settings.LINKEDIN_BASE_URL}/company/{linkedin_id}/"
 
         # Navigate to the LinkedIn company
-        driver.get(company_url)
-        print(f"[INFO] Navigated to company URL: {company_url}")
+        with timer.phase("navigation"):
+            driver.get(company_url)
+        logger.info(f"Navigated to company URL: {company_url}")
+        pushback, reason = classify_page(driver)
+        if pushback == "expired":
+            account_registry.mark_expired(account, reason)
+            outcome = "expired"
+            return {"error": SESSION_EXPIRED_ERROR}
+        if pushback:
+            logger.error(f"LinkedIn pushed back on company {linkedin_id}: {reason}")
+            outcome = pushback
+            return {"error": f"LinkedIn is rate limiting requests ({pushback}), retry later"}
+        account_registry.mark_valid(account)
 
         if "/unavailable" in driver.current_url or "Page not found" in driver.page_source:
-            driver.quit()
-            print(f"[ERROR] Company profile for {linkedin_id} not found (404)")
+            logger.error(f"Company profile for {linkedin_id} not found (404)")
+            # Repeated /unavailable redirects are also how LinkedIn sheds load
+            outcome = "unavailable" if "/unavailable" in driver.current_url else "not_found"
             return {"error": f"Company profile for {linkedin_id} not found."}
-        
-        sleep(1)
+
+        with timer.phase("page_ready"):
+            if not wait_for_any_xpath(driver, COMPANY_READY_XPATHS, PAGE_READY_TIMEOUT):
+                logger.error(f"Top card for company {linkedin_id} did not render within {PAGE_READY_TIMEOUT:.1f}s")
 
         # Scrape name, about from the LinkedIn company
         try:
-            print(f"[INFO] Extracting company details for {linkedin_id}")
-            name = search_for_company_name(driver)
-            if not name:
-                driver.quit()
-                print(f"[ERROR] Scraping failed due to session token not setup or expired for {linkedin_id}")
-                return {"error": "Your Linkedin session token is not set up correctly or has expired"}
-            industry = search_for_company_industry(driver)
-            about = search_for_company_about(driver)
+            logger.info(f"Extracting company details for {linkedin_id}")
+            if settings.EXTRACTION_MODE == "lxml":
+                # Snapshot the DOM, give the browser back, parse offline
+                with timer.phase("snapshot"):
+                    page_source = driver.page_source
+                driver_pool.release(pooled)
+                pooled = None
+                with timer.phase("extract"):
+                    fields = parse_in_worker(parse_company_html, page_source)
+                name, industry, about = fields["name"], fields["industry"], fields["about"]
+                if not name:
+                    record_fields("company", {"name": None})
+                    logger.error(f"Could not find name for company {linkedin_id}, possibly due to XPath failure or page structure change")
+                    return {"error": "Could not find company name, possibly due to XPath failure or page structure change"}
+            else:
+                with timer.phase("extract"):
+                    name = search_for_company_name(driver)
+                    if not name:
+                        record_fields("company", {"name": None})
+                        logger.error(f"Could not find name for company {linkedin_id}, possibly due to XPath failure or page structure change")
+                        return {"error": "Could not find company name, possibly due to XPath failure or page structure change"}
+                    industry = search_for_company_industry(driver)
+                    about = search_for_company_about(driver)
         except Exception as e:
-            print(f"[ERROR] Exception while scraping details for company {linkedin_id}: {e}")
+            logger.error(f"Exception while scraping details for company {linkedin_id}: {e}")
             return {"error": f"Error searching for details for company {linkedin_id}"}
 
-        driver.quit()
-        print(f"[INFO] Successfully fetched details for company {linkedin_id}")
+        logger.info(f"Successfully fetched details for company {linkedin_id}")
+        record_fields("company", {"name": name, "industry": industry, "about": about})
+        outcome = "ok"
         return {
             "linkedin_id": linkedin_id,
             "name": name,
             "industry": industry,
             "about": about,
+            "timings": timer.report(),
         }
     except Exception as e:
-        print(f"[ERROR] Exception while fetching details for company {linkedin_id}: {e}")
-        return {"error": f"Error fetching company details for {linkedin_id}"}
\ No newline at end of file
+        logger.error(f"Exception while fetching details for company {linkedin_id}: {e}")
+        broken = True
+        outcome = "aborted"
+        return {"error": f"Error fetching company details for {linkedin_id}"}
+    finally:
+        logger.info(f"Phase timings for company {linkedin_id}: {timer.report()}")
+        if pooled is not None:
+            logger.info(f"Returning WebDriver to pool for company ID: {linkedin_id}")
+            driver_pool.release(pooled, broken=broken)
+        account_registry.release(account, outcome)
+        throttle.release(outcome)
+        record_outcome("company", outcome)
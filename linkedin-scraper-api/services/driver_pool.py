@@ -0,0 +1,223 @@
+import logging
+import queue
+import threading
+import time
+from services.browser_engine import browser_engine
+from services.scraping_utils import add_session_cookie, apply_resource_blocking
+from services.throttle import retry_with_backoff
+from services.metrics import observe_phase
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class DriverPoolError(Exception):
+    """Raised when no healthy WebDriver can be handed out"""
+
+
+class PooledDriver:
+    """A WebDriver owned by the pool, plus its usage bookkeeping"""
+
+    def __init__(self, driver, account=None):
+        self.driver = driver
+        # LinkedIn account whose li_at cookie the driver currently holds
+        self.account = account
+        self.uses = 0
+        self.created_at = time.time()
+
+
+class DriverPool:
+    """Pool of pre-launched, already-authenticated Chrome drivers.
+
+    Drivers are launched (and given the LinkedIn session cookie) once, then
+    borrowed by the scrapers. A driver is health-checked before every borrow
+    and recycled after `max_uses` scrapes or as soon as it is found broken.
+    """
+
+    def __init__(self, size, max_uses, acquire_timeout):
+        self.size = size
+        self.max_uses = max_uses
+        self.acquire_timeout = acquire_timeout
+        # LIFO so the most recently used (warmest) driver is handed out first
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._alive = 0
+        self._in_use = 0
+        self._launched = 0
+        self._recycled = 0
+
+    @staticmethod
+    def _authenticate(driver, account, clear=False):
+        start = time.perf_counter()
+        if account is None:
+            add_session_cookie(driver, clear=clear)
+        else:
+            add_session_cookie(driver, token=account.token, expires=account.expires, clear=clear)
+        observe_phase("pool", "cookie_setup", time.perf_counter() - start)
+
+    def _launch(self, account=None):
+        """Start a new Chrome instance (a tab with the CDP engine) and authenticate it"""
+        logger.info("Creating pooled WebDriver")
+        start = time.perf_counter()
+        try:
+            driver = retry_with_backoff(
+                browser_engine.launch,
+                description="WebDriver creation",
+            )
+        except Exception as e:
+            raise DriverPoolError(
+                f"Failed to create WebDriver after {settings.SCRAPER_RETRY_ATTEMPTS} attempts: {str(e)}"
+            )
+        observe_phase("pool", "launch", time.perf_counter() - start)
+        try:
+            apply_resource_blocking(driver)
+            self._authenticate(driver, account)
+        except Exception:
+            # Don't orphan the Chrome
+            try:
+                driver.quit()
+            except Exception as e:
+                logger.error(f"Error quitting WebDriver after failed setup: {e}")
+            raise
+        with self._lock:
+            self._launched += 1
+        logger.info("Pooled WebDriver created and authenticated")
+        return PooledDriver(driver, account)
+
+    def _reserve_slot(self):
+        """Reserve capacity for a new driver, returns False when the pool is full"""
+        with self._lock:
+            if self._alive >= self.size:
+                return False
+            self._alive += 1
+            return True
+
+    def _discard(self, pooled):
+        """Quit a driver and free its slot"""
+        with self._lock:
+            self._alive -= 1
+            self._recycled += 1
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            logger.error(f"Error quitting pooled WebDriver: {e}")
+
+    @staticmethod
+    def _is_healthy(pooled):
+        """Cheap round-trip to make sure the browser session is still alive"""
+        try:
+            pooled.driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def start(self, accounts=None):
+        """Pre-launch drivers up to the pool size, spread over `accounts`"""
+        launched = 0
+        while self._reserve_slot():
+            account = accounts[launched % len(accounts)] if accounts else None
+            launched += 1
+            try:
+                self._idle.put(self._launch(account))
+            except Exception as e:
+                with self._lock:
+                    self._alive -= 1
+                logger.error(f"Could not pre-launch WebDriver: {e}")
+                break
+
+    def acquire(self, account=None):
+        """Borrow a healthy driver authenticated as `account`.
+
+        Launches a driver if the pool has spare capacity; an idle driver holding
+        another account's session is re-seeded with a cookie swap (no page load).
+        """
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                pooled = None
+                if self._reserve_slot():
+                    try:
+                        pooled = self._launch(account)
+                    except Exception:
+                        with self._lock:
+                            self._alive -= 1
+                        raise
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise DriverPoolError("Timed out waiting for a free WebDriver")
+                    try:
+                        pooled = self._idle.get(timeout=remaining)
+                    except queue.Empty:
+                        raise DriverPoolError("Timed out waiting for a free WebDriver")
+
+            if not self._is_healthy(pooled):
+                logger.error("Pooled WebDriver failed health check, recycling it")
+                self._discard(pooled)
+                continue
+
+            if account is not None and pooled.account is not account:
+                try:
+                    self._authenticate(pooled.driver, account, clear=True)
+                    pooled.account = account
+                except Exception as e:
+                    logger.error(f"Could not switch pooled WebDriver to account {account.name}, recycling it: {e}")
+                    self._discard(pooled)
+                    continue
+
+            with self._lock:
+                self._in_use += 1
+            browser_engine.set_deadline(pooled.driver)
+            return pooled
+
+    def release(self, pooled, broken=False):
+        """Return a driver to the pool, recycling it if worn out or broken"""
+        pooled.uses += 1
+        with self._lock:
+            self._in_use -= 1
+        browser_engine.clear_deadline(pooled.driver)
+        if broken or pooled.uses >= self.max_uses:
+            reason = "broken" if broken else f"reached {self.max_uses} uses"
+            logger.info(f"Recycling pooled WebDriver ({reason})")
+            self._discard(pooled)
+            return
+        try:
+            browser_engine.release_objects(pooled.driver)
+            # Leave the previous page so the next scrape's waits can't match its DOM
+            pooled.driver.get("about:blank")
+        except Exception as e:
+            logger.error(f"Could not reset pooled WebDriver, recycling it: {e}")
+            self._discard(pooled)
+            return
+        self._idle.put(pooled)
+
+    def close(self):
+        """Quit every idle driver"""
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(pooled)
+
+    def stats(self):
+        """Pool occupancy, reported by /health"""
+        with self._lock:
+            return {
+                "size": self.size,
+                "alive": self._alive,
+                "in_use": self._in_use,
+                "idle": self._idle.qsize(),
+                "launched": self._launched,
+                "recycled": self._recycled,
+            }
+
+
+# Global pool shared by the profile and company scrapers
+driver_pool = DriverPool(
+    size=settings.DRIVER_POOL_SIZE,
+    max_uses=settings.DRIVER_MAX_USES,
+    acquire_timeout=settings.DRIVER_ACQUIRE_TIMEOUT,
+)
@@ -0,0 +1,109 @@
+import logging
+import random
+import threading
+import time
+from services.account_registry import account_registry, AccountUnavailableError
+from services.throttle import throttle, ThrottleError
+from services.timing import PhaseTimer
+from services.metrics import record_outcome
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Stand-in for the Selenium scrapers (SCRAPER_BACKEND=fake), for load tests of
+# the service without Chrome or LinkedIn. A scrape goes through the same
+# throttle, account registry and scrape executor as a real one, holds one of
+# DRIVER_POOL_SIZE "browser" slots for a lognormally distributed time and
+# then succeeds or fails with the configured error mix.
+
+# Error results, the same strings the real scrapers return
+FAKE_ERRORS = {
+    "not_found": "{title} for {linkedin_id} not found.",
+    "throttled": "LinkedIn is rate limiting requests (throttled), retry later",
+    "error": "Error fetching {scrape_type} details for {linkedin_id}",
+}
+
+_browsers = threading.BoundedSemaphore(settings.DRIVER_POOL_SIZE)
+
+
+def _latency():
+    """Seconds a fake scrape holds its browser slot"""
+    if settings.FAKE_SCRAPER_JITTER <= 0:
+        return settings.FAKE_SCRAPER_LATENCY
+    # Median FAKE_SCRAPER_LATENCY with a long right tail, like real page loads
+    return settings.FAKE_SCRAPER_LATENCY * random.lognormvariate(0, settings.FAKE_SCRAPER_JITTER)
+
+
+def _outcome():
+    roll = random.random()
+    for outcome, rate in (
+        ("throttled", settings.FAKE_SCRAPER_THROTTLE_RATE),
+        ("not_found", settings.FAKE_SCRAPER_NOT_FOUND_RATE),
+        ("error", settings.FAKE_SCRAPER_ERROR_RATE),
+    ):
+        if roll < rate:
+            return outcome
+        roll -= rate
+    return "ok"
+
+
+def _fake_scrape(scrape_type, linkedin_id, fields):
+    timer = PhaseTimer(scrape_type)
+    try:
+        with timer.phase("throttle_wait"):
+            throttle.acquire()
+    except ThrottleError as e:
+        record_outcome(scrape_type, "rejected")
+        return {"error": str(e)}
+    try:
+        with timer.phase("account_wait"):
+            account = account_registry.acquire()
+    except AccountUnavailableError as e:
+        throttle.release("aborted")
+        record_outcome(scrape_type, "rejected")
+        return {"error": str(e)}
+    outcome = "aborted"
+    try:
+        with timer.phase("driver_acquire"):
+            if not _browsers.acquire(timeout=settings.DRIVER_ACQUIRE_TIMEOUT):
+                return {"error": "WebDriver could not be created: no driver became free"}
+        try:
+            with timer.phase("navigation"):
+                time.sleep(_latency())
+        finally:
+            _browsers.release()
+        outcome = _outcome()
+        if outcome != "ok":
+            title = "Profile" if scrape_type == "profile" else "Company profile"
+            return {"error": FAKE_ERRORS[outcome].format(title=title, scrape_type=scrape_type, linkedin_id=linkedin_id)}
+        return {"linkedin_id": linkedin_id, **fields, "timings": timer.report()}
+    finally:
+        account_registry.release(account, outcome)
+        throttle.release(outcome)
+        record_outcome(scrape_type, outcome)
+
+
+def fake_scrape_profile(linkedin_id, fields=None):
+    """Fake scrape_linkedin_profile"""
+    section = {"positions": ["Software Engineer"], "institutions": ["Fixture Corp"], "dates": ["2020 - Present"]}
+    profile = {
+        "name": f"Fake {linkedin_id}",
+        "avatar": None,
+        "headline": "Software Engineer at Fixture Corp",
+        "about": {"positions": ["Fake profile served by the fake scraper backend"], "institutions": ["About"], "dates": [""]},
+        "education": dict(section, positions=["MSc Computer Science"], institutions=["Example University"]),
+        "experience": section,
+    }
+    if fields is not None:
+        profile = {field: value for field, value in profile.items() if field in fields}
+    return _fake_scrape("profile", linkedin_id, profile)
+
+
+def fake_scrape_company(linkedin_id):
+    """Fake scrape_linkedin_company"""
+    return _fake_scrape("company", linkedin_id, {
+        "name": f"Fake {linkedin_id}",
+        "industry": "Software Development",
+        "about": "Fake company served by the fake scraper backend",
+    })
@@ -0,0 +1,283 @@
+import json
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from lxml import etree, html as lxml_html
+from services.scraping_utils import (
+    NAME_XPATHS, AVATAR_XPATHS, HEADLINE_XPATHS, HEADLINE_MARKERS,
+    SECTION_ITEM_XPATH, EXPERIENCE_ITEM_XPATHS, EDUCATION_ITEM_XPATHS, ABOUT_TEXT_XPATHS,
+    COMPANY_NAME_XPATHS, COMPANY_INDUSTRY_XPATHS, COMPANY_ABOUT_XPATHS, section_xpaths,
+)
+from services.selector_stats import selector_telemetry, MISS
+from config import settings
+
+
+# Offline extraction engine: evaluates the selector chains from scraping_utils
+# with compiled lxml XPath over one page_source snapshot (or a saved HTML file),
+# so no WebDriver round-trips are needed once the DOM has been expanded.
+#
+# Parsing may run in another process, so the parsers don't touch the selector
+# telemetry; like the in-page script they return `selector_hits` instead.
+
+class _Chain:
+    """A named selector chain with its XPaths compiled"""
+
+    def __init__(self, name, xpaths):
+        self.name = name
+        self.xpaths = [(xpath, etree.XPath(xpath)) for xpath in xpaths]
+
+
+def _hit(hits, chain, xpath):
+    chain_hits = hits.setdefault(chain.name, {})
+    result = xpath or MISS
+    chain_hits[result] = chain_hits.get(result, 0) + 1
+
+
+_NAME = _Chain("name", NAME_XPATHS)
+_AVATAR = _Chain("avatar", AVATAR_XPATHS)
+_HEADLINE = _Chain("headline", HEADLINE_XPATHS)
+# Equivalent of the CSS fallback in search_for_candidate_headline
+_HEADLINE_FALLBACK = etree.XPath(
+    "//div[contains(@class, 'text-body-medium') or contains(@class, 'break-words')]"
+)
+_SECTIONS = {
+    name: _Chain(f"section.{name.lower()}", section_xpaths(name))
+    for name in ("Education", "Experience", "About")
+}
+_SECTION_ITEM = etree.XPath(SECTION_ITEM_XPATH)
+_ITEMS = {
+    "Experience": {field: _Chain(f"experience.{field}", chain) for field, chain in EXPERIENCE_ITEM_XPATHS.items()},
+    "Education": {field: _Chain(f"education.{field}", chain) for field, chain in EDUCATION_ITEM_XPATHS.items()},
+}
+_ABOUT_TEXT = _Chain("about.text", ABOUT_TEXT_XPATHS)
+_COMPANY_NAME = _Chain("company.name", COMPANY_NAME_XPATHS)
+_COMPANY_INDUSTRY = _Chain("company.industry", COMPANY_INDUSTRY_XPATHS)
+_COMPANY_ABOUT = _Chain("company.about", COMPANY_ABOUT_XPATHS)
+
+
+def _text(element):
+    """Rendered-ish text of an element: trimmed lines with collapsed whitespace"""
+    lines = (" ".join(line.split()) for line in element.text_content().splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def _first(chain, context, hits):
+    for source, xpath in chain.xpaths:
+        matches = xpath(context)
+        if matches:
+            _hit(hits, chain, source)
+            return matches[0]
+    _hit(hits, chain, None)
+    return None
+
+
+def _text_by_chain(chain, context, hits):
+    """Same semantics as find_by_chain_or_None: text of the first matching XPath"""
+    element = _first(chain, context, hits)
+    return _text(element) if element is not None else None
+
+
+def _avatar(root, hits):
+    for source, xpath in _AVATAR.xpaths:
+        for element in xpath(root)[:1]:
+            src = element.get("src")
+            if src and "profile" in src.lower():
+                _hit(hits, _AVATAR, source)
+                return src
+    _hit(hits, _AVATAR, None)
+    return None
+
+
+def _headline(root, hits):
+    headline = _text_by_chain(_HEADLINE, root, hits)
+    if headline:
+        return headline
+    for element in _HEADLINE_FALLBACK(root):
+        text = _text(element)
+        if len(text) > 10 and any(marker in text for marker in HEADLINE_MARKERS):
+            return text
+    return None
+
+
+def _section(root, section_name, hits):
+    found_elements = {'positions': [], 'institutions': [], 'dates': []}
+    target_section = _first(_SECTIONS[section_name], root, hits)
+    if target_section is None:
+        return found_elements
+
+    if section_name == "About":
+        about_text = _text_by_chain(_ABOUT_TEXT, target_section, hits)
+        if about_text:
+            found_elements['positions'].append(about_text)
+            found_elements['institutions'].append("About")
+            found_elements['dates'].append("")
+        return found_elements
+
+    chains = _ITEMS[section_name]
+    for item in _SECTION_ITEM(target_section):
+        position = _text_by_chain(chains["position"], item, hits)
+        institution = _text_by_chain(chains["institution"], item, hits)
+        date = _text_by_chain(chains["date"], item, hits)
+        if position: found_elements['positions'].append(position)
+        if institution: found_elements['institutions'].append(institution)
+        if date: found_elements['dates'].append(date)
+    return found_elements
+
+
+def _profile_fields(root):
+    hits = {}
+    name = _text_by_chain(_NAME, root, hits)
+    if not name:
+        return {"name": None, "selector_hits": hits}
+    return {
+        "name": name,
+        "avatar": _avatar(root, hits),
+        "headline": _headline(root, hits),
+        "education": _section(root, "Education", hits),
+        "experience": _section(root, "Experience", hits),
+        "about": _section(root, "About", hits),
+        "selector_hits": hits,
+    }
+
+
+def _company_fields(root):
+    hits = {}
+    return {
+        "name": _text_by_chain(_COMPANY_NAME, root, hits),
+        "industry": _text_by_chain(_COMPANY_INDUSTRY, root, hits),
+        "about": _text_by_chain(_COMPANY_ABOUT, root, hits),
+        "selector_hits": hits,
+    }
+
+
+def parse_profile_html(page_source):
+    """Extract profile fields from HTML, same shape as extract_profile_fields"""
+    return _profile_fields(lxml_html.fromstring(page_source))
+
+
+def parse_company_html(page_source):
+    """Extract company fields from HTML, same keys as scrape_linkedin_company"""
+    return _company_fields(lxml_html.fromstring(page_source))
+
+
+# Server-rendered pages also embed their data as JSON: schema.org JSON-LD for
+# crawlers and, on logged-in pages, the API payloads in hidden <code> blobs.
+# The HTTP backend fills the fields the selectors miss from them.
+_JSON_LD = etree.XPath("//script[@type='application/ld+json']/text()")
+_CODE_BLOBS = etree.XPath("//code/text()")
+
+
+def _json_documents(root, xpath):
+    for text in xpath(root):
+        try:
+            yield json.loads(text)
+        except ValueError:
+            continue
+
+
+def _objects(document):
+    """Every JSON object nested in a document"""
+    stack = [document]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            yield item
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+
+
+def _types(item):
+    types = item.get("@type") or []
+    return types if isinstance(types, list) else [types]
+
+
+def _fill(fields, key, value):
+    if not fields.get(key) and isinstance(value, str) and value.strip():
+        fields[key] = value.strip()
+
+
+def _fill_company(root, fields, linkedin_id):
+    for document in _json_documents(root, _JSON_LD):
+        for item in _objects(document):
+            if {"Organization", "Corporation"} & set(_types(item)):
+                _fill(fields, "name", item.get("name"))
+                _fill(fields, "about", item.get("description"))
+                _fill(fields, "industry", item.get("industry"))
+    for document in _json_documents(root, _CODE_BLOBS):
+        for item in _objects(document):
+            if item.get("universalName") != linkedin_id:
+                continue
+            _fill(fields, "name", item.get("name"))
+            _fill(fields, "about", item.get("description"))
+            for industry in item.get("companyIndustries") or item.get("industries") or []:
+                _fill(fields, "industry", industry.get("localizedName") if isinstance(industry, dict) else industry)
+
+
+def _fill_profile(root, fields):
+    for document in _json_documents(root, _JSON_LD):
+        for item in _objects(document):
+            if "Person" in _types(item):
+                _fill(fields, "name", item.get("name"))
+                job_title = item.get("jobTitle")
+                _fill(fields, "headline", ", ".join(job_title) if isinstance(job_title, list) else job_title)
+                image = item.get("image")
+                _fill(fields, "avatar", image.get("contentUrl") if isinstance(image, dict) else image)
+
+
+def parse_company_page(page_source, linkedin_id):
+    """parse_company_html, with missing fields taken from the embedded JSON"""
+    root = lxml_html.fromstring(page_source)
+    fields = _company_fields(root)
+    _fill_company(root, fields, linkedin_id)
+    return fields
+
+
+def parse_profile_page(page_source, linkedin_id):
+    """parse_profile_html, with missing top-card fields taken from the JSON-LD"""
+    root = lxml_html.fromstring(page_source)
+    fields = _profile_fields(root)
+    _fill_profile(root, fields)
+    return fields
+
+
+def parse_file(path, parser=parse_profile_html):
+    """Parse a saved HTML file, e.g. the fixtures in test/htmls"""
+    # Saved page_source snapshots are UTF-8 and usually lack a charset meta tag
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return parser(f.read())
+
+
+# Parsing is CPU-bound, so it runs in separate worker processes. The pool is
+# created on first use with the spawn context (safe in a threaded server).
+_parse_executor = None
+_parse_executor_lock = threading.Lock()
+
+
+def get_parse_executor():
+    global _parse_executor
+    with _parse_executor_lock:
+        if _parse_executor is None:
+            _parse_executor = ProcessPoolExecutor(
+                max_workers=settings.PARSER_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+    return _parse_executor
+
+
+def parse_in_worker(parser, page_source):
+    """Run a parser on a parse worker process and wait for the result.
+
+    The selector hits of the parse are recorded here, in the server process.
+    """
+    fields = get_parse_executor().submit(parser, page_source).result()
+    selector_telemetry.record_hits(fields.pop("selector_hits", None))
+    return fields
+
+
+def shutdown_parse_executor():
+    global _parse_executor
+    with _parse_executor_lock:
+        if _parse_executor is not None:
+            _parse_executor.shutdown(wait=False, cancel_futures=True)
+            _parse_executor = None
@@ -0,0 +1,230 @@
+import logging
+import threading
+from functools import partial
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from services.candidate_scraper import scrape_linkedin_profile
+from services.company_scraper import scrape_linkedin_company
+from services.account_registry import account_registry, AccountUnavailableError
+from services.session_state import AUTH_WALL_MARKERS
+from services.throttle import throttle, ThrottleError, CHALLENGE_MARKERS
+from services.timing import PhaseTimer
+from services.metrics import record_outcome, record_fields
+from services.html_parser import parse_company_page, parse_profile_page, parse_in_worker
+from services.scraping_utils import session_cookie_domain
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# HTTP scrape backend (PROFILE_BACKEND / COMPANY_BACKEND = "http"): fetch the
+# server-rendered page over a keep-alive session carrying the account's li_at
+# cookie and parse it with lxml, no browser involved. The page is parsed with
+# the usual selector chains plus its embedded JSON-LD / <code> data; when a
+# required field is still missing, or LinkedIn won't serve the page to a plain
+# HTTP client, the Selenium scraper takes over.
+
+# Sections LinkedIn renders lazily on scroll are missing from the server HTML,
+# so a profile without them goes to the browser rather than coming back short
+REQUIRED_FIELDS = {
+    "profile": ("name", "headline", "experience", "education"),
+    "company": ("name", "industry", "about"),
+}
+PAGE_PARSERS = {"profile": parse_profile_page, "company": parse_company_page}
+SELENIUM_SCRAPERS = {"profile": scrape_linkedin_profile, "company": scrape_linkedin_company}
+PAGE_PATHS = {"profile": "in", "company": "company"}
+NOT_FOUND_ERRORS = {
+    "profile": "Profile for {linkedin_id} not found.",
+    "company": "Company profile for {linkedin_id} not found.",
+}
+
+# LinkedIn answers clients it does not trust with status 999 instead of the page
+REJECTED_STATUSES = (999,)
+
+
+class HttpSessions:
+    """One keep-alive requests.Session per LinkedIn account, holding its li_at cookie"""
+
+    def __init__(self, pool_size, user_agent):
+        self.pool_size = pool_size
+        self.user_agent = user_agent
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def _new_session(self, account):
+        session = requests.Session()
+        # Keep up to pool_size connections to LinkedIn open, no silent retries
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({
+            "User-Agent": self.user_agent,
+            "Accept": "text/html,application/xhtml+xml",
+            "Accept-Language": "en-US,en;q=0.9",
+        })
+        domain = session_cookie_domain()
+        if "." not in domain:
+            # http.cookiejar matches a dotless host (e.g. localhost) as "<host>.local"
+            domain += ".local"
+        session.cookies.set(
+            "li_at", account.token, domain=domain, path="/",
+            secure=settings.LINKEDIN_BASE_URL.startswith("https://"),
+        )
+        return session
+
+    def get(self, account):
+        with self._lock:
+            token, session = self._sessions.get(account.name, (None, None))
+            if session is None or token != account.token:
+                if session is not None:
+                    session.close()
+                session = self._new_session(account)
+                self._sessions[account.name] = (account.token, session)
+            return session
+
+    def close(self):
+        with self._lock:
+            for _, session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+http_sessions = HttpSessions(pool_size=settings.SCRAPER_MAX_WORKERS, user_agent=settings.HTTP_USER_AGENT)
+
+_lock = threading.Lock()
+_counts = {"profile": {"http": 0, "fallback": 0}, "company": {"http": 0, "fallback": 0}}
+
+
+def _classify_response(response):
+    """Like classify_page for an HTTP response: (outcome, reason) or (None, None).
+
+    "rejected" means LinkedIn would not serve the page to a plain HTTP
+    client; that says nothing about the account, the browser may still get it.
+    """
+    path = urlparse(response.url).path
+    if path.startswith(CHALLENGE_MARKERS):
+        return "blocked", f"security challenge at {response.url}"
+    if response.status_code == 429:
+        return "throttled", f"HTTP 429 at {response.url}"
+    if response.status_code in REJECTED_STATUSES:
+        return "rejected", f"HTTP {response.status_code} at {response.url}"
+    if path.startswith(AUTH_WALL_MARKERS):
+        return "rejected", f"redirected to {response.url}"
+    if "/unavailable" in path:
+        return "unavailable", f"redirected to {response.url}"
+    if response.status_code == 404 or "/404" in path:
+        return "not_found", f"HTTP 404 at {response.url}"
+    if response.status_code != 200:
+        return "rejected", f"HTTP {response.status_code} at {response.url}"
+    return None, None
+
+
+def _missing_fields(scrape_type, fields, requested=None):
+    missing = []
+    for field in REQUIRED_FIELDS[scrape_type]:
+        if requested is not None and field not in requested:
+            continue
+        value = fields.get(field)
+        # Sections come back as {'positions': [...], ...} even when empty
+        if isinstance(value, dict):
+            value = value.get("positions")
+        if not value:
+            missing.append(field)
+    return missing
+
+
+def _http_scrape(scrape_type, linkedin_id, requested=None):
+    """Scrape the server-rendered page; None when the Selenium scraper has to take over"""
+    timer = PhaseTimer(scrape_type)
+    try:
+        with timer.phase("throttle_wait"):
+            throttle.acquire()
+    except ThrottleError as e:
+        record_outcome(scrape_type, "rejected")
+        logger.error(f"Throttled before fetching {scrape_type} {linkedin_id}: {e}")
+        return {"error": str(e)}
+    try:
+        with timer.phase("account_wait"):
+            account = account_registry.acquire()
+    except AccountUnavailableError as e:
+        throttle.release("aborted")
+        record_outcome(scrape_type, "rejected")
+        logger.error(f"No LinkedIn account available for {scrape_type} {linkedin_id}: {e}")
+        return {"error": str(e)}
+    # Neither a success nor pushback for the throttle and the account
+    outcome = "incomplete"
+    try:
+        url = f"{settings.LINKEDIN_BASE_URL}/{PAGE_PATHS[scrape_type]}/{linkedin_id}/"
+        with timer.phase("http_fetch"):
+            response = http_sessions.get(account).get(url, timeout=settings.HTTP_TIMEOUT)
+        result, reason = _classify_response(response)
+        if result in ("blocked", "throttled"):
+            logger.error(f"LinkedIn pushed back on {scrape_type} {linkedin_id}: {reason}")
+            outcome = result
+            return {"error": f"LinkedIn is rate limiting requests ({result}), retry later"}
+        if result in ("not_found", "unavailable"):
+            logger.error(f"{scrape_type} {linkedin_id} not found: {reason}")
+            outcome = result
+            return {"error": NOT_FOUND_ERRORS[scrape_type].format(linkedin_id=linkedin_id)}
+        if result == "rejected":
+            logger.info(f"HTTP fetch of {scrape_type} {linkedin_id} rejected ({reason}), using the browser")
+            return None
+
+        with timer.phase("extract"):
+            parser = partial(PAGE_PARSERS[scrape_type], linkedin_id=linkedin_id)
+            fields = parse_in_worker(parser, response.text)
+        missing = _missing_fields(scrape_type, fields, requested)
+        if missing:
+            logger.info(f"Server-rendered {scrape_type} {linkedin_id} lacks {', '.join(missing)}, using the browser")
+            return None
+
+        logger.info(f"Fetched {scrape_type} {linkedin_id} over HTTP")
+        record_fields(scrape_type, fields)
+        outcome = "ok"
+        return {"linkedin_id": linkedin_id, **fields, "timings": timer.report()}
+    except requests.RequestException as e:
+        logger.error(f"HTTP fetch of {scrape_type} {linkedin_id} failed, using the browser: {e}")
+        return None
+    except Exception as e:
+        logger.error(f"Exception while parsing {scrape_type} {linkedin_id}, using the browser: {e}")
+        return None
+    finally:
+        logger.info(f"Phase timings for HTTP {scrape_type} {linkedin_id}: {timer.report()}")
+        account_registry.release(account, outcome)
+        throttle.release(outcome)
+        record_outcome(scrape_type, outcome)
+
+
+def scrape_http_first(scrape_type, linkedin_id, fields=None):
+    """Scrape over HTTP, falling back to the Selenium scraper.
+
+    Only the `fields` that were asked for (profiles only) have to be present.
+    """
+    data = _http_scrape(scrape_type, linkedin_id, fields)
+    with _lock:
+        _counts[scrape_type]["http" if data is not None else "fallback"] += 1
+    if data is None:
+        args = (linkedin_id, fields) if fields else (linkedin_id,)
+        data = SELENIUM_SCRAPERS[scrape_type](*args)
+    return data
+
+
+def scrape_profile_http(linkedin_id, fields=None):
+    """HTTP-first scrape_linkedin_profile"""
+    return scrape_http_first("profile", linkedin_id, fields)
+
+
+def scrape_company_http(linkedin_id):
+    """HTTP-first scrape_linkedin_company"""
+    return scrape_http_first("company", linkedin_id)
+
+
+def http_backend_stats():
+    """Scrapes served over HTTP and fallbacks to the browser, reported by /health"""
+    with _lock:
+        return {
+            f"{scrape_type}_{kind}": count
+            for scrape_type, counts in _counts.items()
+            for kind, count in counts.items()
+        }
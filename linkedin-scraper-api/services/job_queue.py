@@ -0,0 +1,358 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+import httpx
+from services.logging_setup import request_id_var
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Priority lanes, lower value is served first
+PRIORITIES = {
+    "interactive": 0,
+    "bulk": 1,
+}
+
+
+class JobQueue:
+    """Persistent queue of scrape jobs served by a bounded pool of async workers.
+
+    Jobs live in a SQLite file, so anything still queued (or interrupted
+    while running) is picked up again after a restart. Interactive jobs are
+    always claimed before bulk ones, and bulk jobs may occupy at most
+    `bulk_workers` workers, never all of them, so an interactive job never
+    waits for a full batch. Finished jobs are deleted `result_ttl` seconds
+    after they finished (checked at start and every PURGE_EVERY jobs).
+
+    Several API processes (uvicorn --workers) may share the file: claims are
+    atomic, running jobs record their owner and heartbeat every
+    `stale_after / 3` seconds, and only the jobs of an owner that died or
+    stopped heartbeating for `stale_after` seconds are queued again.
+    SQLite calls run on the default executor, off the event loop.
+    """
+
+    PURGE_EVERY = 100
+
+    def __init__(self, db_path, workers, bulk_workers, callback_timeout, result_ttl, stale_after):
+        self.db_path = db_path
+        self.workers = workers
+        # One worker is always kept for interactive jobs
+        self.bulk_workers = max(0, min(bulk_workers, workers - 1))
+        self.callback_timeout = callback_timeout
+        self.result_ttl = result_ttl
+        self.stale_after = stale_after
+        # host:pid:random, so a restarted process never mistakes its predecessor's jobs for its own
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._db = None
+        self._lock = threading.Lock()
+        self._handler = None
+        self._tasks = []
+        self._wakeup = None
+        self._running_bulk = 0
+        self._finished = 0
+
+    def _connect(self):
+        if self._db is None:
+            # Autocommit mode, claims open their transaction with BEGIN IMMEDIATE
+            self._db = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+            self._db.row_factory = sqlite3.Row
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY,"
+                " url TEXT NOT NULL,"
+                " type TEXT NOT NULL,"
+                " fields TEXT,"
+                " priority INTEGER NOT NULL,"
+                " status TEXT NOT NULL,"
+                " callback_url TEXT,"
+                " result TEXT,"
+                " error TEXT,"
+                " owner TEXT,"
+                " created_at REAL NOT NULL,"
+                " started_at REAL,"
+                " heartbeat_at REAL,"
+                " finished_at REAL)"
+            )
+            columns = {row["name"] for row in self._db.execute("PRAGMA table_info(jobs)")}
+            for column in ("owner TEXT", "heartbeat_at REAL", "fields TEXT"):
+                # Files created before jobs recorded their owner, or their fields
+                if column.split()[0] not in columns:
+                    self._db.execute(f"ALTER TABLE jobs ADD COLUMN {column}")
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, priority, created_at)"
+            )
+        return self._db
+
+    @staticmethod
+    async def _in_thread(func, *args):
+        """Run a blocking SQLite call on the default executor"""
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    @staticmethod
+    def _to_dict(row):
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job["fields"] = job["fields"].split(",") if job["fields"] else None
+        lanes = {value: name for name, value in PRIORITIES.items()}
+        job["priority"] = lanes.get(job["priority"], job["priority"])
+        return job
+
+    def _insert(self, url, scrape_type, priority, callback_url, fields):
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            db = self._connect()
+            db.execute(
+                "INSERT INTO jobs (id, url, type, fields, priority, status, callback_url, created_at)"
+                " VALUES (?, ?, ?, ?, ?, 'queued', ?, ?)",
+                (job_id, url, scrape_type, ",".join(fields) if fields else None, PRIORITIES[priority],
+                 callback_url, time.time()),
+            )
+        return self._get(job_id)
+
+    def _get(self, job_id):
+        with self._lock:
+            row = self._connect().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    async def submit(self, url, scrape_type, priority="interactive", callback_url=None, fields=None):
+        """Persist a new job and wake a worker, returns the job.
+
+        Raises ValueError for bulk jobs when no worker may run them.
+        """
+        if priority == "bulk" and self.bulk_workers == 0:
+            raise ValueError(
+                "Bulk jobs are disabled: the only job worker is kept for interactive jobs (raise JOB_WORKERS)"
+            )
+        job = await self._in_thread(self._insert, url, scrape_type, priority, callback_url, fields)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    async def get(self, job_id):
+        return await self._in_thread(self._get, job_id)
+
+    def _claim(self):
+        """Mark the next eligible queued job as running for this process and return it"""
+        now = time.time()
+        with self._lock:
+            db = self._connect()
+            query = "SELECT * FROM jobs WHERE status = 'queued'"
+            if self._running_bulk >= self.bulk_workers:
+                query += f" AND priority < {PRIORITIES['bulk']}"
+            # BEGIN IMMEDIATE takes the write lock, so no other process claims the same row
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                row = db.execute(query + " ORDER BY priority, created_at LIMIT 1").fetchone()
+                if row is not None:
+                    claimed = db.execute(
+                        "UPDATE jobs SET status = 'running', owner = ?, started_at = ?, heartbeat_at = ?"
+                        " WHERE id = ? AND status = 'queued'",
+                        (self.owner, now, now, row["id"]),
+                    ).rowcount
+                    if not claimed:
+                        row = None
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+            if row is None:
+                return None
+            job = self._to_dict(row)
+            if job["priority"] == "bulk":
+                # Counted under the lock, so two workers can't both take the last bulk slot
+                self._running_bulk += 1
+        return job
+
+    def _finish(self, job_id, status, result=None, error=None):
+        with self._lock:
+            db = self._connect()
+            finished = db.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?"
+                " WHERE id = ? AND owner = ? AND status = 'running'",
+                (status, json.dumps(result) if result is not None else None, error, time.time(),
+                 job_id, self.owner),
+            ).rowcount
+            self._finished += 1
+            if self._finished % self.PURGE_EVERY == 0:
+                self._purge()
+        if not finished:
+            logger.warning(f"Job {job_id} was handed to another process before it finished here")
+
+    def _purge(self):
+        """Delete jobs that finished more than result_ttl seconds ago (lock held)"""
+        deleted = self._connect().execute(
+            "DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished_at < ?",
+            (time.time() - self.result_ttl,),
+        ).rowcount
+        if deleted:
+            logger.info(f"Purged {deleted} jobs finished more than {self.result_ttl}s ago")
+
+    async def _notify(self, job):
+        """POST the finished job to its callback URL"""
+        try:
+            async with httpx.AsyncClient(timeout=self.callback_timeout) as client:
+                response = await client.post(job["callback_url"], json=job)
+            logger.info(f"Callback for job {job['id']} returned {response.status_code}")
+        except Exception as e:
+            logger.error(f"Callback for job {job['id']} to {job['callback_url']} failed: {e}")
+
+    async def _run(self, job):
+        # Log lines of a job carry its id as the correlation id
+        request_id = request_id_var.set(job["id"])
+        try:
+            try:
+                logger.info(f"Running job {job['id']} ({job['priority']}) for {job['url']}")
+                try:
+                    result = await self._handler(job)
+                except Exception as e:
+                    detail = getattr(e, "detail", None) or str(e)
+                    logger.error(f"Job {job['id']} failed: {detail}")
+                    await self._in_thread(self._finish, job["id"], "failed", None, str(detail))
+                else:
+                    await self._in_thread(self._finish, job["id"], "done", result)
+            finally:
+                if job["priority"] == "bulk":
+                    with self._lock:
+                        self._running_bulk -= 1
+                    # A bulk slot opened up, another worker may be able to claim now
+                    self._wakeup.set()
+            finished = await self.get(job["id"])
+            if finished["callback_url"]:
+                await self._notify(finished)
+        finally:
+            request_id_var.reset(request_id)
+
+    async def _worker(self):
+        while True:
+            try:
+                # Cleared before claiming so a submit that lands meanwhile isn't missed
+                self._wakeup.clear()
+                job = await self._in_thread(self._claim)
+                if job is None:
+                    await self._wakeup.wait()
+                    continue
+                await self._run(job)
+            except Exception as e:
+                # Keep the worker alive through database errors (locked, disk full, ...)
+                logger.error(f"Job worker error, retrying: {e}")
+                await asyncio.sleep(1)
+
+    def _owner_alive(self, owner):
+        """False if `owner` is a process on this host that is gone, else True"""
+        parts = owner.rsplit(":", 2)
+        if len(parts) != 3 or parts[0] != socket.gethostname():
+            # Another host: only its heartbeats tell
+            return True
+        pid = int(parts[1])
+        if pid == os.getpid():
+            # Same pid, different owner: our predecessor (e.g. pid 1 in a restarted container)
+            return owner == self.owner
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def _recover(self):
+        """Queue again the running jobs of dead or silent owners (never live ones)"""
+        stale_before = time.time() - self.stale_after
+        with self._lock:
+            db = self._connect()
+            rows = db.execute(
+                "SELECT id, owner, heartbeat_at FROM jobs WHERE status = 'running' AND owner IS NOT ?",
+                (self.owner,),
+            ).fetchall()
+            recovered = 0
+            for row in rows:
+                live = row["owner"] and (row["heartbeat_at"] or 0) >= stale_before
+                if live and self._owner_alive(row["owner"]):
+                    continue
+                # The owner check keeps a job that was claimed again meanwhile
+                recovered += db.execute(
+                    "UPDATE jobs SET status = 'queued', owner = NULL, started_at = NULL, heartbeat_at = NULL"
+                    " WHERE id = ? AND status = 'running' AND owner IS ?",
+                    (row["id"], row["owner"]),
+                ).rowcount
+        return recovered
+
+    def _heartbeat(self):
+        with self._lock:
+            self._connect().execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE owner = ? AND status = 'running'",
+                (time.time(), self.owner),
+            )
+        return self._recover()
+
+    async def _monitor(self):
+        """Heartbeat this process's jobs and pick up those of dead processes"""
+        while True:
+            await asyncio.sleep(self.stale_after / 3)
+            try:
+                recovered = await self._in_thread(self._heartbeat)
+            except Exception as e:
+                logger.error(f"Job heartbeat failed: {e}")
+                continue
+            if recovered:
+                logger.warning(f"Re-queued {recovered} jobs of processes that stopped heartbeating")
+                self._wakeup.set()
+
+    def _startup(self):
+        recovered = self._recover()
+        with self._lock:
+            self._purge()
+        return recovered
+
+    async def start(self, handler):
+        """Recover interrupted jobs, purge old ones and start the workers.
+
+        `handler` is an async callable that takes a job dict and returns a
+        JSON-serializable result, or raises when the scrape fails.
+        """
+        recovered = await self._in_thread(self._startup)
+        if recovered:
+            logger.info(f"Re-queued {recovered} jobs interrupted by the last shutdown")
+        self._handler = handler
+        self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._monitor()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self):
+        """Queued/running job counts per lane, reported by /health"""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT status, priority, COUNT(*) AS n FROM jobs"
+                " WHERE status IN ('queued', 'running') GROUP BY status, priority"
+            ).fetchall()
+        lanes = {value: name for name, value in PRIORITIES.items()}
+        stats = {f"{status}_{lane}": 0 for status in ("queued", "running") for lane in PRIORITIES}
+        for row in rows:
+            stats[f"{row['status']}_{lanes[row['priority']]}"] = row["n"]
+        return stats
+
+
+# Global job queue backing the /jobs endpoints
+job_queue = JobQueue(
+    db_path=settings.JOBS_DB_PATH,
+    workers=settings.JOB_WORKERS,
+    bulk_workers=settings.JOB_BULK_WORKERS,
+    callback_timeout=settings.JOB_CALLBACK_TIMEOUT,
+    result_ttl=settings.JOB_RESULT_TTL,
+    stale_after=settings.SCHEDULER_STALE_AFTER,
+)
@@ -0,0 +1,116 @@
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import uuid
+from datetime import datetime, timezone
+from config import settings
+
+
+# Correlation id of the request (or job) being served, set by the HTTP
+# middleware and copied onto the scrape executor threads by run_scrape
+request_id_var = contextvars.ContextVar("request_id", default="-")
+
+# LogRecord attributes that are not user-supplied `extra` fields
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "request_id"}
+
+_listener = None
+_queue_handler = None
+
+
+def new_request_id():
+    return uuid.uuid4().hex[:12]
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamp every record with the current correlation id"""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, request id, message and extras"""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "msg": record.getMessage(),
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in _RESERVED})
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def setup_logging():
+    """Route all logging through a queue so request handlers never block on stdout.
+
+    Records are formatted and written by a QueueListener thread. The level
+    comes from LOG_LEVEL and the format from LOG_FORMAT ("json" or "text").
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+    if settings.LOG_FORMAT == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter("%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s")
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    # Filters run on the calling thread, where the request's context is visible
+    queue_handler.addFilter(RequestIdFilter())
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(settings.LOG_LEVEL.upper())
+    _queue_handler = queue_handler
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging():
+    """Flush queued records, stop the listener thread and log directly again.
+
+    Records emitted after shutdown (e.g. by atexit hooks) would otherwise sit
+    in a queue nobody reads, so the stream handler replaces the QueueHandler.
+    """
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    _listener.stop()
+    stream_handler, = _listener.handlers
+    stream_handler.addFilter(RequestIdFilter())
+    root = logging.getLogger()
+    root.removeHandler(_queue_handler)
+    root.addHandler(stream_handler)
+    _listener = None
+    _queue_handler = None
+
+
+def debug_sampled(logger, msg, *args, **kwargs):
+    """Debug line for hot per-item paths, emitted for LOG_SAMPLE_RATE of the calls"""
+    if logger.isEnabledFor(logging.DEBUG) and random.random() < settings.LOG_SAMPLE_RATE:
+        logger.debug(msg, *args, **kwargs)
+
+
+def redact(data):
+    """Loggable form of a scraped payload: full only with LOG_PAYLOADS, otherwise its shape"""
+    if settings.LOG_PAYLOADS or not isinstance(data, dict):
+        return data
+    if "error" in data:
+        return {"error": data["error"]}
+    return {"fields": sorted(key for key, value in data.items() if value), "redacted": True}
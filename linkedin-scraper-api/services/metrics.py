@@ -0,0 +1,124 @@
+import functools
+import time
+from prometheus_client import CollectorRegistry, Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client.core import GaugeMetricFamily
+from config import settings
+
+
+# Everything is registered on our own registry so /metrics only shows what the
+# scraper exports (plus the gauges read from the services' stats() at scrape time)
+registry = CollectorRegistry()
+
+# Scrape phases take from milliseconds (extractors) to tens of seconds (navigation)
+PHASE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+
+scrape_phase_seconds = Histogram(
+    "linkedin_scraper_phase_seconds",
+    "Duration of each phase of a scrape",
+    ["type", "phase"],
+    buckets=PHASE_BUCKETS,
+    registry=registry,
+)
+extractor_seconds = Histogram(
+    "linkedin_scraper_extractor_seconds",
+    "Duration of each search_for_* extractor (xpath extraction mode)",
+    ["extractor"],
+    buckets=PHASE_BUCKETS,
+    registry=registry,
+)
+queue_wait_seconds = Histogram(
+    "linkedin_scraper_executor_queue_wait_seconds",
+    "Time a scrape waited for a free scrape executor thread",
+    buckets=PHASE_BUCKETS,
+    registry=registry,
+)
+scrapes_total = Counter(
+    "linkedin_scraper_scrapes_total",
+    "Finished scrapes by outcome (ok, not_found, expired, blocked, throttled, error, ...)",
+    ["type", "outcome"],
+    registry=registry,
+)
+fields_total = Counter(
+    "linkedin_scraper_fields_total",
+    "Extracted fields of successful scrapes, by whether the selectors found them",
+    ["type", "field", "result"],
+    registry=registry,
+)
+
+
+def observe_phase(scrape_type, phase, seconds):
+    if settings.ENABLE_METRICS:
+        scrape_phase_seconds.labels(scrape_type, phase).observe(seconds)
+
+
+def observe_queue_wait(seconds):
+    if settings.ENABLE_METRICS:
+        queue_wait_seconds.observe(seconds)
+
+
+def record_outcome(scrape_type, outcome):
+    if settings.ENABLE_METRICS:
+        scrapes_total.labels(scrape_type, outcome).inc()
+
+
+def record_fields(scrape_type, fields):
+    """Count which fields the selectors found ("hit") or missed ("miss")"""
+    if not settings.ENABLE_METRICS:
+        return
+    for field, value in fields.items():
+        if field in ("linkedin_id", "timings"):
+            continue
+        # Sections come back as {'positions': [...], ...} even when empty
+        if isinstance(value, dict):
+            value = value.get("positions")
+        fields_total.labels(scrape_type, field, "hit" if value else "miss").inc()
+
+
+def timed_extractor(func):
+    """Decorator feeding an extractor's duration into linkedin_scraper_extractor_seconds"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not settings.ENABLE_METRICS:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            extractor_seconds.labels(func.__name__).observe(time.perf_counter() - start)
+    return wrapper
+
+
+class StatsCollector:
+    """Exposes numeric values of the services' stats() dicts as gauges.
+
+    `sources` maps a prefix to a callable returning a (possibly nested) dict,
+    e.g. {"driver_pool": driver_pool.stats} -> linkedin_scraper_driver_pool_idle.
+    """
+
+    def __init__(self, sources):
+        self.sources = sources
+
+    def collect(self):
+        for prefix, stats in self.sources.items():
+            try:
+                values = stats()
+            except Exception:
+                continue
+            yield from self._gauges(f"linkedin_scraper_{prefix}", values)
+
+    def _gauges(self, name, values):
+        for key, value in values.items():
+            metric = f"{name}_{key}"
+            if isinstance(value, dict):
+                yield from self._gauges(metric, value)
+            elif isinstance(value, (bool, int, float)) and value is not None:
+                yield GaugeMetricFamily(metric, f"{key} from /health", value=float(value))
+
+
+def register_stats(sources):
+    registry.register(StatsCollector(sources))
+
+
+def render_metrics():
+    """(body, content type) for the /metrics endpoint"""
+    return generate_latest(registry), CONTENT_TYPE_LATEST
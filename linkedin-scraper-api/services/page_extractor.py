@@ -0,0 +1,273 @@
+import hashlib
+import logging
+from services.scraping_utils import (
+    NAME_XPATHS, NAME_CSS, AVATAR_XPATHS, AVATAR_CSS, HEADLINE_XPATHS, HEADLINE_CSS, HEADLINE_MARKERS,
+    SECTION_ITEM_XPATH, EXPERIENCE_ITEM_XPATHS, EDUCATION_ITEM_XPATHS, ABOUT_TEXT_XPATHS,
+    section_xpaths, search_for_candidate_name, search_for_candidate_avatar,
+    search_for_candidate_headline, search_for_section,
+)
+from services.selector_stats import selector_telemetry, MISS
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Evaluates the same selector chains as the search_for_* functions, but inside
+# the browser, so the whole profile costs one WebDriver round-trip instead of
+# one per XPath. The returned object has the same shape as the Python path,
+# plus `selector_hits`: {chain: {xpath or MISS: count}} for the selector telemetry.
+PROFILE_EXTRACTION_SCRIPT = """
+const cfg = arguments[0];
+const hits = {};
+
+function hit(key, xpath) {
+    const chainHits = hits[key] = hits[key] || {};
+    const result = xpath || cfg.miss;
+    chainHits[result] = (chainHits[result] || 0) + 1;
+}
+
+function first(xpath, context) {
+    return document.evaluate(
+        xpath, context || document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+    ).singleNodeValue;
+}
+
+function textOf(el) {
+    return (el.innerText || el.textContent || '').trim();
+}
+
+// Same semantics as find_by_chain_or_None: text of the first matching XPath
+function textByChain(key, context) {
+    for (const xpath of cfg.chains[key]) {
+        const el = first(xpath, context);
+        if (el) {
+            hit(key, xpath);
+            return textOf(el);
+        }
+    }
+    hit(key, null);
+    return null;
+}
+
+function findName() {
+    const name = textByChain('name');
+    if (name) return name;
+    for (const selector of cfg.nameCss) {
+        const el = document.querySelector(selector);
+        if (el && el.textContent.trim()) return el.textContent.trim();
+    }
+    return null;
+}
+
+function findAvatar() {
+    for (const xpath of cfg.chains.avatar) {
+        const el = first(xpath);
+        if (el && el.src && el.src.toLowerCase().includes('profile')) {
+            hit('avatar', xpath);
+            return el.src;
+        }
+    }
+    hit('avatar', null);
+    for (const selector of cfg.avatarCss) {
+        const el = document.querySelector(selector);
+        if (el && el.src && el.src.includes('profile')) return el.src;
+    }
+    return null;
+}
+
+function findHeadline() {
+    const headline = textByChain('headline');
+    if (headline) return headline;
+    for (const selector of cfg.headlineCss) {
+        for (const el of document.querySelectorAll(selector)) {
+            const text = el.textContent.trim();
+            if (text.length > 10 && cfg.headlineMarkers.some(marker => text.includes(marker))) {
+                return text;
+            }
+        }
+    }
+    return null;
+}
+
+function findSection(name) {
+    const found = {positions: [], institutions: [], dates: []};
+    const key = 'section.' + name.toLowerCase();
+    let target = null;
+    for (const xpath of cfg.chains[key]) {
+        target = first(xpath);
+        if (target) {
+            hit(key, xpath);
+            break;
+        }
+    }
+    if (!target) {
+        hit(key, null);
+        return found;
+    }
+
+    if (name === 'About') {
+        const about = textByChain('about.text', target);
+        if (about) {
+            found.positions.push(about);
+            found.institutions.push('About');
+            found.dates.push('');
+        }
+        return found;
+    }
+
+    const prefix = name.toLowerCase() + '.';
+    const items = document.evaluate(
+        cfg.item, target, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null
+    );
+    for (let i = 0; i < items.snapshotLength; i++) {
+        const item = items.snapshotItem(i);
+        const position = textByChain(prefix + 'position', item);
+        const institution = textByChain(prefix + 'institution', item);
+        const date = textByChain(prefix + 'date', item);
+        if (position) found.positions.push(position);
+        if (institution) found.institutions.push(institution);
+        if (date) found.dates.push(date);
+    }
+    return found;
+}
+
+const result = {
+    name: findName(),
+    avatar: findAvatar(),
+    headline: findHeadline(),
+};
+for (const name of cfg.sections) {
+    result[name.toLowerCase()] = findSection(name);
+}
+result.selector_hits = hits;
+return result;
+"""
+
+# Profile sections, by section heading; each one's field is the lowercased name
+PROFILE_SECTIONS = ("Education", "Experience", "About")
+# Every field a profile scrape returns; name, avatar and headline form the top card
+PROFILE_FIELDS = ("name", "avatar", "headline", "about", "experience", "education")
+# Response model names accepted for a field
+FIELD_ALIASES = {"avatar_url": "avatar"}
+
+
+def normalize_fields(fields):
+    """Requested profile fields in canonical order, or None for all of them.
+
+    The name is always scraped. Raises ValueError for unknown fields.
+    """
+    if fields is None:
+        return None
+    requested = {FIELD_ALIASES.get(field.strip().lower(), field.strip().lower()) for field in fields} | {"name"}
+    unknown = requested.difference(PROFILE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields {', '.join(sorted(unknown))}, choose from {', '.join(PROFILE_FIELDS)}")
+    if requested.issuperset(PROFILE_FIELDS):
+        return None
+    return [field for field in PROFILE_FIELDS if field in requested]
+
+
+# Selector chains evaluated by the script, by telemetry chain name
+PROFILE_CHAINS = {
+    "name": NAME_XPATHS,
+    "avatar": AVATAR_XPATHS,
+    "headline": HEADLINE_XPATHS,
+    **{f"section.{name.lower()}": section_xpaths(name) for name in PROFILE_SECTIONS},
+    **{f"experience.{field}": chain for field, chain in EXPERIENCE_ITEM_XPATHS.items()},
+    **{f"education.{field}": chain for field, chain in EDUCATION_ITEM_XPATHS.items()},
+    "about.text": ABOUT_TEXT_XPATHS,
+}
+
+
+def _script_config(sections=PROFILE_SECTIONS):
+    """Script arguments, with every chain in its learned order"""
+    return {
+        "sections": list(sections),
+        "chains": {chain: selector_telemetry.ordered(chain, xpaths) for chain, xpaths in PROFILE_CHAINS.items()},
+        "miss": MISS,
+        "nameCss": NAME_CSS,
+        "avatarCss": AVATAR_CSS,
+        "headlineCss": HEADLINE_CSS,
+        "headlineMarkers": HEADLINE_MARKERS,
+        "item": SECTION_ITEM_XPATH,
+    }
+
+
+def extract_profile_in_page(driver, sections=PROFILE_SECTIONS):
+    """Collect the top card and `sections` with a single execute_script round-trip"""
+    fields = driver.execute_script(PROFILE_EXTRACTION_SCRIPT, _script_config(sections))
+    if fields:
+        selector_telemetry.record_hits(fields.pop("selector_hits", None))
+    return fields
+
+
+def extract_profile_by_xpath(driver, sections=PROFILE_SECTIONS):
+    """Collect the top card and `sections` with the per-XPath search_for_* functions"""
+    name = search_for_candidate_name(driver)
+    if not name:
+        return {"name": None}
+    fields = {
+        "name": name,
+        "avatar": search_for_candidate_avatar(driver),
+        "headline": search_for_candidate_headline(driver),
+    }
+    for section in sections:
+        fields[section.lower()] = search_for_section(driver, section)
+    return fields
+
+
+def extract_profile_fields(driver, mode=None, sections=PROFILE_SECTIONS):
+    """Extract the top card and `sections` using the configured EXTRACTION_MODE.
+
+    "script" runs the in-page extraction and falls back to the per-XPath path
+    if the script fails or finds no name; "xpath" always uses the per-XPath path.
+    """
+    mode = mode or settings.EXTRACTION_MODE
+    if mode == "script":
+        try:
+            fields = extract_profile_in_page(driver, sections)
+            if fields and fields.get("name"):
+                return fields
+            logger.info("In-page extraction found no name, falling back to per-XPath extraction")
+        except Exception as e:
+            logger.error(f"In-page extraction failed, falling back to per-XPath extraction: {e}")
+    return extract_profile_by_xpath(driver, sections)
+
+
+# Normalized text of the top card and of each section, read before anything
+# is expanded. Incremental re-scrapes hash it to find the sections that changed
+# since the previous scrape. The chains are used in a fixed order (not the
+# learned one) so the same page always hashes the same element.
+SECTION_TEXT_SCRIPT = """
+const texts = {};
+for (const [key, chain] of Object.entries(arguments[0])) {
+    texts[key] = null;
+    for (const xpath of chain) {
+        const el = document.evaluate(
+            xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+        ).singleNodeValue;
+        if (el) {
+            texts[key] = (el.textContent || '').replace(/\\s+/g, ' ').trim();
+            break;
+        }
+    }
+}
+return texts;
+"""
+
+FINGERPRINT_CHAINS = {
+    "top_card": [
+        "//main//h1/ancestor::section[1]",
+        "//h1[contains(@class, 't-24')]/ancestor::section[1]",
+    ],
+    **{name.lower(): section_xpaths(name) for name in PROFILE_SECTIONS},
+}
+
+
+def section_fingerprints(driver):
+    """{"top_card"/section field: hash of its collapsed text, None if it is missing}"""
+    texts = driver.execute_script(SECTION_TEXT_SCRIPT, FINGERPRINT_CHAINS) or {}
+    return {
+        key: hashlib.sha1(texts[key].encode("utf-8")).hexdigest() if texts.get(key) else None
+        for key in FINGERPRINT_CHAINS
+    }
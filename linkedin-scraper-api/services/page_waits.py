@@ -0,0 +1,69 @@
+import time
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.wait import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from config import settings
+
+
+# Per-phase wait budgets, carved out of the overall scrape timeout
+PAGE_READY_TIMEOUT = settings.SCRAPER_TIMEOUT * 0.3
+SCROLL_TIMEOUT = settings.SCRAPER_TIMEOUT * 0.3
+EXPAND_TIMEOUT = settings.SCRAPER_TIMEOUT * 0.3
+# Upper bound for a single scroll/click to take effect (the old fixed sleep)
+STEP_TIMEOUT = 1.5
+POLL_FREQUENCY = 0.1
+
+
+def wait_for_any_xpath(driver, xpaths, timeout):
+    """Wait until any of the XPaths is present, returns False on timeout"""
+    conditions = [EC.presence_of_element_located((By.XPATH, xpath)) for xpath in xpaths]
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(EC.any_of(*conditions))
+        return True
+    except TimeoutException:
+        return False
+
+
+def all_xpaths_present(driver, xpaths):
+    """True when every XPath matches at least one element"""
+    return all(driver.find_elements(By.XPATH, xpath) for xpath in xpaths)
+
+
+def wait_for_height_change(driver, last_height, timeout):
+    """Wait for lazy-loaded content to grow the page, returns the new height"""
+    def grown(d):
+        height = d.execute_script("return document.body.scrollHeight")
+        return height if height != last_height else False
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(grown)
+    except TimeoutException:
+        return last_height
+
+
+def wait_until_expanded(driver, button, timeout):
+    """Wait until a clicked "Show more" button is gone, hidden or toggled"""
+    def expanded(_):
+        try:
+            return not button.is_displayed() or "more" not in button.text.lower()
+        except StaleElementReferenceException:
+            return True
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(expanded)
+        return True
+    except TimeoutException:
+        return False
+
+
+class Deadline:
+    """Remaining time of a phase budget"""
+
+    def __init__(self, seconds):
+        self.end = time.monotonic() + seconds
+
+    def remaining(self, cap=None):
+        left = max(0.0, self.end - time.monotonic())
+        return min(left, cap) if cap is not None else left
+
+    def expired(self):
+        return time.monotonic() >= self.end
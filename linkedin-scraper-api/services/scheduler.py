@@ -0,0 +1,292 @@
+import asyncio
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SchedulerTimeoutError(Exception):
+    """Raised when no browser worker finished a scrape within the timeout"""
+
+
+class SharedScheduler:
+    """SQLite-backed scrape queue shared by API processes and browser workers.
+
+    API processes (any number of uvicorn workers) `submit` scrapes and await
+    their results; browser worker processes (worker.py) `claim` them. A claim
+    only succeeds while fewer than `max_concurrency` tasks are running across
+    all workers, which makes that limit global. Workers heartbeat their
+    running tasks, and a task whose worker stopped heartbeating for
+    `stale_after` seconds is queued again. Identical queued or running
+    scrapes are shared between API processes; a queued task that every
+    waiter gave up on is cancelled so no worker picks it up.
+    """
+
+    def __init__(self, db_path, poll_interval, stale_after, result_ttl):
+        self.db_path = db_path
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.result_ttl = result_ttl
+        self._db = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._db is None:
+            # Autocommit mode, transactions are opened explicitly with BEGIN IMMEDIATE
+            self._db = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+            self._db.row_factory = sqlite3.Row
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS scrape_tasks ("
+                " id TEXT PRIMARY KEY,"
+                " type TEXT NOT NULL,"
+                " linkedin_id TEXT NOT NULL,"
+                " fields TEXT,"
+                " status TEXT NOT NULL,"
+                " result TEXT,"
+                " worker TEXT,"
+                " waiters INTEGER NOT NULL DEFAULT 0,"
+                " created_at REAL NOT NULL,"
+                " claimed_at REAL,"
+                " heartbeat_at REAL,"
+                " finished_at REAL)"
+            )
+            columns = {row["name"] for row in self._db.execute("PRAGMA table_info(scrape_tasks)")}
+            if "fields" not in columns:
+                # Scheduler files created before field-selective scrapes
+                self._db.execute("ALTER TABLE scrape_tasks ADD COLUMN fields TEXT")
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS scrape_tasks_queue ON scrape_tasks (status, created_at)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS scrape_tasks_key ON scrape_tasks (type, linkedin_id, status)"
+            )
+        return self._db
+
+    def submit(self, scrape_type, linkedin_id, fields=None):
+        """Queue a scrape (or join an identical pending one), returns the task id"""
+        fields = ",".join(fields) if fields else None
+        with self._lock:
+            db = self._connect()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                row = db.execute(
+                    "SELECT id FROM scrape_tasks WHERE type = ? AND linkedin_id = ? AND fields IS ?"
+                    " AND status IN ('queued', 'running') LIMIT 1",
+                    (scrape_type, linkedin_id, fields),
+                ).fetchone()
+                if row is not None:
+                    task_id = row["id"]
+                    db.execute("UPDATE scrape_tasks SET waiters = waiters + 1 WHERE id = ?", (task_id,))
+                else:
+                    task_id = uuid.uuid4().hex
+                    db.execute(
+                        "INSERT INTO scrape_tasks (id, type, linkedin_id, fields, status, waiters, created_at)"
+                        " VALUES (?, ?, ?, ?, 'queued', 1, ?)",
+                        (task_id, scrape_type, linkedin_id, fields, time.time()),
+                    )
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+        return task_id
+
+    def result(self, task_id):
+        """The scrape result once the task is done, else None"""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT status, result FROM scrape_tasks WHERE id = ?", (task_id,)
+            ).fetchone()
+        if row is None:
+            return {"error": "Scrape task was lost by the scheduler"}
+        if row["status"] != "done":
+            return None
+        return json.loads(row["result"])
+
+    def abandon(self, task_id):
+        """Drop one waiter of a task, cancelling it if it is still queued and nobody waits"""
+        try:
+            with self._lock:
+                db = self._connect()
+                db.execute("BEGIN IMMEDIATE")
+                try:
+                    db.execute("UPDATE scrape_tasks SET waiters = waiters - 1 WHERE id = ?", (task_id,))
+                    cancelled = db.execute(
+                        "UPDATE scrape_tasks SET status = 'cancelled', finished_at = ?"
+                        " WHERE id = ? AND status = 'queued' AND waiters <= 0",
+                        (time.time(), task_id),
+                    ).rowcount
+                    db.execute("COMMIT")
+                except Exception:
+                    db.execute("ROLLBACK")
+                    raise
+        except Exception as e:
+            logger.error(f"Could not abandon scrape task {task_id}: {e}")
+            return
+        if cancelled:
+            logger.info(f"Cancelled scrape task {task_id}, nobody is waiting for it")
+
+    async def run(self, scrape_type, linkedin_id, timeout=None, fields=None):
+        """Submit a scrape and wait for a browser worker to finish it.
+
+        SQLite calls run on the default executor, off the event loop.
+        """
+        timeout = settings.SCHEDULER_TASK_TIMEOUT if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        task_id = await loop.run_in_executor(None, self.submit, scrape_type, linkedin_id, fields)
+        deadline = time.monotonic() + timeout
+        try:
+            while True:
+                result = await loop.run_in_executor(None, self.result, task_id)
+                if result is not None:
+                    return result
+                if time.monotonic() >= deadline:
+                    raise SchedulerTimeoutError(
+                        f"No browser worker finished {scrape_type} {linkedin_id} within {timeout}s"
+                    )
+                await asyncio.sleep(self.poll_interval)
+        except (SchedulerTimeoutError, asyncio.CancelledError):
+            # Timed out or the client went away: not awaited, so a second
+            # cancellation can't interrupt it
+            loop.run_in_executor(None, self.abandon, task_id)
+            raise
+
+    def claim(self, worker, max_concurrency):
+        """Mark the oldest queued task as running for `worker`, or None.
+
+        Nothing is claimed while `max_concurrency` tasks are already running.
+        Tasks of workers that stopped heartbeating are re-queued first.
+        """
+        now = time.time()
+        with self._lock:
+            db = self._connect()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                requeued = db.execute(
+                    "UPDATE scrape_tasks SET status = 'queued', worker = NULL"
+                    " WHERE status = 'running' AND heartbeat_at < ?",
+                    (now - self.stale_after,),
+                ).rowcount
+                running = db.execute(
+                    "SELECT COUNT(*) FROM scrape_tasks WHERE status = 'running'"
+                ).fetchone()[0]
+                row = None
+                if running < max_concurrency:
+                    row = db.execute(
+                        "SELECT * FROM scrape_tasks WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+                    ).fetchone()
+                if row is not None:
+                    db.execute(
+                        "UPDATE scrape_tasks SET status = 'running', worker = ?, claimed_at = ?, heartbeat_at = ?"
+                        " WHERE id = ?",
+                        (worker, now, now, row["id"]),
+                    )
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+        if requeued:
+            logger.warning(f"Re-queued {requeued} scrape tasks of workers that stopped heartbeating")
+        if row is None:
+            return None
+        task = dict(row)
+        task["fields"] = task["fields"].split(",") if task["fields"] else None
+        return task
+
+    def heartbeat(self, worker):
+        with self._lock:
+            self._connect().execute(
+                "UPDATE scrape_tasks SET heartbeat_at = ? WHERE worker = ? AND status = 'running'",
+                (time.time(), worker),
+            )
+
+    def finish(self, task_id, result):
+        with self._lock:
+            self._connect().execute(
+                "UPDATE scrape_tasks SET status = 'done', result = ?, finished_at = ? WHERE id = ?",
+                (json.dumps(result), time.time(), task_id),
+            )
+
+    def purge(self):
+        """Drop results that every waiting API process has had time to read, and cancelled tasks"""
+        with self._lock:
+            self._connect().execute(
+                "DELETE FROM scrape_tasks WHERE status IN ('done', 'cancelled') AND finished_at < ?",
+                (time.time() - self.result_ttl,),
+            )
+
+    def stats(self):
+        """Queued/running tasks and active workers, reported by /health"""
+        with self._lock:
+            db = self._connect()
+            counts = dict(db.execute(
+                "SELECT status, COUNT(*) FROM scrape_tasks WHERE status IN ('queued', 'running') GROUP BY status"
+            ).fetchall())
+            workers = db.execute(
+                "SELECT COUNT(DISTINCT worker) FROM scrape_tasks WHERE status = 'running'"
+            ).fetchone()[0]
+        return {
+            "queued": counts.get("queued", 0),
+            "running": counts.get("running", 0),
+            "busy_workers": workers,
+        }
+
+
+def available_memory_mb():
+    """Memory available for new processes, or None if it can't be determined"""
+    try:
+        import psutil
+        return psutil.virtual_memory().available / 2**20
+    except ImportError:
+        pass
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def auto_browser_count():
+    """Chrome instances this host can run: one per core, capped by memory"""
+    browsers = os.cpu_count() or 1
+    memory = available_memory_mb()
+    if memory is not None:
+        # Leave a fifth of the memory for the OS and the API processes
+        browsers = min(browsers, int(memory * 0.8 / settings.CHROME_MEMORY_MB))
+    return max(1, browsers)
+
+
+def worker_processes():
+    """WORKER_PROCESSES resolved to a number ("auto" sizes by CPU and memory)"""
+    if settings.WORKER_PROCESSES != "auto":
+        return max(1, int(settings.WORKER_PROCESSES))
+    return max(1, math.ceil(auto_browser_count() / settings.SCRAPER_MAX_WORKERS))
+
+
+def global_concurrency(processes):
+    """Scrapes allowed to run at once across all worker processes"""
+    slots = processes * settings.SCRAPER_MAX_WORKERS
+    if settings.SCHEDULER_MAX_CONCURRENCY > 0:
+        return min(slots, settings.SCHEDULER_MAX_CONCURRENCY)
+    if settings.WORKER_PROCESSES == "auto":
+        return min(slots, auto_browser_count())
+    return slots
+
+
+# Global scheduler, used when SCHEDULER_MODE=shared
+shared_scheduler = SharedScheduler(
+    db_path=settings.SCHEDULER_DB_PATH,
+    poll_interval=settings.SCHEDULER_POLL_INTERVAL,
+    stale_after=settings.SCHEDULER_STALE_AFTER,
+    result_ttl=settings.SCHEDULER_RESULT_TTL,
+)
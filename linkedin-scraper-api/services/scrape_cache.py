@@ -0,0 +1,192 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import unquote
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_linkedin_id(linkedin_id):
+    """Normalize an ID from extract_linkedin_id so equivalent URLs share a cache entry"""
+    return unquote(linkedin_id).strip().strip('/').lower()
+
+
+def sqlite_path_from_url(database_url):
+    """Return the file path of a sqlite:/// URL, or None for anything else"""
+    prefix = "sqlite:///"
+    if database_url and database_url.startswith(prefix):
+        return database_url[len(prefix):] or None
+    return None
+
+
+class ScrapeCache:
+    """Two-tier cache of scrape results keyed by (type, normalized LinkedIn ID).
+
+    The first tier is a bounded in-memory LRU. The optional second tier is a
+    local SQLite file, so results survive restarts and are shared by workers
+    on the same host. An entry is "fresh" for the type's TTL, then "stale" for
+    `stale_ttl` more seconds (served while a background refresh runs), then
+    expired. Expired entries are still read by incremental re-scrapes until
+    the LRU evicts them, or, on disk, until they are `db_retention` seconds
+    old (purged every PURGE_EVERY writes).
+    """
+
+    PURGE_EVERY = 100
+
+    def __init__(self, max_entries, ttls, stale_ttl, db_path=None, db_retention=0):
+        self.max_entries = max_entries
+        self.ttls = ttls
+        self.stale_ttl = stale_ttl
+        self.db_path = db_path
+        # Never purge a row that could still be served
+        self.db_retention = max(db_retention, max(ttls.values(), default=0) + stale_ttl)
+        self._writes = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._hits = 0
+        self._stale_hits = 0
+        self._misses = 0
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS scrape_cache ("
+                " key TEXT PRIMARY KEY, data TEXT NOT NULL, stored_at REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS scrape_cache_stored_at ON scrape_cache (stored_at)"
+            )
+            self._purge()
+            self._db.commit()
+            logger.info(f"Scrape cache disk tier enabled at {db_path}")
+
+    @staticmethod
+    def key(scrape_type, linkedin_id, fields=None):
+        """Cache key; scrapes of only some fields (normalize_fields) get their own entry"""
+        key = f"{scrape_type}:{normalize_linkedin_id(linkedin_id)}"
+        return f"{key}:{','.join(fields)}" if fields else key
+
+    def _state(self, scrape_type, stored_at):
+        """Classify an entry's age as fresh, stale or expired (None)"""
+        age = time.time() - stored_at
+        ttl = self.ttls.get(scrape_type, 0)
+        if age < ttl:
+            return "fresh"
+        if age < ttl + self.stale_ttl:
+            return "stale"
+        return None
+
+    def _remember(self, key, data, stored_at):
+        """Insert into the LRU tier, evicting the least recently used entry"""
+        self._memory[key] = (data, stored_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _entry(self, key):
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+        elif self._db is not None:
+            row = self._db.execute(
+                "SELECT data, stored_at FROM scrape_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                entry = (json.loads(row[0]), row[1])
+                self._remember(key, *entry)
+        return entry
+
+    def get(self, scrape_type, linkedin_id, fields=None):
+        """Return (data, state, age) where state is "fresh", "stale" or None on a miss.
+
+        A lookup for some `fields` is also answered by a full scrape of the same
+        ID, preferring whichever entry is fresh.
+        """
+        keys = [self.key(scrape_type, linkedin_id)]
+        if fields:
+            keys.insert(0, self.key(scrape_type, linkedin_id, fields))
+        with self._lock:
+            found = None
+            for key in keys:
+                entry = self._entry(key)
+                # Expired entries stay until evicted: incremental re-scrapes reuse them
+                state = self._state(scrape_type, entry[1]) if entry is not None else None
+                if state == "fresh" or (state == "stale" and found is None):
+                    found = (entry, state)
+                if state == "fresh":
+                    break
+
+            if found is None:
+                self._misses += 1
+                return None, None, None
+            (data, stored_at), state = found
+            if state == "fresh":
+                self._hits += 1
+            else:
+                self._stale_hits += 1
+            return data, state, time.time() - stored_at
+
+    def previous(self, scrape_type, linkedin_id):
+        """The last stored result regardless of its age, or None (not counted in the stats)"""
+        key = self.key(scrape_type, linkedin_id)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                return entry[0]
+            if self._db is not None:
+                row = self._db.execute("SELECT data FROM scrape_cache WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    return json.loads(row[0])
+        return None
+
+    def set(self, scrape_type, linkedin_id, data, fields=None):
+        """Store a successful scrape result in both tiers"""
+        key = self.key(scrape_type, linkedin_id, fields)
+        stored_at = time.time()
+        with self._lock:
+            self._remember(key, data, stored_at)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO scrape_cache (key, data, stored_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(data), stored_at),
+                )
+                self._writes += 1
+                if self._writes % self.PURGE_EVERY == 0:
+                    self._purge()
+                self._db.commit()
+
+    def _purge(self):
+        """Delete disk rows older than db_retention"""
+        deleted = self._db.execute(
+            "DELETE FROM scrape_cache WHERE stored_at < ?", (time.time() - self.db_retention,)
+        ).rowcount
+        if deleted:
+            logger.info(f"Purged {deleted} scrape cache rows older than {self.db_retention}s")
+
+    def stats(self):
+        """Cache counters, reported by /health"""
+        with self._lock:
+            return {
+                "entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "stale_hits": self._stale_hits,
+                "misses": self._misses,
+            }
+
+
+# Global cache in front of the profile and company scrapers
+scrape_cache = ScrapeCache(
+    max_entries=settings.CACHE_MAX_ENTRIES,
+    ttls={
+        "profile": settings.CACHE_TTL_PROFILE,
+        "company": settings.CACHE_TTL_COMPANY,
+    },
+    stale_ttl=settings.CACHE_STALE_TTL,
+    db_path=sqlite_path_from_url(settings.DATABASE_URL),
+    db_retention=settings.CACHE_DB_RETENTION,
+)
@@ -0,0 +1,118 @@
+import asyncio
+import logging
+from services.candidate_scraper import scrape_linkedin_profile
+from services.company_scraper import scrape_linkedin_company
+from services.http_scraper import scrape_profile_http, scrape_company_http
+from services.fake_scraper import fake_scrape_profile, fake_scrape_company
+from services.scrape_executor import run_scrape
+from services.scrape_cache import scrape_cache
+from services.scheduler import shared_scheduler, SchedulerTimeoutError
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+SCRAPERS = {
+    "profile": scrape_profile_http if settings.PROFILE_BACKEND == "http" else scrape_linkedin_profile,
+    "company": scrape_company_http if settings.COMPANY_BACKEND == "http" else scrape_linkedin_company,
+}
+if settings.SCRAPER_BACKEND == "fake":
+    SCRAPERS = {
+        "profile": fake_scrape_profile,
+        "company": fake_scrape_company,
+    }
+
+# In-flight scrapes keyed by cache key. Concurrent requests for the same
+# (type, id) await the same task instead of launching another browser session.
+# Holding the task references also keeps them from being garbage collected.
+_in_flight = {}
+_coalesced_total = 0
+
+
+def scraper_args(linkedin_id, fields=None):
+    """Arguments of a SCRAPERS call; only profile scrapers take `fields`"""
+    return (linkedin_id, fields) if fields else (linkedin_id,)
+
+
+async def _run_scraper(scrape_type, linkedin_id, fields=None):
+    """Scrape on this process's executor, or on a browser worker in shared mode"""
+    if settings.SCHEDULER_MODE != "shared":
+        return await run_scrape(SCRAPERS[scrape_type], *scraper_args(linkedin_id, fields))
+    try:
+        return await shared_scheduler.run(scrape_type, linkedin_id, fields=fields)
+    except SchedulerTimeoutError as e:
+        logger.error(str(e))
+        return {"error": str(e)}
+
+
+async def _scrape_and_store(scrape_type, linkedin_id, fields=None):
+    """Run the scraper and cache successful results"""
+    data = await _run_scraper(scrape_type, linkedin_id, fields)
+    if "error" not in data and settings.CACHE_ENABLED:
+        scrape_cache.set(scrape_type, linkedin_id, data, fields)
+    return data
+
+
+def _start_scrape(key, scrape_type, linkedin_id, fields=None):
+    """Start the leader task for a key and forget it once it finishes"""
+    task = asyncio.create_task(_scrape_and_store(scrape_type, linkedin_id, fields))
+    _in_flight[key] = task
+    task.add_done_callback(lambda _: _in_flight.pop(key, None))
+    return task
+
+
+async def _coalesced_scrape(scrape_type, linkedin_id, fields=None):
+    """Scrape, or join an identical scrape that is already running"""
+    global _coalesced_total
+    key = scrape_cache.key(scrape_type, linkedin_id, fields)
+    task = _in_flight.get(key)
+    if task is None:
+        task = _start_scrape(key, scrape_type, linkedin_id, fields)
+    else:
+        _coalesced_total += 1
+        logger.info(f"Joining in-flight scrape for {key}")
+    # Shield the shared task so one disconnecting caller can't cancel it for the rest
+    return await asyncio.shield(task)
+
+
+def _log_refresh(key, task):
+    if task.cancelled():
+        return
+    if task.exception() is not None:
+        logger.error(f"Background refresh failed for {key}: {task.exception()}")
+    else:
+        logger.info(f"Background refresh finished for {key}")
+
+
+def _schedule_refresh(scrape_type, linkedin_id, fields=None):
+    key = scrape_cache.key(scrape_type, linkedin_id, fields)
+    if key not in _in_flight:
+        logger.info(f"Serving stale {key}, refreshing in background")
+        task = _start_scrape(key, scrape_type, linkedin_id, fields)
+        task.add_done_callback(lambda t: _log_refresh(key, t))
+
+
+def coalescing_stats():
+    """In-flight and coalesced scrape counts, reported by /health"""
+    return {
+        "in_flight": len(_in_flight),
+        "coalesced_total": _coalesced_total,
+    }
+
+
+async def dispatch_scrape(scrape_type, linkedin_id, fields=None):
+    """Return (data, cache_status, age) for a scrape, going through the cache.
+
+    cache_status is "HIT" for a fresh entry, "STALE" for an expired entry that
+    is served while a background refresh runs, and "MISS" when we scraped now.
+    `fields` (profiles only, see normalize_fields) limits what is scraped.
+    """
+    if settings.CACHE_ENABLED:
+        data, state, age = scrape_cache.get(scrape_type, linkedin_id, fields)
+        if state == "fresh":
+            return data, "HIT", age
+        if state == "stale":
+            _schedule_refresh(scrape_type, linkedin_id, fields)
+            return data, "STALE", age
+    data = await _coalesced_scrape(scrape_type, linkedin_id, fields)
+    return data, "MISS", 0
@@ -0,0 +1,57 @@
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from services.metrics import observe_queue_wait
+from config import settings
+
+
+# Dedicated, bounded thread pool for blocking Selenium work. Scrapes run here
+# so the event loop stays free to answer /health and other requests.
+scrape_executor = ThreadPoolExecutor(
+    max_workers=settings.SCRAPER_MAX_WORKERS,
+    thread_name_prefix="scraper",
+)
+
+_lock = threading.Lock()
+_pending = 0
+_running = 0
+
+
+def _tracked(submitted_at, func, *args):
+    """Run func on a worker thread while keeping queue/running counts"""
+    global _pending, _running
+    observe_queue_wait(time.perf_counter() - submitted_at)
+    with _lock:
+        _pending -= 1
+        _running += 1
+    try:
+        return func(*args)
+    finally:
+        with _lock:
+            _running -= 1
+
+
+async def run_scrape(func, *args):
+    """Run a blocking scrape function on the scrape executor.
+
+    The caller's context (e.g. the request id used in log lines) is copied
+    onto the worker thread.
+    """
+    global _pending
+    with _lock:
+        _pending += 1
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(scrape_executor, context.run, _tracked, time.perf_counter(), func, *args)
+
+
+def executor_stats():
+    """Executor occupancy, reported by /health"""
+    with _lock:
+        return {
+            "workers": settings.SCRAPER_MAX_WORKERS,
+            "running": _running,
+            "queued": _pending,
+        }
@@ -5,35 +5,136 @@ from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 import sys
 import os
+import logging
+import threading
+from urllib.parse import urlparse
 
+from services.logging_setup import debug_sampled, redact
+from services.metrics import timed_extractor
+from services.selector_stats import selector_telemetry
 from config import settings
 
+logger = logging.getLogger(__name__)
+
+# File extensions used to block resource types that have no Chrome content setting
+RESOURCE_TYPE_EXTENSIONS = {
+    "font": ["woff", "woff2", "ttf", "otf", "eot"],
+    "media": ["mp4", "webm", "m3u8", "ts", "mp3", "ogg", "wav"],
+    "stylesheet": ["css"],
+}
+
+
+def blocked_url_patterns(block_types=None, block_domains=None):
+    """CDP Network.setBlockedURLs patterns for the configured deny lists"""
+    block_types = settings.RESOURCE_BLOCK_TYPES if block_types is None else block_types
+    block_domains = settings.RESOURCE_BLOCK_DOMAINS if block_domains is None else block_domains
+    patterns = []
+    for resource_type in block_types:
+        for extension in RESOURCE_TYPE_EXTENSIONS.get(resource_type, []):
+            patterns += [f"*.{extension}", f"*.{extension}?*"]
+    for domain in block_domains:
+        patterns += [f"*://{domain}/*", f"*://*.{domain}/*"]
+    return patterns
+
+
+DEFAULT_CHROME_BINARIES = {
+    "darwin": "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+    "linux": "/usr/bin/google-chrome",
+}
+
+
+def build_chrome_options(resource_blocking=True, page_load_strategy=None):
+    """Build Chrome options; resource blocking and load strategy come from settings"""
+    options = Options()
+    if settings.HEADLESS:
+        options.add_argument("--headless=new")
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--window-size=1920,1080')
+    options.add_argument('--ignore-ssl-errors=yes')
+    options.add_argument('--ignore-certificate-errors=yes')
+    options.add_argument("--log-level=3")
+    # "eager" returns from driver.get() at DOMContentLoaded; the condition
+    # waits in page_waits.py take care of the content we actually need
+    options.page_load_strategy = page_load_strategy or settings.PAGE_LOAD_STRATEGY
+
+    if resource_blocking and "image" in settings.RESOURCE_BLOCK_TYPES:
+        # Images are blocked through Chrome's content settings, so <img src>
+        # is still in the DOM (we only need the avatar URL, not its bytes).
+        # Allow-listed domains keep loading images.
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.content_settings.exceptions.images": {
+                f"[*.]{domain},*": {"setting": 1} for domain in settings.RESOURCE_ALLOW_DOMAINS
+            },
+        })
+
+    # Auto-detect Chrome binary location for Mac/Linux, allow override by env;
+    # when the default location does not exist chromedriver finds Chrome itself
+    chrome_path = os.environ.get("CHROME_BINARY", None)
+    if chrome_path:
+        options.binary_location = chrome_path
+    else:
+        default_path = DEFAULT_CHROME_BINARIES.get(sys.platform)
+        if default_path and os.path.isfile(default_path):
+            options.binary_location = default_path
+    return options
+
+
+def apply_resource_blocking(driver, patterns=None):
+    """Block fonts, media and tracker domains for a driver through CDP"""
+    patterns = blocked_url_patterns() if patterns is None else patterns
+    if not patterns:
+        return
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    except Exception as e:
+        logger.error(f"Could not enable resource blocking: {e}")
+
+
 # Setting up the options
-options = Options()
-if settings.HEADLESS:
-    options.add_argument("--headless=new")
-options.add_argument('--no-sandbox')
-options.add_argument('--disable-dev-shm-usage')
-options.add_argument('--disable-gpu')
-options.add_argument('--window-size=1920,1080')
-options.add_argument('--ignore-ssl-errors=yes')
-options.add_argument('--ignore-certificate-errors=yes')
-options.add_argument("--log-level=3")
-
-# Auto-detect Chrome binary location for Mac/Linux, allow override by env
-chrome_path = os.environ.get("CHROME_BINARY", None)
-if chrome_path:
-    options.binary_location = chrome_path
-elif sys.platform == "darwin":
-    options.binary_location = "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"
-elif sys.platform.startswith("linux"):
-    options.binary_location = "/usr/bin/google-chrome"
-
-# Setting up service with proper Chrome path for macOS
+options = build_chrome_options()
+
+class ChromeDriverNotFoundError(RuntimeError):
+    """Raised when no usable chromedriver binary can be resolved"""
+
+
+# The chromedriver path is resolved once per process and then reused,
+# so webdriver-manager's version lookup never runs on the request path
+_chromedriver_path = None
+_chromedriver_lock = threading.Lock()
+
+def resolve_chromedriver_path():
+    """Resolve (once) and validate the chromedriver binary path"""
+    global _chromedriver_path
+    with _chromedriver_lock:
+        if _chromedriver_path is None:
+            if settings.CHROMEDRIVER_PATH:
+                path = settings.CHROMEDRIVER_PATH
+                source = "CHROMEDRIVER_PATH"
+            else:
+                try:
+                    path = ChromeDriverManager().install()
+                except Exception as e:
+                    raise ChromeDriverNotFoundError(
+                        f"webdriver-manager could not install chromedriver ({e}). "
+                        "Set CHROMEDRIVER_PATH to a pinned binary on hosts without network access."
+                    ) from e
+                source = "webdriver-manager"
+            if not os.path.isfile(path) or not os.access(path, os.X_OK):
+                raise ChromeDriverNotFoundError(
+                    f"chromedriver from {source} is not an executable file: {path}"
+                )
+            logger.info(f"Using chromedriver from {source}: {path}")
+            _chromedriver_path = path
+    return _chromedriver_path
+
 # Don't create service at module level to avoid file handle conflicts
 def get_chrome_service():
     """Get a fresh Chrome service instance to avoid file handle conflicts"""
-    return Service(ChromeDriverManager().install())
+    return Service(resolve_chromedriver_path())
 
 def find_by_xpath_or_None(driver, *xpaths):
     """returns the text inside and elemnt by its xPath"""
@@ -46,38 +147,169 @@ def find_by_xpath_or_None(driver, *xpaths):
     return None
 
 
+def find_by_chain_or_None(driver, chain, xpaths):
+    """find_by_xpath_or_None over a named selector chain.
+
+    The XPaths are tried in their learned order (most successful first) and
+    the one that matched, or a miss, is recorded in the selector telemetry.
+    """
+    for xpath in selector_telemetry.ordered(chain, xpaths):
+        try:
+            text = driver.find_element(By.XPATH, xpath).text
+        except NoSuchElementException:
+            continue
+        selector_telemetry.record(chain, xpath)
+        return text
+    selector_telemetry.record(chain, None)
+    return None
+
+
+# Selector chains, tried in order. They are shared by the per-XPath extractors
+# below and by the single round-trip in-page extraction (services/page_extractor.py).
+
+# 使用更健壮的XPath选择器，不依赖特定的ember ID
+# 基于class名和结构模式，这些在不同用户之间更一致
+NAME_XPATHS = [
+    # 方法1: 查找包含名字的h1元素，通常在profile的顶部
+    "//h1[contains(@class, 't-24') and contains(@class, 'break-words')]",
+    # 方法2: 查找aria-label包含名字的链接
+    "//a[contains(@aria-label, ' ') and contains(@class, 'ember-view')]/h1",
+    # 方法3: 查找特定的class组合
+    "//h1[contains(@class, 'inline') and contains(@class, 't-24') and contains(@class, 'break-words')]",
+    # 方法4: 备用方案 - 查找任何包含名字的h1
+    "//h1[contains(@class, 't-24')]",
+    # 方法5: 基于文本内容查找（如果其他方法都失败）
+    "//h1[contains(@class, 'break-words')]",
+]
+NAME_CSS = [
+    'h1.t-24.break-words',
+    'h1[class*="t-24"][class*="break-words"]',
+    'a[aria-label*=" "] h1',
+    'h1.inline.t-24.v-align-middle.break-words',
+]
+
+AVATAR_XPATHS = [
+    # 方法1: 查找profile头像的img元素
+    "//img[contains(@class, 'pv-top-card-profile-picture__image')]",
+    # 方法2: 查找包含profile-picture的class
+    "//img[contains(@class, 'profile-picture')]",
+    # 方法3: 查找EntityPhoto相关的class
+    "//img[contains(@class, 'EntityPhoto')]",
+    # 方法4: 查找evi-image class（LinkedIn常用的图片class）
+    "//img[contains(@class, 'evi-image')]",
+    # 方法5: 查找alt属性包含profile的图片
+    "//img[contains(@alt, 'profile')]",
+    # 方法6: 备用方案 - 查找任何可能的头像图片
+    "//img[contains(@class, 'ember-view')]",
+]
+AVATAR_CSS = [
+    'img.pv-top-card-profile-picture__image',
+    'img[class*="profile-picture"]',
+    'img[class*="EntityPhoto"]',
+    'img[class*="evi-image"]',
+    'img[alt*="profile"]',
+]
+
+HEADLINE_XPATHS = [
+    # 方法1: 查找包含headline文本的div
+    "//div[contains(@class, 'text-body-medium') and contains(@class, 'break-words')]",
+    # 方法2: 查找包含特定文本模式的div
+    "//div[contains(@class, 'text-body-medium')]",
+    # 方法3: 查找包含emoji和文本的div（headline通常包含emoji）
+    "//div[contains(text(), '🎓') or contains(text(), '💼') or contains(text(), '🏢')]",
+    # 方法4: 查找包含@符号的文本（通常表示公司）
+    "//div[contains(text(), '@')]",
+    # 方法5: 查找包含特定关键词的文本
+    "//div[contains(text(), 'Computer Science') or contains(text(), 'Software') or contains(text(), 'Engineer')]",
+    # 方法6: 备用方案 - 查找任何可能的headline
+    "//div[contains(@class, 'break-words') and string-length(text()) > 10]",
+]
+HEADLINE_CSS = [
+    'div.text-body-medium.break-words',
+    'div[class*="text-body-medium"]',
+    'div[class*="break-words"]',
+]
+# 检查是否包含headline的特征（emoji、@符号、关键词等）
+HEADLINE_MARKERS = ['🎓', '💼', '🏢', '@', 'Computer Science', 'Software', 'Engineer']
+
+
+def section_xpaths(section_name):
+    """基于文本内容查找section（避免依赖加密的class名）"""
+    return [
+        f"//div[@id='{section_name.lower()}']/ancestor::section",
+        f"//section[.//h2[contains(text(), '{section_name}')]]",
+        f"//section[.//span[contains(text(), '{section_name}')]]",
+    ]
+
+
+SECTION_ITEM_XPATH = ".//li[contains(@class, 'artdeco-list__item')]"
+
+# Per-item field chains, relative to an Experience/Education list item
+EXPERIENCE_ITEM_XPATHS = {
+    # 职位名称 - 基于文本内容和相对位置
+    "position": [
+        ".//div[contains(@class, 't-bold')]//span",
+        ".//span[contains(@class, 't-bold')]",
+        ".//div[contains(@class, 'mr1')]//span",
+    ],
+    # 公司名称 - 基于文本内容和相对位置
+    "institution": [
+        ".//div[contains(@class, 't-14') and contains(@class, 't-normal')]//span",
+        ".//span[contains(@class, 't-14') and contains(@class, 't-normal')]",
+        ".//a[contains(@class, 'optional-action-target-wrapper')]//span",
+    ],
+    # 时间 - 基于class特征
+    "date": [
+        ".//span[contains(@class, 't-black--light')]",
+        ".//span[contains(@class, 't-14') and contains(@class, 't-normal') and contains(@class, 't-black--light')]",
+        ".//span[contains(@class, 'pvs-entity__caption-wrapper')]",
+    ],
+}
+EDUCATION_ITEM_XPATHS = {
+    # 学校名称 - 在t-bold class中
+    "institution": [
+        ".//div[contains(@class, 't-bold')]//span",
+        ".//span[contains(@class, 't-bold')]",
+        ".//div[contains(@class, 'mr1')]//span",
+    ],
+    # 学位/专业 - 在t-14 t-normal class中
+    "position": [
+        ".//span[contains(@class, 't-14') and contains(@class, 't-normal')]",
+        ".//div[contains(@class, 't-14') and contains(@class, 't-normal')]//span",
+    ],
+    # 时间 - 在t-black--light class中
+    "date": [
+        ".//span[contains(@class, 't-black--light')]",
+        ".//span[contains(@class, 'pvs-entity__caption-wrapper')]",
+        ".//span[contains(@class, 't-14') and contains(@class, 't-normal') and contains(@class, 't-black--light')]",
+    ],
+}
+# 提取About文本内容 - 修复XPath以匹配span元素
+ABOUT_TEXT_XPATHS = [
+    ".//span[@aria-hidden='true' and string-length(text()) > 50]",
+    ".//span[contains(@class, 'visually-hidden') and string-length(text()) > 50]",
+    ".//div[contains(@class, 'display-flex') and contains(@class, 'full-width')]//span[string-length(text()) > 50]",
+    ".//div[contains(@class, 't-14') and contains(@class, 't-normal') and contains(@class, 't-black')]//span[string-length(text()) > 50]",
+    ".//span[contains(@class, 't-14') and contains(@class, 't-normal') and string-length(text()) > 50]",
+    ".//div[contains(@class, 'display-flex') and contains(@class, 'full-width')]//span",
+]
+
+
+@timed_extractor
 def search_for_candidate_name(driver):
     """search for profile's name in the page using semantic XPath"""
     try:
-        # 使用更健壮的XPath选择器，不依赖特定的ember ID
-        # 基于class名和结构模式，这些在不同用户之间更一致
-        name = find_by_xpath_or_None(driver,
-            # 方法1: 查找包含名字的h1元素，通常在profile的顶部
-            "//h1[contains(@class, 't-24') and contains(@class, 'break-words')]",
-            # 方法2: 查找aria-label包含名字的链接
-            "//a[contains(@aria-label, ' ') and contains(@class, 'ember-view')]/h1",
-            # 方法3: 查找特定的class组合
-            "//h1[contains(@class, 'inline') and contains(@class, 't-24') and contains(@class, 'break-words')]",
-            # 方法4: 备用方案 - 查找任何包含名字的h1
-            "//h1[contains(@class, 't-24')]",
-            # 方法5: 基于文本内容查找（如果其他方法都失败）
-            "//h1[contains(@class, 'break-words')]"
-        )
+        name = find_by_chain_or_None(driver, "name", NAME_XPATHS)
         
         if name:
-            print(f"Found name using XPath: {name}")
+            debug_sampled(logger, "Found name using XPath: %s", name)
             return name
             
         # 如果XPath方法失败，尝试使用JavaScript获取
         try:
             name_js = driver.execute_script("""
                 // 尝试多种选择器
-                const selectors = [
-                    'h1.t-24.break-words',
-                    'h1[class*="t-24"][class*="break-words"]',
-                    'a[aria-label*=" "] h1',
-                    'h1.inline.t-24.v-align-middle.break-words'
-                ];
+                const selectors = arguments[0];
                 
                 for (let selector of selectors) {
                     const element = document.querySelector(selector);
@@ -86,59 +318,40 @@ def search_for_candidate_name(driver):
                     }
                 }
                 return null;
-            """)
+            """, NAME_CSS)
             
             if name_js:
-                print(f"Found name using JavaScript: {name_js}")
+                debug_sampled(logger, "Found name using JavaScript: %s", name_js)
                 return name_js
                 
         except Exception as js_error:
-            print(f"JavaScript fallback failed: {js_error}")
+            logger.debug("JavaScript fallback for name failed: %s", js_error)
             
     except Exception as e:
-        print(f"Error finding name: {e}")
+        logger.warning("Error finding name: %s", e)
     return None
 
 #search for profile avatar in the page using semantic XPath
+@timed_extractor
 def search_for_candidate_avatar(driver):
     """search for profile avatar in the page using semantic XPath"""
     try:
-        # 使用更健壮的选择器，不依赖特定的ember ID
-        avatar_selectors = [
-            # 方法1: 查找profile头像的img元素
-            "//img[contains(@class, 'pv-top-card-profile-picture__image')]",
-            # 方法2: 查找包含profile-picture的class
-            "//img[contains(@class, 'profile-picture')]",
-            # 方法3: 查找EntityPhoto相关的class
-            "//img[contains(@class, 'EntityPhoto')]",
-            # 方法4: 查找evi-image class（LinkedIn常用的图片class）
-            "//img[contains(@class, 'evi-image')]",
-            # 方法5: 查找alt属性包含profile的图片
-            "//img[contains(@alt, 'profile')]",
-            # 方法6: 备用方案 - 查找任何可能的头像图片
-            "//img[contains(@class, 'ember-view')]"
-        ]
-        
-        for selector in avatar_selectors:
+        for selector in selector_telemetry.ordered("avatar", AVATAR_XPATHS):
             try:
                 avatar_element = driver.find_element(By.XPATH, selector)
                 avatar_url = avatar_element.get_attribute('src')
                 if avatar_url and 'profile' in avatar_url.lower():
-                    print(f"Found avatar using selector: {selector}")
+                    debug_sampled(logger, "Found avatar using selector: %s", selector)
+                    selector_telemetry.record("avatar", selector)
                     return avatar_url
             except Exception:
                 continue
+        selector_telemetry.record("avatar", None)
                 
         # 如果XPath方法失败，尝试使用JavaScript
         try:
             avatar_js = driver.execute_script("""
-                const selectors = [
-                    'img.pv-top-card-profile-picture__image',
-                    'img[class*="profile-picture"]',
-                    'img[class*="EntityPhoto"]',
-                    'img[class*="evi-image"]',
-                    'img[alt*="profile"]'
-                ];
+                const selectors = arguments[0];
                 
                 for (let selector of selectors) {
                     const element = document.querySelector(selector);
@@ -147,87 +360,63 @@ def search_for_candidate_avatar(driver):
                     }
                 }
                 return null;
-            """)
+            """, AVATAR_CSS)
             
             if avatar_js:
-                print(f"Found avatar using JavaScript: {avatar_js}")
+                debug_sampled(logger, "Found avatar using JavaScript")
                 return avatar_js
                 
         except Exception as js_error:
-            print(f"JavaScript fallback for avatar failed: {js_error}")
+            logger.debug("JavaScript fallback for avatar failed: %s", js_error)
             
     except Exception as e:
-        print(f"Error finding avatar: {e}")
+        logger.warning("Error finding avatar: %s", e)
     return None
 
 #search for profile's headline in the page using semantic XPath
+@timed_extractor
 def search_for_candidate_headline(driver):
     """search for profile's headline in the page using semantic XPath"""
     try:
-        # 使用更健壮的选择器，不依赖特定的路径
-        headline = find_by_xpath_or_None(driver, 
-            # 方法1: 查找包含headline文本的div
-            "//div[contains(@class, 'text-body-medium') and contains(@class, 'break-words')]",
-            # 方法2: 查找包含特定文本模式的div
-            "//div[contains(@class, 'text-body-medium')]",
-            # 方法3: 查找包含emoji和文本的div（headline通常包含emoji）
-            "//div[contains(text(), '🎓') or contains(text(), '💼') or contains(text(), '🏢')]",
-            # 方法4: 查找包含@符号的文本（通常表示公司）
-            "//div[contains(text(), '@')]",
-            # 方法5: 查找包含特定关键词的文本
-            "//div[contains(text(), 'Computer Science') or contains(text(), 'Software') or contains(text(), 'Engineer')]",
-            # 方法6: 备用方案 - 查找任何可能的headline
-            "//div[contains(@class, 'break-words') and string-length(text()) > 10]"
-        )
+        headline = find_by_chain_or_None(driver, "headline", HEADLINE_XPATHS)
         
         if headline:
-            print(f"Found headline using XPath: {headline}")
+            debug_sampled(logger, "Found headline using XPath")
             return headline
             
         # 如果XPath方法失败，尝试使用JavaScript
         try:
             headline_js = driver.execute_script("""
                 // 尝试多种选择器
-                const selectors = [
-                    'div.text-body-medium.break-words',
-                    'div[class*="text-body-medium"]',
-                    'div[class*="break-words"]'
-                ];
+                const selectors = arguments[0];
+                const markers = arguments[1];
                 
                 for (let selector of selectors) {
                     const elements = document.querySelectorAll(selector);
                     for (let element of elements) {
                         const text = element.textContent.trim();
-                        // 检查是否包含headline的特征（emoji、@符号、关键词等）
-                        if (text.length > 10 && (
-                            text.includes('🎓') || 
-                            text.includes('💼') || 
-                            text.includes('🏢') || 
-                            text.includes('@') ||
-                            text.includes('Computer Science') ||
-                            text.includes('Software') ||
-                            text.includes('Engineer')
-                        )) {
+                        if (text.length > 10 && markers.some(marker => text.includes(marker))) {
                             return text;
                         }
                     }
                 }
                 return null;
-            """)
+            """, HEADLINE_CSS, HEADLINE_MARKERS)
             
             if headline_js:
-                print(f"Found headline using JavaScript: {headline_js}")
+                debug_sampled(logger, "Found headline using JavaScript")
                 return headline_js
                 
         except Exception as js_error:
-            print(f"JavaScript fallback for headline failed: {js_error}")
+            logger.debug("JavaScript fallback for headline failed: %s", js_error)
             
     except Exception as e:
-        print(f"Error finding headline: {e}")
+        logger.warning("Error finding headline: %s", e)
     return None
 
 
 
+@timed_extractor
 def search_for_section(driver, section_name, min_index=2, max_index=8):
     """search for a section's content by section name using semantic XPath"""
     try:
@@ -244,57 +433,33 @@ def search_for_section(driver, section_name, min_index=2, max_index=8):
             if institution: found_elements['institutions'].append(institution)
             if date: found_elements['dates'].append(date)
 
-        # 基于文本内容查找section（避免依赖加密的class名）
-        section_selectors = [
-            f"//div[@id='{section_name.lower()}']/ancestor::section",
-            f"//section[.//h2[contains(text(), '{section_name}')]]",
-            f"//section[.//span[contains(text(), '{section_name}')]]"
-        ]
-        
         target_section = None
-        for selector in section_selectors:
+        chain = f"section.{section_name.lower()}"
+        for selector in selector_telemetry.ordered(chain, section_xpaths(section_name)):
             try:
                 target_section = driver.find_element(By.XPATH, selector)
-                print(f"Found {section_name} section using: {selector}")
+                debug_sampled(logger, "Found %s section using: %s", section_name, selector)
                 break
             except NoSuchElementException:
                 continue
+        selector_telemetry.record(chain, selector if target_section else None)
         
         if not target_section:
-            print(f"Section '{section_name}' not found")
+            logger.debug("Section %r not found", section_name)
             return found_elements
 
         # Experience section
         if section_name == "Experience":
             # 查找所有工作经验项（基于固定的class名）
-            experience_items = target_section.find_elements(By.XPATH, 
-                ".//li[contains(@class, 'artdeco-list__item')]"
-            )
+            experience_items = target_section.find_elements(By.XPATH, SECTION_ITEM_XPATH)
             
-            print(f"Found {len(experience_items)} experience items")
+            debug_sampled(logger, "Found %d experience items", len(experience_items))
             
             for item in experience_items:
                 try:
-                    # 职位名称 - 基于文本内容和相对位置
-                    position = find_by_xpath_or_None(item, 
-                        ".//div[contains(@class, 't-bold')]//span",
-                        ".//span[contains(@class, 't-bold')]",
-                        ".//div[contains(@class, 'mr1')]//span"
-                    )
-                    
-                    # 公司名称 - 基于文本内容和相对位置
-                    institution = find_by_xpath_or_None(item, 
-                        ".//div[contains(@class, 't-14') and contains(@class, 't-normal')]//span",
-                        ".//span[contains(@class, 't-14') and contains(@class, 't-normal')]",
-                        ".//a[contains(@class, 'optional-action-target-wrapper')]//span"
-                    )
-                    
-                    # 时间 - 基于class特征
-                    date = find_by_xpath_or_None(item, 
-                        ".//span[contains(@class, 't-black--light')]",
-                        ".//span[contains(@class, 't-14') and contains(@class, 't-normal') and contains(@class, 't-black--light')]",
-                        ".//span[contains(@class, 'pvs-entity__caption-wrapper')]"
-                    )
+                    position = find_by_chain_or_None(item, "experience.position", EXPERIENCE_ITEM_XPATHS["position"])
+                    institution = find_by_chain_or_None(item, "experience.institution", EXPERIENCE_ITEM_XPATHS["institution"])
+                    date = find_by_chain_or_None(item, "experience.date", EXPERIENCE_ITEM_XPATHS["date"])
                     
                     if position or institution or date:
                         # print(f"  - Position: {position}")
@@ -302,152 +467,157 @@ def search_for_section(driver, section_name, min_index=2, max_index=8):
                         # print(f"  - Date: {date}")
                         add_elements(position, institution, date)
                 except Exception as e:
-                    print(f"Error parsing experience item: {e}")
+                    logger.debug("Error parsing experience item: %s", e)
                     continue
 
         # Education section
         elif section_name == "Education":
             # 查找所有教育经历项
-            education_items = target_section.find_elements(By.XPATH, 
-                ".//li[contains(@class, 'artdeco-list__item')]"
-            )
+            education_items = target_section.find_elements(By.XPATH, SECTION_ITEM_XPATH)
             
-            print(f"Found {len(education_items)} education items")
+            debug_sampled(logger, "Found %d education items", len(education_items))
             
             for item in education_items:
                 try:
-                    # 学校名称 - 在t-bold class中
-                    institution = find_by_xpath_or_None(item, 
-                        ".//div[contains(@class, 't-bold')]//span",
-                        ".//span[contains(@class, 't-bold')]",
-                        ".//div[contains(@class, 'mr1')]//span"
-                    )
-                    
-                    # 学位/专业 - 在t-14 t-normal class中
-                    position = find_by_xpath_or_None(item, 
-                        ".//span[contains(@class, 't-14') and contains(@class, 't-normal')]",
-                        ".//div[contains(@class, 't-14') and contains(@class, 't-normal')]//span"
-                    )
-                    
-                    # 时间 - 在t-black--light class中
-                    date = find_by_xpath_or_None(item, 
-                        ".//span[contains(@class, 't-black--light')]",
-                        ".//span[contains(@class, 'pvs-entity__caption-wrapper')]",
-                        ".//span[contains(@class, 't-14') and contains(@class, 't-normal') and contains(@class, 't-black--light')]"
-                    )
+                    institution = find_by_chain_or_None(item, "education.institution", EDUCATION_ITEM_XPATHS["institution"])
+                    position = find_by_chain_or_None(item, "education.position", EDUCATION_ITEM_XPATHS["position"])
+                    date = find_by_chain_or_None(item, "education.date", EDUCATION_ITEM_XPATHS["date"])
                     
                     if position or institution or date:
-                        print(f"  - School: {institution}")
-                        print(f"  - Degree: {position}")
-                        print(f"  - Date: {date}")
+                        debug_sampled(logger, "Parsed education item: %s",
+                                      redact({"school": institution, "degree": position, "date": date}))
                         add_elements(position, institution, date)
                 except Exception as e:
-                    print(f"Error parsing education item: {e}")
+                    logger.debug("Error parsing education item: %s", e)
                     continue
 
         # About section
         elif section_name == "About":
             # About section主要是文本内容，不需要列表项
-            print(f"Found About section")
+            debug_sampled(logger, "Found About section")
             
             try:
-                
-                # 提取About文本内容 - 修复XPath以匹配span元素
-                about_text = find_by_xpath_or_None(target_section, 
-                    ".//span[@aria-hidden='true' and string-length(text()) > 50]",
-                    ".//span[contains(@class, 'visually-hidden') and string-length(text()) > 50]",
-                    ".//div[contains(@class, 'display-flex') and contains(@class, 'full-width')]//span[string-length(text()) > 50]",
-                    ".//div[contains(@class, 't-14') and contains(@class, 't-normal') and contains(@class, 't-black')]//span[string-length(text()) > 50]",
-                    ".//span[contains(@class, 't-14') and contains(@class, 't-normal') and string-length(text()) > 50]",
-                    ".//div[contains(@class, 'display-flex') and contains(@class, 'full-width')]//span"
-                )
+                about_text = find_by_chain_or_None(target_section, "about.text", ABOUT_TEXT_XPATHS)
                 
                 if about_text:
-                    print(f"  - About text: {about_text[:100]}...")  # 只显示前100个字符
+                    debug_sampled(logger, "Found about text (%d chars)", len(about_text))
                     # 将About文本作为position字段存储
                     found_elements['positions'].append(about_text)
                     found_elements['institutions'].append("About")
                     found_elements['dates'].append("")
                 else:
-                    print("  - No about text found")
+                    debug_sampled(logger, "No about text found")
                     
             except Exception as e:
-                print(f"Error parsing about section: {e}")
+                logger.debug("Error parsing about section: %s", e)
         
         return found_elements
     except Exception as e:
-        print(f"Error finding section '{section_name}': {e}")
+        logger.warning("Error finding section %r: %s", section_name, e)
         return None
 
 
+COMPANY_NAME_XPATHS = [
+    "//h1[contains(@class, 'company-name')]",
+    "//h1[contains(@class, 'org-top-card-summary__title')]",
+    "//h1[contains(@class, 'pv-text-details__left-panel')]//h1",
+    "//div[contains(@class, 'company-name')]//h1",
+]
+COMPANY_INDUSTRY_XPATHS = [
+    "//div[contains(@class, 'company-industry')]",
+    "//div[contains(@class, 'org-top-card-summary-info-list__info-item')]",
+    "//div[contains(@class, 'pv-text-details__left-panel')]//div[contains(@class, 'text-body-small')]",
+]
+COMPANY_ABOUT_XPATHS = [
+    "//div[contains(@class, 'company-about')]",
+    "//div[contains(@class, 'org-about-us-organization-description__text')]",
+    "//div[contains(@class, 'pv-shared-text-with-see-more')]//span",
+    "//section[contains(@class, 'about')]//div[contains(@class, 'text-body-medium')]",
+]
+COMPANY_SHOW_MORE_XPATH = "//button[contains(text(), 'Show more')] | //button[contains(text(), 'See more')] | //span[contains(text(), 'Show more')]/parent::button"
+
+
+@timed_extractor
 def search_for_company_name(driver):
     """search for company's name using semantic XPath"""
     try:
-        company_name = find_by_xpath_or_None(driver, 
-            "//h1[contains(@class, 'company-name')]",
-            "//h1[contains(@class, 'org-top-card-summary__title')]",
-            "//h1[contains(@class, 'pv-text-details__left-panel')]//h1",
-            "//div[contains(@class, 'company-name')]//h1"
-        )
+        company_name = find_by_chain_or_None(driver, "company.name", COMPANY_NAME_XPATHS)
         return company_name
     except Exception as e:
-        print(f"Error finding company name: {e}")
+        logger.warning("Error finding company name: %s", e)
     return None
 
 
+@timed_extractor
 def search_for_company_industry(driver):
     """search for company's industry using semantic XPath"""
     try:
-        company_industry = find_by_xpath_or_None(driver, 
-            "//div[contains(@class, 'company-industry')]",
-            "//div[contains(@class, 'org-top-card-summary-info-list__info-item')]",
-            "//div[contains(@class, 'pv-text-details__left-panel')]//div[contains(@class, 'text-body-small')]"
-        )
+        company_industry = find_by_chain_or_None(driver, "company.industry", COMPANY_INDUSTRY_XPATHS)
         return company_industry
     except Exception as e:
-        print(f"Error finding company industry: {e}")
+        logger.warning("Error finding company industry: %s", e)
     return None
 
 
+@timed_extractor
 def search_for_company_about(driver):
     """search for company's about section using semantic XPath"""
     try:
         # 先尝试点击"Show more"按钮
         try:
-            more_button = driver.find_element(By.XPATH, 
-                "//button[contains(text(), 'Show more')] | //button[contains(text(), 'See more')] | //span[contains(text(), 'Show more')]/parent::button"
-            )
+            more_button = driver.find_element(By.XPATH, COMPANY_SHOW_MORE_XPATH)
             more_button.click()
         except NoSuchElementException:
             pass
         
-        company_about = find_by_xpath_or_None(driver, 
-            "//div[contains(@class, 'company-about')]",
-            "//div[contains(@class, 'org-about-us-organization-description__text')]",
-            "//div[contains(@class, 'pv-shared-text-with-see-more')]//span",
-            "//section[contains(@class, 'about')]//div[contains(@class, 'text-body-medium')]"
-        )
+        company_about = find_by_chain_or_None(driver, "company.about", COMPANY_ABOUT_XPATHS)
         return company_about
     except Exception as e:
-        print(f"Error finding company about: {e}")
+        logger.warning("Error finding company about: %s", e)
     return None
     
 
-def add_session_cookie(driver):
-    """load cookies from a file and add it to the driver"""
+def session_cookie_domain():
+    """Domain of the li_at cookie: ".www.linkedin.com", or a bare host (e.g. a local fixture server) as is"""
+    host = urlparse(settings.LINKEDIN_BASE_URL).hostname
+    return f".{host}" if "." in host else host
+
+
+def add_session_cookie(driver, token=None, expires=None, clear=False):
+    """Seed the li_at session cookie before the first navigation.
+
+    Uses CDP Network.setCookie so no page has to be loaded first; falls back
+    to loading the LinkedIn home page and calling add_cookie if CDP fails.
+    `clear` drops every existing cookie first, when a driver switches account.
+    """
+    token = token or settings.LINKEDIN_ACCESS_TOKEN
+    expires = expires if expires is not None else settings.LINKEDIN_ACCESS_TOKEN_EXP
     cookie = {
-        "domain": ".www.linkedin.com",
+        "domain": session_cookie_domain(),
         "name": "li_at",
-        "value": settings.LINKEDIN_ACCESS_TOKEN,
+        "value": token,
         "path": "/",
         "secure": True,
         "httpOnly": True,
-        "expirationDate": settings.LINKEDIN_ACCESS_TOKEN_EXP,
     }
+    cdp_cookie = dict(cookie)
+    try:
+        # CDP wants seconds since epoch; without it the cookie lives for the browser session
+        cdp_cookie["expires"] = float(expires)
+    except ValueError:
+        pass
+    try:
+        if clear:
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        driver.execute_cdp_cmd("Network.setCookie", cdp_cookie)
+        return
+    except Exception as e:
+        logger.error(f"Could not set session cookie through CDP, falling back to add_cookie: {e}")
     # Add cookies to the driver
     try:
-        driver.get("https://www.linkedin.com")
-        driver.add_cookie(cookie)
+        driver.get(settings.LINKEDIN_BASE_URL)
+        if clear:
+            driver.delete_all_cookies()
+        driver.add_cookie({**cookie, "expirationDate": expires})
     except Exception as e:
-        print(f"Error adding cookies to driver : {e}")
-    
\ No newline at end of file
+        logger.error("Error adding cookies to driver: %s", e)
@@ -0,0 +1,197 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Recorded when no selector of a chain matched
+MISS = "<miss>"
+
+
+class SelectorTelemetry:
+    """Learns which selector of each fallback chain actually matches.
+
+    Hits are counted per chain and per XPath (keyed by the XPath text, so a
+    changed chain simply starts fresh). Every `reorder_every` results of a
+    chain its counts decay and its learned order is recomputed, so the
+    selector that matches most often is tried first and a new winner can
+    overtake an old one. A chain drifts when its top selector matches the last
+    `window` lookups less than `drift_threshold` times as often as it has
+    historically - usually a sign that LinkedIn changed its markup. Relative
+    rates keep chains that legitimately miss (e.g. an education item without
+    dates) from drifting.
+    """
+
+    def __init__(self, path, reorder_every, window, drift_threshold, decay=0.9):
+        self.path = path
+        self.reorder_every = max(1, reorder_every)
+        self.window = window
+        self.drift_threshold = drift_threshold
+        self.decay = decay
+        self._lock = threading.Lock()
+        self._counts = {}    # chain -> {xpath or MISS: decayed count}
+        self._totals = {}    # chain -> {xpath or MISS: all-time count}
+        self._recent = {}    # chain -> deque of the last `window` results
+        self._orders = {}    # chain -> (canonical tuple, learned list)
+        self._since_reorder = {}
+        self._drifting = set()
+        self._last_save = 0.0
+        self._dirty = False
+
+    def load(self):
+        """Restore counts persisted by a previous run"""
+        if not self.path or not os.path.isfile(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                saved = json.load(f)
+        except Exception as e:
+            logger.error(f"Could not load selector stats from {self.path}: {e}")
+            return
+        with self._lock:
+            for chain, entry in saved.items():
+                self._counts[chain] = dict(entry.get("counts", {}))
+                self._totals[chain] = dict(entry.get("totals", {}))
+        logger.info(f"Loaded selector stats for {len(saved)} chains from {self.path}")
+
+    def save(self, force=True):
+        """Persist the counts (at most every 30s unless forced)"""
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty or (not force and time.time() - self._last_save < 30):
+                return
+            snapshot = {
+                chain: {"counts": self._counts.get(chain, {}), "totals": self._totals.get(chain, {})}
+                for chain in set(self._counts) | set(self._totals)
+            }
+            snapshot = json.loads(json.dumps(snapshot))
+            self._last_save = time.time()
+            self._dirty = False
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"Could not save selector stats to {self.path}: {e}")
+
+    def _learned(self, chain, xpaths):
+        counts = self._counts.get(chain, {})
+        # Stable sort: ties keep the hand-written order
+        return sorted(xpaths, key=lambda xpath: -counts.get(xpath, 0.0))
+
+    def ordered(self, chain, xpaths):
+        """The chain's XPaths, most successful first"""
+        canonical = tuple(xpaths)
+        with self._lock:
+            cached = self._orders.get(chain)
+            if cached is None or cached[0] != canonical:
+                cached = (canonical, self._learned(chain, xpaths))
+                self._orders[chain] = cached
+            return cached[1]
+
+    def _add(self, chain, result, count=1):
+        counts = self._counts.setdefault(chain, {})
+        counts[result] = counts.get(result, 0.0) + count
+        totals = self._totals.setdefault(chain, {})
+        totals[result] = totals.get(result, 0) + count
+        recent = self._recent.setdefault(chain, deque(maxlen=self.window))
+        recent.extend([result] * min(count, self.window))
+        self._dirty = True
+
+        self._since_reorder[chain] = self._since_reorder.get(chain, 0) + count
+        if self._since_reorder[chain] >= self.reorder_every:
+            self._since_reorder[chain] = 0
+            for key in counts:
+                counts[key] *= self.decay
+            cached = self._orders.get(chain)
+            if cached is not None:
+                learned = self._learned(chain, cached[0])
+                if learned[0] != cached[1][0]:
+                    logger.info(f"Selector chain {chain} now starts with {learned[0]}")
+                self._orders[chain] = (cached[0], learned)
+            self._check_drift(chain)
+
+    def record(self, chain, xpath):
+        """Record which XPath matched (None for a miss)"""
+        with self._lock:
+            self._add(chain, xpath or MISS)
+        self.save(force=False)
+
+    def record_hits(self, hits):
+        """Record aggregated hits {chain: {xpath or MISS: count}} from the in-page or lxml extraction"""
+        if not hits:
+            return
+        with self._lock:
+            for chain, results in hits.items():
+                for result, count in results.items():
+                    self._add(chain, result or MISS, int(count))
+        self.save(force=False)
+
+    def _top(self, chain):
+        totals = self._totals.get(chain, {})
+        matched = {xpath: count for xpath, count in totals.items() if xpath != MISS}
+        return max(matched, key=matched.get) if matched else None
+
+    def _drift(self, chain):
+        """(top selector, its recent hit rate) or None when the chain is healthy"""
+        recent = self._recent.get(chain)
+        top = self._top(chain)
+        if top is None or not recent or len(recent) < min(self.window, self.reorder_every):
+            return None
+        totals = self._totals[chain]
+        baseline = totals[top] / sum(totals.values())
+        share = sum(1 for result in recent if result == top) / len(recent)
+        return (top, share) if share < baseline * self.drift_threshold else None
+
+    def _check_drift(self, chain):
+        drift = self._drift(chain)
+        if drift and chain not in self._drifting:
+            self._drifting.add(chain)
+            logger.warning(
+                f"Selector drift on {chain}: top selector {drift[0]} matched only "
+                f"{drift[1]:.0%} of the last {len(self._recent[chain])} lookups"
+            )
+        elif not drift and chain in self._drifting:
+            self._drifting.discard(chain)
+            logger.info(f"Selector chain {chain} recovered")
+
+    def stats(self):
+        """Per-chain hit counts, learned order and drift, reported by /selectors"""
+        with self._lock:
+            chains = {}
+            for chain, totals in sorted(self._totals.items()):
+                recent = self._recent.get(chain) or []
+                drift = self._drift(chain)
+                cached = self._orders.get(chain)
+                chains[chain] = {
+                    "hits": {xpath: count for xpath, count in totals.items() if xpath != MISS},
+                    "misses": totals.get(MISS, 0),
+                    "order": cached[1] if cached else None,
+                    "top": self._top(chain),
+                    "recent_lookups": len(recent),
+                    "recent_miss_rate": round(sum(1 for result in recent if result == MISS) / len(recent), 3) if recent else None,
+                    "drifting": drift is not None,
+                    "top_recent_hit_rate": round(drift[1], 3) if drift else None,
+                }
+            return chains
+
+    def summary(self):
+        """Chain counts, exported as /metrics gauges"""
+        with self._lock:
+            return {"chains": len(self._totals), "drifting": len(self._drifting)}
+
+
+# Global telemetry shared by every extraction mode
+selector_telemetry = SelectorTelemetry(
+    path=settings.SELECTOR_STATS_PATH,
+    reorder_every=settings.SELECTOR_REORDER_EVERY,
+    window=settings.SELECTOR_DRIFT_WINDOW,
+    drift_threshold=settings.SELECTOR_DRIFT_THRESHOLD,
+)
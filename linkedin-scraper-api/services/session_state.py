@@ -0,0 +1,79 @@
+import logging
+import threading
+import time
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+
+SESSION_EXPIRED_ERROR = "Your Linkedin session token is not set up correctly or has expired"
+
+# LinkedIn sends unauthenticated visitors to one of these pages
+AUTH_WALL_MARKERS = ("/authwall", "/login", "/uas/login", "/checkpoint", "/signup")
+
+
+def auth_wall_reason(driver):
+    """Return why the driver's session looks logged out, or None if it looks fine"""
+    current_url = driver.current_url
+    if urlparse(current_url).path.startswith(AUTH_WALL_MARKERS):
+        return f"redirected to {current_url}"
+    # LinkedIn deletes an invalid li_at as soon as it sees it
+    if driver.get_cookie("li_at") is None:
+        return "li_at cookie was cleared"
+    return None
+
+
+class SessionState:
+    """Validity of one LinkedIn session token, shared by every pooled driver.
+
+    As soon as one scrape sees the auth wall the session is marked expired and
+    further scrapes with that token fail fast instead of each loading a page
+    just to hit the same wall. After
+    `recheck_interval` seconds one scrape is let through to probe the session
+    again, so a transient redirect does not disable the service for good.
+    """
+
+    def __init__(self, recheck_interval):
+        self.recheck_interval = recheck_interval
+        self._lock = threading.Lock()
+        self._expired_at = None
+        self._reason = None
+        self._expirations = 0
+
+    def allow_scrape(self):
+        """True if a scrape may use the browser (session valid, or due for a probe)"""
+        with self._lock:
+            if self._expired_at is None:
+                return True
+            if time.time() - self._expired_at >= self.recheck_interval:
+                # Restart the interval so only this scrape probes
+                self._expired_at = time.time()
+                logger.info("Probing expired LinkedIn session with one scrape")
+                return True
+            return False
+
+    def mark_expired(self, reason):
+        with self._lock:
+            if self._expired_at is None:
+                self._expirations += 1
+                logger.error(f"LinkedIn session marked expired for the whole pool: {reason}")
+            self._expired_at = time.time()
+            self._reason = reason
+
+    def mark_valid(self):
+        with self._lock:
+            if self._expired_at is not None:
+                logger.info("LinkedIn session is valid again")
+            self._expired_at = None
+            self._reason = None
+
+    def stats(self):
+        """Session status, reported by /health"""
+        with self._lock:
+            return {
+                "valid": self._expired_at is None,
+                "reason": self._reason,
+                "expired_at": self._expired_at,
+                "expirations": self._expirations,
+            }
+
@@ -0,0 +1,197 @@
+import logging
+import random
+import threading
+import time
+from urllib.parse import urlparse
+from services.session_state import auth_wall_reason
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# LinkedIn security checks (captcha / "let's do a quick security check")
+CHALLENGE_MARKERS = ("/checkpoint/challenge",)
+# Chrome's error page for rate-limited responses; LinkedIn uses 999 for bots
+THROTTLE_MARKERS = ("HTTP ERROR 429", "Too Many Requests", "HTTP ERROR 999")
+
+# Outcomes that mean LinkedIn is pushing back on us
+PUSHBACK_OUTCOMES = ("blocked", "throttled")
+# Outcomes that mean LinkedIn served the request normally
+SUCCESS_OUTCOMES = ("ok", "not_found")
+
+
+class ThrottleError(Exception):
+    """Raised when a scrape may not start (backing off or circuit open)"""
+
+
+def backoff_delay(attempt, base, cap):
+    """Jittered exponential backoff: base * 2**attempt, scaled by 0.5-1.5, capped"""
+    return min(cap, base * 2 ** attempt) * random.uniform(0.5, 1.5)
+
+
+def retry_with_backoff(func, attempts=None, base_delay=None, description="operation"):
+    """Call func until it succeeds, sleeping a jittered exponential backoff between tries"""
+    attempts = max(1, attempts or settings.SCRAPER_RETRY_ATTEMPTS)
+    base_delay = settings.SCRAPER_DELAY if base_delay is None else base_delay
+    for attempt in range(attempts):
+        try:
+            return func()
+        except Exception as e:
+            logger.error(f"Attempt {attempt + 1} of {description} failed: {e}")
+            if attempt == attempts - 1:
+                raise
+            time.sleep(backoff_delay(attempt, base_delay, settings.THROTTLE_MAX_BACKOFF))
+
+
+def classify_page(driver):
+    """Classify the page after navigation: ("blocked" | "throttled" | "expired", reason) or (None, None)"""
+    current_url = driver.current_url
+    if urlparse(current_url).path.startswith(CHALLENGE_MARKERS):
+        return "blocked", f"security challenge at {current_url}"
+    head = driver.execute_script("return document.body ? document.body.innerText.slice(0, 500) : ''") or ""
+    for marker in THROTTLE_MARKERS:
+        if marker in head:
+            return "throttled", f"{marker} at {current_url}"
+    reason = auth_wall_reason(driver)
+    if reason:
+        return "expired", reason
+    return None, None
+
+
+class AdaptiveThrottle:
+    """Global scrape throttle driven by the outcomes LinkedIn returns.
+
+    - AIMD concurrency: every successful scrape raises the limit by 1/limit
+      (about +1 per round of scrapes), every throttled/blocked one halves it
+      (at most once per backoff window, so one burst counts once).
+    - Backoff: after pushback no scrape starts until a jittered exponential
+      delay (SCRAPER_DELAY * 2**n) has passed.
+    - Circuit breaker: `breaker_threshold` consecutive pushbacks open the
+      circuit and scrapes fail fast for `breaker_reset` seconds; then a single
+      probe scrape decides whether it closes again.
+    - "unavailable" redirects are a soft signal: `soft_limit` in a row count
+      as one throttled response.
+    """
+
+    def __init__(self, min_concurrency, max_concurrency, base_delay, max_backoff,
+                 breaker_threshold, breaker_reset, soft_limit, acquire_timeout):
+        self.min_concurrency = max(1, min_concurrency)
+        self.max_concurrency = max(self.min_concurrency, max_concurrency)
+        self.base_delay = base_delay
+        self.max_backoff = max_backoff
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset = breaker_reset
+        self.soft_limit = soft_limit
+        self.acquire_timeout = acquire_timeout
+        self._cond = threading.Condition()
+        self._limit = float(self.max_concurrency)
+        self._in_flight = 0
+        self._resume_at = 0.0
+        self._pushback_streak = 0
+        self._soft_streak = 0
+        self._last_decrease = 0.0
+        self._state = "closed"
+        self._opened_at = 0.0
+        self._probing = False
+        self._counts = {}
+
+    def _check_breaker(self, now):
+        """Fail fast while the circuit is open; moves open -> half_open after the reset time"""
+        if self._state == "open" and now - self._opened_at >= self.breaker_reset:
+            self._state = "half_open"
+            logger.info("Throttle circuit half-open, probing LinkedIn with one scrape")
+        if self._state == "open":
+            raise ThrottleError(
+                f"LinkedIn is blocking requests, circuit open for another "
+                f"{self.breaker_reset - (now - self._opened_at):.0f}s"
+            )
+
+    def _has_slot(self):
+        if self._state == "half_open":
+            return not self._probing and self._in_flight == 0
+        return self._in_flight < int(self._limit)
+
+    def acquire(self):
+        """Block until a scrape may start; raises ThrottleError instead of waiting too long"""
+        deadline = time.monotonic() + self.acquire_timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._check_breaker(now)
+                backoff = self._resume_at - now
+                if backoff <= 0 and self._has_slot():
+                    self._in_flight += 1
+                    if self._state == "half_open":
+                        self._probing = True
+                    return
+                remaining = deadline - now
+                if backoff > remaining:
+                    raise ThrottleError(f"Backing off from LinkedIn, retry in {max(backoff, 1):.0f}s")
+                if remaining <= 0:
+                    raise ThrottleError(f"Timed out waiting for a scrape slot (limit {int(self._limit)})")
+                self._cond.wait(timeout=min(remaining, max(backoff, 0.05)))
+
+    def _pushback(self, now, outcome):
+        self._pushback_streak += 1
+        delay = backoff_delay(self._pushback_streak - 1, self.base_delay, self.max_backoff)
+        self._resume_at = max(self._resume_at, now + delay)
+        if now - self._last_decrease >= delay or self._state == "half_open":
+            self._limit = max(self.min_concurrency, self._limit / 2)
+            self._last_decrease = now
+        if self._state == "half_open" or self._pushback_streak >= self.breaker_threshold:
+            if self._state != "open":
+                logger.error(f"Throttle circuit open after {self._pushback_streak} {outcome} responses")
+            self._state = "open"
+            self._opened_at = now
+        else:
+            logger.info(f"LinkedIn returned {outcome}, backing off {delay:.1f}s, concurrency limit {self._limit:.1f}")
+
+    def release(self, outcome):
+        """Feed a scrape's outcome back: ok, not_found, unavailable, blocked, throttled, ..."""
+        with self._cond:
+            now = time.monotonic()
+            self._in_flight -= 1
+            self._counts[outcome] = self._counts.get(outcome, 0) + 1
+            if outcome == "unavailable":
+                self._soft_streak += 1
+                if self._soft_streak >= self.soft_limit:
+                    self._soft_streak = 0
+                    self._pushback(now, "repeated unavailable")
+            elif outcome in PUSHBACK_OUTCOMES:
+                self._soft_streak = 0
+                self._pushback(now, outcome)
+            elif outcome in SUCCESS_OUTCOMES:
+                self._soft_streak = 0
+                self._pushback_streak = 0
+                self._limit = min(self.max_concurrency, self._limit + 1 / self._limit)
+                if self._state == "half_open":
+                    logger.info("Throttle circuit closed again")
+                    self._state = "closed"
+            if self._state != "open":
+                self._probing = False
+            self._cond.notify_all()
+
+    def stats(self):
+        """Throttle state, reported by /health"""
+        with self._cond:
+            return {
+                "state": self._state,
+                "concurrency_limit": round(self._limit, 2),
+                "in_flight": self._in_flight,
+                "backoff_remaining": round(max(0.0, self._resume_at - time.monotonic()), 1),
+                "pushback_streak": self._pushback_streak,
+                "outcomes": dict(self._counts),
+            }
+
+
+# Global throttle shared by the profile and company scrapers
+throttle = AdaptiveThrottle(
+    min_concurrency=settings.THROTTLE_MIN_CONCURRENCY,
+    max_concurrency=settings.THROTTLE_MAX_CONCURRENCY,
+    base_delay=settings.SCRAPER_DELAY,
+    max_backoff=settings.THROTTLE_MAX_BACKOFF,
+    breaker_threshold=settings.THROTTLE_BREAKER_THRESHOLD,
+    breaker_reset=settings.THROTTLE_BREAKER_RESET,
+    soft_limit=settings.THROTTLE_SOFT_LIMIT,
+    acquire_timeout=settings.DRIVER_ACQUIRE_TIMEOUT,
+)
@@ -0,0 +1,27 @@
+import time
+from contextlib import contextmanager
+from services.metrics import observe_phase
+
+
+class PhaseTimer:
+    """Records how long each phase of a scrape actually took, in seconds.
+
+    Every finished phase is also observed in the per-phase metrics histogram.
+    """
+
+    def __init__(self, scrape_type="scrape"):
+        self.scrape_type = scrape_type
+        self.phases = {}
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.phases[name] = self.phases.get(name, 0.0) + elapsed
+            observe_phase(self.scrape_type, name, elapsed)
+
+    def report(self):
+        return {name: round(seconds, 3) for name, seconds in self.phases.items()}
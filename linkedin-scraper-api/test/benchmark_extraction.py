@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark the in-page (single execute_script) extraction against the
+per-XPath extraction on the saved HTML files in test/htmls.
+
+Usage: python test/benchmark_extraction.py [--runs 5]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from selenium import webdriver
+
+# Add the parent directory to the path so we can import services
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.scraping_utils import options, get_chrome_service
+from services.page_extractor import extract_profile_in_page, extract_profile_by_xpath
+
+# Synthetic profile pages shipped with the benchmark suite
+FIXTURE_PROFILES_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "fixtures", "profiles"
+)
+
+MODES = {
+    "script": extract_profile_in_page,
+    "xpath": extract_profile_by_xpath,
+}
+
+
+def count_round_trips(driver):
+    """Wrap driver.execute so every WebDriver command is counted"""
+    counter = {"calls": 0}
+    original = driver.execute
+
+    def counting_execute(*args, **kwargs):
+        counter["calls"] += 1
+        return original(*args, **kwargs)
+
+    driver.execute = counting_execute
+    return counter
+
+
+def benchmark_file(driver, counter, file_path, runs):
+    driver.get(f"file://{file_path}")
+    results = {}
+    for mode, extract in MODES.items():
+        durations = []
+        for _ in range(runs):
+            counter["calls"] = 0
+            start = time.perf_counter()
+            fields = extract(driver)
+            durations.append(time.perf_counter() - start)
+        results[mode] = {
+            "median_ms": statistics.median(durations) * 1000,
+            "round_trips": counter["calls"],
+            "fields": fields,
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5, help="extractions per file and mode")
+    parser.add_argument("--dir", default=FIXTURE_PROFILES_DIR,
+                        help="directory of saved profile pages (default: the bundled benchmark fixtures)")
+    args = parser.parse_args()
+
+    test_htmls_dir = os.path.abspath(args.dir)
+    files = sorted(f for f in os.listdir(test_htmls_dir) if f.endswith(".html")) if os.path.isdir(test_htmls_dir) else []
+    if not files:
+        print(f"❌ No saved HTML files found in {test_htmls_dir}")
+        return
+
+    driver = webdriver.Chrome(service=get_chrome_service(), options=options)
+    counter = count_round_trips(driver)
+    totals = {mode: [] for mode in MODES}
+    try:
+        print(f"{'file':40} {'mode':8} {'median ms':>10} {'round-trips':>12}")
+        for filename in files:
+            results = benchmark_file(driver, counter, os.path.join(test_htmls_dir, filename), args.runs)
+            for mode, result in results.items():
+                totals[mode].append(result["median_ms"])
+                print(f"{filename:40} {mode:8} {result['median_ms']:10.1f} {result['round_trips']:12d}")
+            # Both modes must return the same dict shape and values
+            if results["script"]["fields"] != results["xpath"]["fields"]:
+                print(f"⚠️  {filename}: script and xpath extraction returned different fields")
+    finally:
+        driver.quit()
+
+    print()
+    for mode, medians in totals.items():
+        print(f"{mode:8} mean of medians: {statistics.mean(medians):.1f} ms over {len(medians)} files")
+
+
+if __name__ == "__main__":
+    main()
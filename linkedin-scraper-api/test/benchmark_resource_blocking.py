@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Measure page-load time and bytes transferred with and without resource
+blocking, against a local fixture server (no LinkedIn access needed).
+
+The fixture page references images, a web font, a video and a third-party
+tracker script (served from tracker.localhost, which Chrome resolves to the
+loopback interface). Every request is counted by the server.
+
+Usage: python test/benchmark_resource_blocking.py [--runs 5] [--asset-delay 0.05]
+"""
+
+import argparse
+import http.server
+import os
+import statistics
+import sys
+import threading
+import time
+from selenium import webdriver
+
+# Add the parent directory to the path so we can import services
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.scraping_utils import build_chrome_options, get_chrome_service, blocked_url_patterns, apply_resource_blocking
+
+TRACKER_DOMAIN = "tracker.localhost"
+
+ASSETS = {
+    "/avatar.jpg": ("image/jpeg", 150_000),
+    "/banner.jpg": ("image/jpeg", 400_000),
+    "/logo.png": ("image/png", 60_000),
+    "/font.woff2": ("font/woff2", 120_000),
+    "/intro.mp4": ("video/mp4", 1_500_000),
+    "/track.js": ("application/javascript", 80_000),
+}
+
+
+def fixture_page(port):
+    tracker = f"http://{TRACKER_DOMAIN}:{port}/track.js"
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8">
+<style>@font-face {{ font-family: Fixture; src: url(/font.woff2) format("woff2"); }}
+body {{ font-family: Fixture, sans-serif; }}</style>
+<script src="{tracker}"></script>
+</head><body>
+<main><section class="artdeco-card">
+<h1>Fixture Person</h1>
+<img class="pv-top-card-profile-picture__image" src="/avatar.jpg?profile-displayphoto">
+<img src="/banner.jpg"><img src="/logo.png">
+<div class="text-body-medium break-words">Engineer at Fixture Corp</div>
+<video src="/intro.mp4" autoplay muted preload="auto"></video>
+</section></main>
+</body></html>""".encode()
+
+
+class FixtureServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, asset_delay):
+        super().__init__(("127.0.0.1", 0), FixtureHandler)
+        self.asset_delay = asset_delay
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.bytes_sent = 0
+            self.requests = 0
+
+    def record(self, size):
+        with self.lock:
+            self.bytes_sent += size
+            self.requests += 1
+
+
+class FixtureHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path in ("/", "/profile"):
+            content_type, body = "text/html; charset=utf-8", fixture_page(self.server.server_port)
+        elif path in ASSETS:
+            content_type, size = ASSETS[path]
+            body = b"\0" * size
+            # Simulate network latency for the heavy assets
+            time.sleep(self.server.asset_delay)
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.record(len(body))
+
+    def log_message(self, format, *args):
+        pass
+
+
+def measure(server, resource_blocking, page_load_strategy, runs):
+    """Load the fixture page `runs` times, returning durations and bytes served"""
+    options = build_chrome_options(resource_blocking=resource_blocking, page_load_strategy=page_load_strategy)
+    driver = webdriver.Chrome(service=get_chrome_service(), options=options)
+    try:
+        driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": True})
+        if resource_blocking:
+            apply_resource_blocking(driver, blocked_url_patterns(block_domains=[TRACKER_DOMAIN]))
+        url = f"http://127.0.0.1:{server.server_port}/profile"
+        durations, transferred, requests = [], [], []
+        for _ in range(runs):
+            driver.get("about:blank")
+            server.reset()
+            start = time.perf_counter()
+            driver.get(url)
+            # Same readiness signal the scrapers wait for
+            driver.find_element("xpath", "//main//h1")
+            durations.append(time.perf_counter() - start)
+            # Give late requests (video, tracker) a moment to hit the server
+            time.sleep(0.5)
+            transferred.append(server.bytes_sent)
+            requests.append(server.requests)
+        return {
+            "median_ms": statistics.median(durations) * 1000,
+            "kb": statistics.median(transferred) / 1024,
+            "requests": statistics.median(requests),
+        }
+    finally:
+        driver.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="page loads per configuration")
+    parser.add_argument("--asset-delay", type=float, default=0.05, help="seconds of latency per asset")
+    args = parser.parse_args()
+
+    server = FixtureServer(args.asset_delay)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    configurations = [
+        ("baseline", False, "normal"),
+        ("blocking", True, "normal"),
+        ("blocking+eager", True, "eager"),
+    ]
+    try:
+        results = {name: measure(server, blocking, strategy, args.runs) for name, blocking, strategy in configurations}
+    finally:
+        server.shutdown()
+
+    baseline = results["baseline"]
+    print(f"{'configuration':16} {'median ms':>10} {'KB served':>10} {'requests':>9}")
+    for name, result in results.items():
+        print(f"{name:16} {result['median_ms']:10.1f} {result['kb']:10.1f} {result['requests']:9.0f}")
+    for name, result in results.items():
+        if name == "baseline":
+            continue
+        saved_time = 100 * (1 - result["median_ms"] / baseline["median_ms"])
+        saved_bytes = 100 * (1 - result["kb"] / baseline["kb"])
+        print(f"{name}: {saved_time:.0f}% faster, {saved_bytes:.0f}% fewer bytes than baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ import asyncio
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from services.candidate_scraper import scrape_linkedin_profile
+from services.scrape_executor import run_scrape
 import json
 import os
 
@@ -20,8 +21,8 @@ async def debug_scrape_profile():
     print(f"\n🔍 开始抓取LinkedIn档案: {linkedin_id}")
     print("=" * 50)
     
-    # 抓取数据 - 使用 await 调用异步函数
-    result = await scrape_linkedin_profile(linkedin_id)
+    # 抓取数据 - 在抓取线程池中运行阻塞的Selenium函数
+    result = await run_scrape(scrape_linkedin_profile, linkedin_id)
     
     print("\n📊 抓取结果:")
     print("=" * 50)
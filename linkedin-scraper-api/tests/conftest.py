@@ -0,0 +1,80 @@
+"""
+Shared setup for the unit tests (pytest tests/).
+
+config.py reads the environment on import, so the settings the tests rely on
+are set here before any service is imported: the fake scraper backend, the
+single account from LINKEDIN_ACCESS_TOKEN, no selector stats file, no disk
+cache tier, metrics off and state files in a temporary directory.
+"""
+
+import importlib
+import os
+import sys
+import tempfile
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_state_dir = tempfile.mkdtemp(prefix="linkedin-scraper-tests-")
+os.environ.update({
+    "SCRAPER_BACKEND": "fake",
+    "JOBS_DB_PATH": os.path.join(_state_dir, "jobs.db"),
+    "SCHEDULER_DB_PATH": os.path.join(_state_dir, "scheduler.db"),
+    "LINKEDIN_ACCOUNTS_FILE": "",
+    "SELECTOR_STATS_PATH": "",
+    "DATABASE_URL": "",
+    "ENABLE_METRICS": "false",
+})
+os.environ.setdefault("LINKEDIN_ACCESS_TOKEN", "test-token")
+os.environ.setdefault("LINKEDIN_ACCESS_TOKEN_EXP", str(int(time.time()) + 86400))
+
+
+class FakeClock:
+    """Stands in for the `time` module of the services under test"""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+# Services whose `time` module the clock fixture replaces
+CLOCK_MODULES = ("services.scrape_cache", "services.page_waits", "services.session_state",
+                 "services.account_registry", "services.throttle")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A fake clock the tests move forward by hand (clock.now += seconds)"""
+    clock = FakeClock()
+    for name in CLOCK_MODULES:
+        monkeypatch.setattr(importlib.import_module(name), "time", clock)
+    return clock
+
+
+@pytest.fixture
+def direct_dispatch(monkeypatch):
+    """Send every dispatched scrape to this process's scraper, without the result cache"""
+    from config import settings
+    monkeypatch.setattr(settings, "CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "SCHEDULER_MODE", "local")
+
+
+@pytest.fixture
+def fake_backend(monkeypatch, direct_dispatch):
+    """Fake scraper backend that answers instantly and never fails"""
+    from config import settings
+    for name in ("FAKE_SCRAPER_LATENCY", "FAKE_SCRAPER_JITTER", "FAKE_SCRAPER_ERROR_RATE",
+                 "FAKE_SCRAPER_NOT_FOUND_RATE", "FAKE_SCRAPER_THROTTLE_RATE"):
+        monkeypatch.setattr(settings, name, 0.0)
@@ -0,0 +1,142 @@
+import pytest
+
+from services.account_registry import Account, AccountRegistry, AccountUnavailableError, TokenBucket
+from services.session_state import SESSION_EXPIRED_ERROR
+
+
+def make_account(name, rate_per_minute=60, burst=5):
+    return Account(name=name, token=f"token-{name}", expires="", rate_per_minute=rate_per_minute, burst=burst)
+
+
+def make_registry(*accounts, cooldown=60, error_threshold=3, acquire_timeout=30):
+    return AccountRegistry(list(accounts), cooldown=cooldown, error_threshold=error_threshold,
+                           acquire_timeout=acquire_timeout)
+
+
+def test_bucket_starts_full_and_empties(clock):
+    bucket = TokenBucket(rate_per_minute=60, burst=2)
+    assert bucket.take() and bucket.take()
+    assert not bucket.take()
+    assert bucket.wait_time() == pytest.approx(1.0)
+
+
+def test_bucket_refills_at_rate_up_to_burst(clock):
+    bucket = TokenBucket(rate_per_minute=30, burst=2)
+    bucket.take()
+    bucket.take()
+    clock.now += 1
+    assert bucket.available() == pytest.approx(0.5)
+    assert bucket.wait_time() == pytest.approx(1.0)
+    clock.now += 1
+    assert bucket.wait_time() == 0.0
+    clock.now += 60
+    assert bucket.available() == 2
+
+
+def test_bucket_without_rate_never_refills(clock):
+    bucket = TokenBucket(rate_per_minute=0, burst=1)
+    bucket.take()
+    assert bucket.wait_time() == float("inf")
+
+
+def test_acquire_picks_least_loaded_account(clock):
+    first, second = make_account("first"), make_account("second")
+    registry = make_registry(first, second)
+    assert registry.acquire() is first
+    assert registry.acquire() is second
+    assert registry.acquire() is first
+    registry.release(first, "ok")
+    registry.release(first, "ok")
+    assert first.in_flight == 0 and second.in_flight == 1
+    assert registry.acquire() is first
+
+
+def test_acquire_prefers_account_with_more_budget(clock):
+    first, second = make_account("first"), make_account("second")
+    first.bucket.take()
+    assert make_registry(first, second).acquire() is second
+
+
+def test_cooldown_after_error_threshold_grows_exponentially(clock):
+    account = make_account("only")
+    registry = make_registry(account, cooldown=60, error_threshold=3)
+    for _ in range(2):
+        registry.release(registry.acquire(), "error")
+    assert account.cooldown_remaining() == 0
+
+    registry.release(registry.acquire(), "throttled")
+    assert account.cooldown_remaining() == 60
+
+    clock.now += 60
+    registry.release(registry.acquire(), "error")
+    assert account.cooldown_remaining() == 120
+
+    clock.now += 120
+    for expected in (240, 480, 600, 600):
+        registry.release(registry.acquire(), "error")
+        assert account.cooldown_remaining() == expected
+        clock.now += expected
+
+
+def test_success_resets_consecutive_errors(clock):
+    account = make_account("only")
+    registry = make_registry(account, error_threshold=3)
+    registry.release(registry.acquire(), "error")
+    registry.release(registry.acquire(), "error")
+    registry.release(registry.acquire(), "ok")
+    registry.release(registry.acquire(), "error")
+    assert account.consecutive_errors == 1
+    assert account.errors == 3
+    assert account.cooldown_remaining() == 0
+
+
+def test_aborted_scrape_does_not_count_against_account(clock):
+    account = make_account("only")
+    registry = make_registry(account, error_threshold=1)
+    registry.release(registry.acquire(), "aborted")
+    assert account.errors == 0
+    assert account.cooldown_remaining() == 0
+
+
+def test_blocked_cools_down_immediately(clock):
+    blocked, other = make_account("blocked"), make_account("other")
+    registry = make_registry(blocked, other, cooldown=60, error_threshold=3)
+    registry.release(registry.acquire(), "blocked")
+    assert blocked.cooldown_remaining() == 60
+    assert registry.acquire() is other
+    assert registry.acquire() is other
+
+
+def test_acquire_waits_for_cooldown_to_end(clock):
+    account = make_account("only")
+    registry = make_registry(account, cooldown=10, error_threshold=1, acquire_timeout=30)
+    registry.release(registry.acquire(), "blocked")
+    assert registry.acquire() is account
+    assert sum(clock.sleeps) == pytest.approx(10)
+
+
+def test_acquire_fails_when_budget_exhausted_past_timeout(clock):
+    account = make_account("only", rate_per_minute=1, burst=1)
+    registry = make_registry(account, acquire_timeout=30)
+    registry.acquire()
+    with pytest.raises(AccountUnavailableError, match="budget exhausted"):
+        registry.acquire()
+    assert clock.sleeps == []
+
+
+def test_acquire_fails_once_every_account_is_expired(clock):
+    first, second = make_account("first"), make_account("second")
+    registry = make_registry(first, second)
+    registry.mark_expired(first, "redirected to /login")
+    assert registry.acquire() is second
+    registry.mark_expired(second, "redirected to /login")
+    with pytest.raises(AccountUnavailableError) as error:
+        registry.acquire()
+    assert str(error.value) == SESSION_EXPIRED_ERROR
+    assert registry.summary()["valid"] == 0
+
+
+def test_share_splits_budget_between_processes(clock):
+    account = make_account("only", rate_per_minute=60)
+    make_registry(account).share(3)
+    assert account.bucket.rate == pytest.approx(20 / 60)
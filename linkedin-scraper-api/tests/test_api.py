@@ -0,0 +1,144 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from config import settings
+from services import scrape_dispatcher
+
+
+@pytest.fixture
+def client(monkeypatch, direct_dispatch):
+    """API client whose scrapers answer instantly from a dict of pages"""
+    pages = {
+        "alice": {"linkedin_id": "alice", "name": "Alice"},
+        "acme": {"linkedin_id": "acme", "name": "Acme"},
+    }
+
+    def scrape(linkedin_id, fields=None):
+        return pages.get(linkedin_id) or {"error": f"Profile for {linkedin_id} not found."}
+
+    monkeypatch.setitem(scrape_dispatcher.SCRAPERS, "profile", scrape)
+    monkeypatch.setitem(scrape_dispatcher.SCRAPERS, "company", scrape)
+    return TestClient(main.app)
+
+
+def batch_lines(response):
+    return sorted((json.loads(line) for line in response.text.splitlines()), key=lambda line: line["index"])
+
+
+def test_batch_streams_one_line_per_url(client):
+    response = client.post("/scrape/batch", json={"urls": [
+        "https://www.linkedin.com/in/alice/",
+        "https://www.linkedin.com/company/acme/",
+        "https://www.linkedin.com/in/nobody/",
+    ]})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    alice, acme, nobody = batch_lines(response)
+    assert (alice["type"], alice["status"], alice["data"]["name"]) == ("profile", "ok", "Alice")
+    assert (acme["type"], acme["status"], acme["data"]["name"]) == ("company", "ok", "Acme")
+    assert (nobody["status"], nobody["status_code"]) == ("error", 422)
+    assert "not found" in nobody["error"]
+
+
+def test_batch_type_applies_to_every_url(client):
+    response = client.post("/scrape/batch", json={"type": "company", "urls": ["https://www.linkedin.com/in/acme/"]})
+    assert batch_lines(response)[0]["type"] == "company"
+
+
+def test_batch_rejects_invalid_urls_up_front(client):
+    response = client.post("/scrape/batch", json={"urls": ["https://www.linkedin.com/in/alice/", "https://example.com/"]})
+    assert response.status_code == 422
+    assert "urls[1]: URL must be a LinkedIn URL" in response.text
+
+
+def test_batch_size_is_limited(client, monkeypatch):
+    monkeypatch.setattr(settings, "BATCH_SIZE_LIMIT", 2)
+    response = client.post("/scrape/batch", json={"urls": ["https://www.linkedin.com/in/alice/"] * 3})
+    assert response.status_code == 422
+    assert client.post("/scrape/batch", json={"urls": []}).status_code == 422
+
+
+def test_job_is_queued_and_readable(client):
+    response = client.post("/jobs", json={"url": "https://www.linkedin.com/in/alice/"})
+    assert response.status_code == 202
+    job = response.json()
+    assert (job["status"], job["priority"]) == ("queued", "interactive")
+    assert client.get(f"/jobs/{job['job_id']}").json()["job_id"] == job["job_id"]
+    assert client.get("/jobs/missing").status_code == 404
+
+
+def test_bulk_job_is_refused_without_a_bulk_worker(client, monkeypatch):
+    monkeypatch.setattr(main.job_queue, "bulk_workers", 0)
+    response = client.post("/jobs", json={"url": "https://www.linkedin.com/in/alice/", "priority": "bulk"})
+    assert response.status_code == 400
+    assert "Bulk jobs are disabled" in response.text
+
+
+def test_company_response_includes_scraped_fields(fake_backend):
+    response = TestClient(main.app).post("/scrape", json={"url": "https://www.linkedin.com/company/acme/", "type": "company"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["name"] == "Fake acme"
+    assert body["industry"] == "Software Development"
+    assert body["about"] == "Fake company served by the fake scraper backend"
+
+
+def test_profile_response_keeps_profile_shape(fake_backend):
+    response = TestClient(main.app).post("/scrape", json={"url": "https://www.linkedin.com/in/alice/", "type": "profile"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["name"] == "Fake alice"
+    assert "experience" in body and "industry" not in body
+
+
+def test_cached_profile_reports_every_section_as_reused(client, monkeypatch):
+    cached = {
+        "name": "Alice", "about": {"positions": ["Hi"]},
+        "sections": {"reused": ["education"], "scraped": ["about", "experience"]},
+    }
+
+    async def dispatch_scrape(scrape_type, linkedin_id, fields=None):
+        return cached, "HIT", 30
+
+    monkeypatch.setattr(main, "dispatch_scrape", dispatch_scrape)
+    response = client.post("/scrape", json={"url": "https://www.linkedin.com/in/alice/", "type": "profile"})
+    assert response.headers["X-Cache"] == "HIT"
+    assert response.json()["sections"] == {"reused": ["education", "about", "experience"], "scraped": []}
+
+
+PROFILE_URL = "https://www.linkedin.com/in/alice/"
+
+
+def test_fields_accept_response_names_and_always_include_name():
+    request = main.ScrapeRequest(url=PROFILE_URL, type="profile", fields=["Headline", "avatar_url"])
+    assert request.fields == ["name", "avatar", "headline"]
+
+
+def test_all_fields_mean_a_full_scrape():
+    request = main.ScrapeRequest(url=PROFILE_URL, type="profile", fields=list(main.PROFILE_FIELDS))
+    assert request.fields is None
+
+
+def test_unknown_field_is_rejected(client):
+    response = client.post("/scrape", json={"url": PROFILE_URL, "type": "profile", "fields": ["name", "salary"]})
+    assert response.status_code == 422
+    assert "Unknown fields salary" in response.text
+
+
+def test_fields_are_rejected_for_company_scrapes(client):
+    response = client.post("/scrape", json={
+        "url": "https://www.linkedin.com/company/acme/", "type": "company", "fields": ["name"],
+    })
+    assert response.status_code == 422
+    assert "only be selected for profile scrapes" in response.text
+
+
+def test_response_only_holds_requested_fields(fake_backend):
+    response = TestClient(main.app).post("/scrape", json={"url": PROFILE_URL, "type": "profile", "fields": ["headline"]})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["name"] == "Fake alice" and body["headline"]
+    assert body["experience"] is None and body["education"] is None
@@ -0,0 +1,36 @@
+import glob
+import os
+
+import pytest
+from lxml import html as lxml_html
+
+from benchmarks.fixture_server import DEFAULT_CORPUS
+from services.candidate_scraper import SHOW_MORE_XPATH
+from services.html_parser import parse_company_html, parse_file
+
+PROFILE_FIXTURES = sorted(glob.glob(os.path.join(DEFAULT_CORPUS, "profiles", "*.html")))
+COMPANY_FIXTURES = sorted(glob.glob(os.path.join(DEFAULT_CORPUS, "companies", "*.html")))
+
+
+@pytest.mark.parametrize("path", PROFILE_FIXTURES, ids=os.path.basename)
+def test_profile_fixture_exercises_expansion(path):
+    """The benchmark only measures the expand phase if the scraper finds the fixture's buttons"""
+    with open(path, encoding="utf-8") as f:
+        root = lxml_html.fromstring(f.read())
+    collapsed = root.xpath("//*[contains(@class, 'inline-show-more-text--is-collapsed')]")
+    assert collapsed
+    assert len(root.xpath(SHOW_MORE_XPATH)) >= len(collapsed)
+
+
+@pytest.mark.parametrize("path", PROFILE_FIXTURES, ids=os.path.basename)
+def test_profile_fixture_parses_into_a_full_profile(path):
+    profile = parse_file(path)
+    assert profile["name"] and profile["headline"] and profile["avatar"]
+    assert profile["experience"]["positions"]
+    assert profile["about"]["institutions"] == ["About"]
+
+
+@pytest.mark.parametrize("path", COMPANY_FIXTURES, ids=os.path.basename)
+def test_company_fixture_parses_into_a_full_company(path):
+    company = parse_file(path, parse_company_html)
+    assert company["name"] and company["industry"] and company["about"]
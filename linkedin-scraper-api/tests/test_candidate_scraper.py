@@ -0,0 +1,118 @@
+import pytest
+
+from config import settings
+from services import candidate_scraper
+from services.candidate_scraper import plan_sections, scrape_linkedin_profile
+from services.driver_pool import PooledDriver
+
+SECTIONS = ["Education", "Experience", "About"]
+FINGERPRINTS = {"top_card": "t1", "about": "a1", "experience": "x1", "education": "e1"}
+
+
+def previous_scrape(**changes):
+    fingerprints = dict(FINGERPRINTS, **changes)
+    return {"name": "Alice", "about": {}, "experience": {}, "education": {}, "fingerprints": fingerprints}
+
+
+def test_unchanged_sections_are_reused():
+    assert plan_sections(previous_scrape(), FINGERPRINTS) == (SECTIONS, [])
+
+
+def test_changed_section_is_rescraped():
+    reused, changed = plan_sections(previous_scrape(experience="x0"), FINGERPRINTS)
+    assert reused == ["Education", "About"]
+    assert changed == ["Experience"]
+
+
+def test_changed_top_card_rescrapes_everything():
+    assert plan_sections(previous_scrape(top_card="t0"), FINGERPRINTS) == ([], SECTIONS)
+
+
+def test_section_missing_from_previous_result_is_rescraped():
+    # e.g. the previous scrape only asked for some fields
+    previous = previous_scrape()
+    del previous["education"]
+    assert plan_sections(previous, FINGERPRINTS) == (["Experience", "About"], ["Education"])
+
+
+def test_without_previous_result_everything_is_scraped():
+    assert plan_sections(None, FINGERPRINTS) == ([], SECTIONS)
+    assert plan_sections(previous_scrape(), {"top_card": None}) == ([], SECTIONS)
+
+
+def test_empty_fingerprint_is_never_reused():
+    previous = previous_scrape(about="")
+    reused, changed = plan_sections(previous, dict(FINGERPRINTS, about=""))
+    assert "About" in changed and "About" not in reused
+
+
+class FakeDriver:
+    current_url = "https://www.linkedin.com/in/alice/"
+    page_source = "<html></html>"
+
+    def get(self, url):
+        pass
+
+
+class FakeAccount:
+    name = "default"
+
+
+class FakeAccountRegistry:
+    def acquire(self):
+        return FakeAccount()
+
+    def release(self, account, outcome):
+        pass
+
+    def mark_valid(self, account):
+        pass
+
+
+class FakeDriverPool:
+    def acquire(self, account=None):
+        return PooledDriver(FakeDriver(), account)
+
+    def release(self, pooled, broken=False):
+        pass
+
+
+class FakeThrottle:
+    def acquire(self):
+        pass
+
+    def release(self, outcome):
+        pass
+
+
+@pytest.fixture
+def browser(monkeypatch):
+    """scrape_linkedin_profile on a fake page, recording which sections were extracted"""
+    extracted = []
+
+    def extract_profile_fields(driver, sections=None):
+        extracted.append(sections)
+        return {"name": "Alice", "headline": "Engineer", "avatar": None}
+
+    def fail(*args, **kwargs):
+        raise AssertionError("the page must not be scrolled or expanded")
+
+    monkeypatch.setattr(settings, "EXTRACTION_MODE", "script")
+    monkeypatch.setattr(settings, "INCREMENTAL_RESCRAPE", True)
+    monkeypatch.setattr(candidate_scraper, "throttle", FakeThrottle())
+    monkeypatch.setattr(candidate_scraper, "account_registry", FakeAccountRegistry())
+    monkeypatch.setattr(candidate_scraper, "driver_pool", FakeDriverPool())
+    monkeypatch.setattr(candidate_scraper, "classify_page", lambda driver: (None, None))
+    monkeypatch.setattr(candidate_scraper, "wait_for_any_xpath", lambda *args: True)
+    monkeypatch.setattr(candidate_scraper, "extract_profile_fields", extract_profile_fields)
+    monkeypatch.setattr(candidate_scraper, "scroll_to_bottom", fail)
+    monkeypatch.setattr(candidate_scraper, "click_all_show_more", fail)
+    monkeypatch.setattr(candidate_scraper, "section_fingerprints", fail)
+    return extracted
+
+
+def test_top_card_only_scrape_skips_scroll_and_expansion(browser):
+    result = scrape_linkedin_profile("alice", ["name", "headline"])
+    assert result["name"] == "Alice" and result["headline"] == "Engineer"
+    assert result["experience"] is None and result["about"] is None
+    assert browser == [[]]
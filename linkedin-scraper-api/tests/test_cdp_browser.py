@@ -0,0 +1,105 @@
+from services import cdp_browser
+from services import driver_pool as pool_module
+from services.browser_engine import CdpEngine
+from services.candidate_scraper import click_all_show_more
+from services.cdp_browser import CdpDriver, OBJECT_GROUP
+from services.driver_pool import DriverPool, PooledDriver
+
+
+class FakeBrowser:
+    """Answers the protocol commands CdpDriver sends for a page of buttons"""
+
+    def __init__(self, buttons):
+        # object id -> {"disabled": bool, "clicked": bool}
+        self.buttons = {object_id: {"disabled": disabled, "clicked": False} for object_id, disabled in buttons}
+        self.sent = []
+        self.navigations = 0
+
+    def send(self, method, params=None, session_id=None, timeout=None):
+        self.sent.append((method, params))
+        if method == "Runtime.evaluate":
+            return {"result": {"type": "object", "objectId": "found"}}
+        if method == "Runtime.getProperties":
+            items = [{"name": str(index), "value": {"objectId": object_id}}
+                     for index, object_id in enumerate(self.buttons)]
+            return {"result": items + [{"name": "length", "value": {"value": len(items)}}]}
+        if method == "Runtime.callFunctionOn":
+            return {"result": {"value": self._call(params["functionDeclaration"], self.buttons[params["objectId"]])}}
+        return {}
+
+    @staticmethod
+    def _call(function, button):
+        if function == cdp_browser.ELEMENT_DISPLAYED_JS:
+            return True
+        if function == cdp_browser.ELEMENT_ENABLED_JS:
+            return not button["disabled"]
+        if function == cdp_browser.ELEMENT_CLICK_JS:
+            button["clicked"] = True
+        if function == cdp_browser.ELEMENT_TEXT_JS:
+            return "Show less" if button["clicked"] else "Show more"
+        return None
+
+    def run(self, coroutine, timeout=None):
+        self.navigations += 1
+        coroutine.close()
+
+
+def make_driver(*buttons):
+    return CdpDriver(FakeBrowser(buttons), "target", "session", "context")
+
+
+def test_click_all_show_more_clicks_enabled_buttons():
+    driver = make_driver(("enabled", False), ("disabled", True))
+    click_all_show_more(driver, timeout=5)
+    assert driver.browser.buttons["enabled"]["clicked"]
+    assert not driver.browser.buttons["disabled"]["clicked"]
+
+
+def test_remote_objects_are_created_in_the_scrape_group():
+    driver = make_driver(("button", False))
+    click_all_show_more(driver, timeout=5)
+    calls = [params for method, params in driver.browser.sent if method in ("Runtime.evaluate", "Runtime.callFunctionOn")]
+    assert calls and all(params["objectGroup"] == OBJECT_GROUP for params in calls)
+
+
+def test_pool_release_frees_the_scrape_group(monkeypatch):
+    monkeypatch.setattr(pool_module, "browser_engine", CdpEngine(tabs_per_browser=1, tab_timeout=0))
+    driver = make_driver(("button", False))
+    DriverPool(size=1, max_uses=10, acquire_timeout=1).release(PooledDriver(driver))
+    assert ("Runtime.releaseObjectGroup", {"objectGroup": OBJECT_GROUP}) in driver.browser.sent
+    assert driver.browser.navigations == 1
+
+
+class FakeChrome:
+    def __init__(self):
+        self.tabs = 0
+        self.alive = True
+        self.connection = None
+        self.process = type("Process", (), {"pid": 1234})()
+
+    def new_tab(self):
+        self.tabs += 1
+        return self
+
+    def quit(self):
+        self.alive = False
+
+
+def test_tabs_fill_the_least_busy_browser_before_starting_another(monkeypatch):
+    engine = CdpEngine(tabs_per_browser=2, tab_timeout=0)
+
+    def start_browser():
+        engine._browsers.append(FakeChrome())
+        return engine._browsers[-1]
+
+    monkeypatch.setattr(engine, "_start_browser", start_browser)
+    first = engine.launch()
+    assert engine.launch() is first
+    second = engine.launch()
+    assert second is not first
+    first.tabs -= 1
+    assert engine.launch() is first
+    # A crashed Chrome is dropped rather than handed new tabs
+    second.alive = False
+    assert engine.launch() not in (first, second)
+    assert len(engine._browsers) == 2
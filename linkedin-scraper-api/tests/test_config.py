@@ -0,0 +1,12 @@
+from config import tabs_for_memory
+
+
+def test_tabs_for_memory_counts_a_chrome_per_tabs_per_browser():
+    # Two full browsers of 400 + 4 * 100 MB, then 200 MB left: no room for a third Chrome's tab
+    assert tabs_for_memory(1800, 400, 100, 4) == 8
+    # 600 MB left: a third Chrome with two tabs
+    assert tabs_for_memory(2200, 400, 100, 4) == 10
+
+
+def test_tabs_for_memory_keeps_at_least_one_tab():
+    assert tabs_for_memory(100, 400, 100, 4) == 1
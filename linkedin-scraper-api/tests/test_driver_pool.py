@@ -0,0 +1,96 @@
+import pytest
+
+from services import driver_pool as pool_module
+from services.driver_pool import DriverPool, DriverPoolError
+
+
+class FakeDriver:
+    def __init__(self, healthy=True):
+        self.healthy = healthy
+        self.quit_calls = 0
+        self.urls = []
+
+    def get(self, url):
+        self.urls.append(url)
+
+    def execute_script(self, script):
+        if not self.healthy:
+            raise RuntimeError("browser is gone")
+        return 1
+
+    def quit(self):
+        self.quit_calls += 1
+
+
+@pytest.fixture
+def launched(monkeypatch):
+    """Drivers handed out by the (fake) Chrome launcher, in launch order"""
+    drivers = []
+
+    def launch():
+        drivers.append(FakeDriver())
+        return drivers[-1]
+
+    monkeypatch.setattr(pool_module.browser_engine, "launch", launch)
+    monkeypatch.setattr(pool_module, "apply_resource_blocking", lambda driver: None)
+    monkeypatch.setattr(pool_module, "add_session_cookie", lambda driver, **kwargs: None)
+    return drivers
+
+
+def test_launch_quits_driver_when_authentication_fails(monkeypatch, launched):
+    def fail(driver, **kwargs):
+        raise RuntimeError("could not set cookie")
+
+    monkeypatch.setattr(pool_module, "add_session_cookie", fail)
+    with pytest.raises(RuntimeError):
+        DriverPool(size=1, max_uses=1, acquire_timeout=1)._launch()
+    assert launched[0].quit_calls == 1
+
+
+def test_launch_applies_resource_blocking_before_authenticating(monkeypatch, launched):
+    calls = []
+    monkeypatch.setattr(pool_module, "apply_resource_blocking", lambda driver: calls.append("block"))
+    monkeypatch.setattr(pool_module, "add_session_cookie", lambda driver, **kwargs: calls.append("cookie"))
+    DriverPool(size=1, max_uses=1, acquire_timeout=1)._launch()
+    assert calls == ["block", "cookie"]
+
+
+def test_released_driver_is_reset_to_a_blank_page(launched):
+    pool = DriverPool(size=1, max_uses=10, acquire_timeout=0)
+    pool.release(pool.acquire())
+    assert launched[0].urls == ["about:blank"]
+
+
+def test_released_driver_is_reused_until_max_uses(launched):
+    pool = DriverPool(size=1, max_uses=2, acquire_timeout=0)
+    first = pool.acquire()
+    pool.release(first)
+    assert pool.acquire() is first
+    pool.release(first)
+    assert launched[0].quit_calls == 1
+    assert pool.acquire() is not first
+    assert pool.stats()["launched"] == 2
+
+
+def test_broken_driver_is_recycled(launched):
+    pool = DriverPool(size=1, max_uses=10, acquire_timeout=0)
+    pooled = pool.acquire()
+    pool.release(pooled, broken=True)
+    assert launched[0].quit_calls == 1
+    assert pool.stats()["alive"] == 0
+
+
+def test_unhealthy_idle_driver_is_replaced(launched):
+    pool = DriverPool(size=1, max_uses=10, acquire_timeout=0)
+    pooled = pool.acquire()
+    pool.release(pooled)
+    pooled.driver.healthy = False
+    assert pool.acquire().driver is launched[1]
+    assert launched[0].quit_calls == 1
+
+
+def test_acquire_times_out_when_pool_is_exhausted(launched):
+    pool = DriverPool(size=1, max_uses=10, acquire_timeout=0)
+    pool.acquire()
+    with pytest.raises(DriverPoolError, match="Timed out"):
+        pool.acquire()
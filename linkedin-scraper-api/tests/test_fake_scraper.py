@@ -0,0 +1,57 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+import main
+from config import settings
+from services import fake_scraper
+from services.fake_scraper import fake_scrape_company, fake_scrape_profile
+
+
+def test_fake_profile_has_every_field(fake_backend):
+    profile = fake_scrape_profile("alice")
+    assert profile["linkedin_id"] == "alice"
+    assert profile["name"] == "Fake alice"
+    assert profile["experience"]["positions"] == ["Software Engineer"]
+    assert "navigation" in profile["timings"]
+
+
+def test_fake_company_has_every_field(fake_backend):
+    company = fake_scrape_company("acme")
+    assert (company["name"], company["industry"]) == ("Fake acme", "Software Development")
+
+
+def test_error_mix_follows_the_configured_rates(fake_backend, monkeypatch):
+    monkeypatch.setattr(settings, "FAKE_SCRAPER_NOT_FOUND_RATE", 0.5)
+    monkeypatch.setattr(settings, "FAKE_SCRAPER_ERROR_RATE", 0.5)
+    rolls = iter([0.2, 0.7])
+    monkeypatch.setattr(fake_scraper.random, "random", lambda: next(rolls))
+    assert fake_scrape_profile("alice") == {"error": "Profile for alice not found."}
+    assert fake_scrape_company("acme") == {"error": "Error fetching company details for acme"}
+
+
+def test_latency_is_lognormal_around_the_median(monkeypatch):
+    monkeypatch.setattr(settings, "FAKE_SCRAPER_LATENCY", 8.0)
+    monkeypatch.setattr(settings, "FAKE_SCRAPER_JITTER", 0.0)
+    assert fake_scraper._latency() == 8.0
+    monkeypatch.setattr(settings, "FAKE_SCRAPER_JITTER", 0.4)
+    monkeypatch.setattr(fake_scraper.random, "lognormvariate", lambda mu, sigma: 1.5)
+    assert fake_scraper._latency() == 12.0
+
+
+def test_startup_skips_the_browser(monkeypatch):
+    started = []
+
+    async def start(handler):
+        started.append(handler)
+
+    monkeypatch.setattr(main.job_queue, "start", start)
+    monkeypatch.setattr(main.driver_pool, "start", lambda accounts: 1 / 0)
+    asyncio.run(main.startup_event())
+    assert started == [main.run_job]
+
+
+def test_api_serves_fake_scrapes(fake_backend):
+    response = TestClient(main.app).post("/scrape", json={"url": "https://www.linkedin.com/in/alice/"})
+    assert response.status_code == 200
+    assert response.json()["name"] == "Fake alice"
@@ -0,0 +1,102 @@
+from services.html_parser import parse_company_html, parse_file, parse_profile_html
+from services.selector_stats import MISS
+
+
+PROFILE_HTML = """
+<html><body>
+<main>
+  <h1 class="inline t-24 v-align-middle break-words">Alice   Example</h1>
+  <img class="pv-top-card-profile-picture__image" src="https://media.example.com/profile-displayphoto/alice.jpg">
+  <div class="text-body-medium break-words">Data engineer at Acme</div>
+  <section>
+    <div id="about"></div>
+    <div class="display-flex full-width">
+      <span aria-hidden="true">I build data pipelines and scrapers, and I write about both of them online.</span>
+    </div>
+  </section>
+  <section>
+    <div id="experience"></div>
+    <ul>
+      <li class="artdeco-list__item">
+        <div class="t-bold"><span>Data engineer</span></div>
+        <span class="t-14 t-normal"><span>Acme</span></span>
+        <span class="t-black--light">2021 - Present</span>
+      </li>
+      <li class="artdeco-list__item">
+        <div class="t-bold"><span>Analyst</span></div>
+        <span class="t-14 t-normal"><span>Initech</span></span>
+      </li>
+    </ul>
+  </section>
+  <section>
+    <h2><span>Education</span></h2>
+    <ul>
+      <li class="artdeco-list__item">
+        <div class="t-bold"><span>Example University</span></div>
+        <span class="t-14 t-normal">BSc, Computer Science</span>
+        <span class="t-black--light">2014 - 2018</span>
+      </li>
+    </ul>
+  </section>
+</main>
+</body></html>
+"""
+
+
+def test_profile_fields_are_parsed_from_the_snapshot():
+    profile = parse_profile_html(PROFILE_HTML)
+    assert profile["name"] == "Alice Example"
+    assert profile["avatar"] == "https://media.example.com/profile-displayphoto/alice.jpg"
+    assert profile["headline"] == "Data engineer at Acme"
+    assert profile["experience"] == {
+        "positions": ["Data engineer", "Analyst"],
+        "institutions": ["Acme", "Initech"],
+        "dates": ["2021 - Present"],
+    }
+    assert profile["education"] == {
+        "positions": ["BSc, Computer Science"],
+        "institutions": ["Example University"],
+        "dates": ["2014 - 2018"],
+    }
+    about = profile["about"]
+    assert about["positions"][0].startswith("I build data pipelines")
+    assert about["institutions"] == ["About"]
+
+
+def test_page_without_a_name_is_not_a_profile():
+    assert parse_profile_html("<html><body><p>Sign in</p></body></html>") == {
+        "name": None,
+        "selector_hits": {"name": {MISS: 1}},
+    }
+
+
+def test_selector_hits_are_returned_with_the_fields():
+    hits = parse_profile_html(PROFILE_HTML)["selector_hits"]
+    assert hits["name"] == {"//h1[contains(@class, 't-24') and contains(@class, 'break-words')]": 1}
+    assert sum(hits["experience.position"].values()) == 2
+    assert hits["experience.date"][MISS] == 1
+
+
+def test_missing_sections_are_empty():
+    profile = parse_profile_html('<html><body><h1 class="t-24 break-words">Bob</h1></body></html>')
+    assert profile["experience"] == {"positions": [], "institutions": [], "dates": []}
+    assert profile["avatar"] is None
+
+
+def test_company_fields_are_parsed_from_the_snapshot():
+    company = parse_company_html("""
+        <html><body>
+          <h1 class="org-top-card-summary__title">Acme</h1>
+          <div class="org-top-card-summary-info-list__info-item">Software Development</div>
+          <div class="org-about-us-organization-description__text">We make everything.</div>
+        </body></html>
+    """)
+    assert company["name"] == "Acme"
+    assert company["industry"] == "Software Development"
+    assert company["about"] == "We make everything."
+
+
+def test_saved_files_are_parsed_as_utf8(tmp_path):
+    path = tmp_path / "alice.html"
+    path.write_text(PROFILE_HTML.replace("Alice   Example", "Alicé Example"), encoding="utf-8")
+    assert parse_file(str(path))["name"] == "Alicé Example"
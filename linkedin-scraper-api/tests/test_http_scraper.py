@@ -0,0 +1,97 @@
+import pytest
+import requests
+
+from services import http_scraper
+from services.http_scraper import _classify_response, scrape_http_first
+
+COMPANY_URL = "https://www.linkedin.com/company/acme/"
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, url=COMPANY_URL, text=""):
+        self.status_code = status_code
+        self.url = url
+        self.text = text
+
+
+@pytest.mark.parametrize("status, url, expected", [
+    (200, COMPANY_URL, None),
+    (200, "https://www.linkedin.com/checkpoint/challenge/abc", "blocked"),
+    (429, COMPANY_URL, "throttled"),
+    (999, COMPANY_URL, "rejected"),
+    (200, "https://www.linkedin.com/authwall?trk=x", "rejected"),
+    (200, "https://www.linkedin.com/company/unavailable/", "unavailable"),
+    (404, COMPANY_URL, "not_found"),
+    (500, COMPANY_URL, "rejected"),
+])
+def test_classify_response(status, url, expected):
+    outcome, reason = _classify_response(FakeResponse(status, url))
+    assert outcome == expected
+    assert (reason is None) == (expected is None)
+
+
+@pytest.fixture
+def http_backend(monkeypatch):
+    """Serve _http_scrape from a canned response, recording account and throttle outcomes"""
+    released = []
+    fetched = {"response": FakeResponse()}
+
+    class FakeSession:
+        def get(self, url, timeout):
+            if isinstance(fetched["response"], Exception):
+                raise fetched["response"]
+            return fetched["response"]
+
+    monkeypatch.setattr(http_scraper.http_sessions, "get", lambda account: FakeSession())
+    monkeypatch.setattr(http_scraper.throttle, "acquire", lambda: None)
+    monkeypatch.setattr(http_scraper.throttle, "release", lambda outcome: released.append(("throttle", outcome)))
+    monkeypatch.setattr(http_scraper.account_registry, "acquire", lambda: "account")
+    monkeypatch.setattr(http_scraper.account_registry, "release",
+                        lambda account, outcome: released.append(("account", outcome)))
+    monkeypatch.setattr(http_scraper, "parse_in_worker", lambda parser, page: parser(page))
+    monkeypatch.setitem(http_scraper.SELENIUM_SCRAPERS, "company",
+                        lambda linkedin_id: {"linkedin_id": linkedin_id, "name": "From the browser"})
+    fetched["released"] = released
+    return fetched
+
+
+def parsed_company(**fields):
+    def parse(page_source, linkedin_id):
+        return {"name": "Acme", "industry": "Software", "about": "Makes things", **fields}
+    return parse
+
+
+def test_complete_page_is_served_over_http(http_backend, monkeypatch):
+    monkeypatch.setitem(http_scraper.PAGE_PARSERS, "company", parsed_company())
+    data = scrape_http_first("company", "acme")
+    assert (data["name"], data["industry"]) == ("Acme", "Software")
+    assert "timings" in data
+    assert http_backend["released"] == [("account", "ok"), ("throttle", "ok")]
+
+
+@pytest.mark.parametrize("response", [
+    FakeResponse(999),
+    FakeResponse(url="https://www.linkedin.com/authwall"),
+    requests.ConnectionError("reset"),
+])
+def test_rejected_fetch_falls_back_to_selenium(http_backend, response):
+    http_backend["response"] = response
+    assert scrape_http_first("company", "acme")["name"] == "From the browser"
+    # A rejection says nothing about the account or the request rate
+    assert http_backend["released"] == [("account", "incomplete"), ("throttle", "incomplete")]
+
+
+def test_page_missing_required_fields_falls_back_to_selenium(http_backend, monkeypatch):
+    monkeypatch.setitem(http_scraper.PAGE_PARSERS, "company", parsed_company(about=None))
+    assert scrape_http_first("company", "acme")["name"] == "From the browser"
+
+
+def test_pushback_is_returned_without_fallback(http_backend):
+    http_backend["response"] = FakeResponse(429)
+    assert "rate limiting" in scrape_http_first("company", "acme")["error"]
+    assert http_backend["released"] == [("account", "throttled"), ("throttle", "throttled")]
+
+
+def test_missing_company_is_not_found_without_fallback(http_backend):
+    http_backend["response"] = FakeResponse(404)
+    assert scrape_http_first("company", "acme") == {"error": "Company profile for acme not found."}
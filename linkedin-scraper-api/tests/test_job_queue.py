@@ -0,0 +1,263 @@
+import asyncio
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from services import job_queue as queue_module
+from services.job_queue import JobQueue
+
+
+def make_queue(tmp_path, workers=2, bulk_workers=1, result_ttl=3600, stale_after=60):
+    return JobQueue(db_path=str(tmp_path / "jobs.db"), workers=workers, bulk_workers=bulk_workers,
+                    callback_timeout=1, result_ttl=result_ttl, stale_after=stale_after)
+
+
+async def wait_until_finished(queue, job_id, timeout=5):
+    for _ in range(int(timeout / 0.01)):
+        job = await queue.get(job_id)
+        if job["status"] in ("done", "failed"):
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def submit(queue, *jobs):
+    async def run():
+        return [await queue.submit(url, "profile", priority) for url, priority in jobs]
+    return asyncio.run(run())
+
+
+def test_interactive_jobs_are_claimed_first_then_in_order(tmp_path):
+    queue = make_queue(tmp_path, bulk_workers=2, workers=3)
+    submit(queue, ("bulk-1", "bulk"), ("interactive-1", "interactive"),
+           ("bulk-2", "bulk"), ("interactive-2", "interactive"))
+    claimed = [queue._claim()["url"] for _ in range(4)]
+    assert claimed == ["interactive-1", "interactive-2", "bulk-1", "bulk-2"]
+    assert queue._claim() is None
+
+
+def test_bulk_jobs_never_take_more_than_their_workers(tmp_path):
+    queue = make_queue(tmp_path, workers=2, bulk_workers=1)
+    submit(queue, ("bulk-1", "bulk"), ("bulk-2", "bulk"))
+    assert queue._claim()["url"] == "bulk-1"
+    # The bulk lane is full: the second bulk job waits, an interactive one does not
+    assert queue._claim() is None
+    submit(queue, ("interactive", "interactive"))
+    assert queue._claim()["url"] == "interactive"
+
+
+def test_one_worker_is_always_kept_for_interactive_jobs(tmp_path):
+    assert make_queue(tmp_path, workers=3, bulk_workers=5).bulk_workers == 2
+    queue = make_queue(tmp_path, workers=1, bulk_workers=1)
+    assert queue.bulk_workers == 0
+    with pytest.raises(ValueError, match="Bulk jobs are disabled"):
+        submit(queue, ("bulk", "bulk"))
+
+
+def test_jobs_run_and_store_their_result(tmp_path):
+    async def handler(job):
+        if job["url"] == "broken":
+            raise RuntimeError("scrape failed")
+        return {"name": job["url"]}
+
+    async def run():
+        queue = make_queue(tmp_path)
+        ok = await queue.submit("alice", "profile")
+        failed = await queue.submit("broken", "profile")
+        await queue.start(handler)
+        try:
+            return await wait_until_finished(queue, ok["id"]), await wait_until_finished(queue, failed["id"])
+        finally:
+            await queue.stop()
+
+    ok, failed = asyncio.run(run())
+    assert (ok["status"], ok["result"]) == ("done", {"name": "alice"})
+    assert (failed["status"], failed["error"]) == ("failed", "scrape failed")
+
+
+def test_interrupted_jobs_are_recovered_on_restart(tmp_path):
+    crashed = make_queue(tmp_path)
+    job, = submit(crashed, ("alice", "interactive"))
+    assert crashed._claim()["id"] == job["id"]
+
+    async def handler(job):
+        return {"name": "Alice"}
+
+    async def restart():
+        queue = make_queue(tmp_path)
+        await queue.start(handler)
+        try:
+            return await wait_until_finished(queue, job["id"])
+        finally:
+            await queue.stop()
+
+    assert asyncio.run(restart())["status"] == "done"
+
+
+def test_finished_jobs_are_purged_after_result_ttl(tmp_path, monkeypatch):
+    queue = make_queue(tmp_path, result_ttl=60)
+    old, recent, queued = submit(queue, ("old", "interactive"), ("recent", "interactive"), ("queued", "interactive"))
+    for job in (old, recent):
+        queue._claim()
+        queue._finish(job["id"], "done", {"name": job["url"]})
+    with sqlite3.connect(queue.db_path) as db:
+        db.execute("UPDATE jobs SET finished_at = finished_at - 120 WHERE id = ?", (old["id"],))
+
+    monkeypatch.setattr(JobQueue, "PURGE_EVERY", 1)
+    queue._claim()
+    queue._finish(queued["id"], "done", {})
+    assert asyncio.run(queue.get(old["id"])) is None
+    assert asyncio.run(queue.get(recent["id"]))["status"] == "done"
+
+
+def test_finished_job_is_posted_to_its_callback(tmp_path, monkeypatch):
+    posted = []
+
+    class FakeClient:
+        def __init__(self, timeout):
+            pass
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def post(self, url, json):
+            posted.append((url, json))
+            return type("Response", (), {"status_code": 204})()
+
+    monkeypatch.setattr(queue_module.httpx, "AsyncClient", FakeClient)
+
+    async def handler(job):
+        return {"name": "Alice"}
+
+    async def run():
+        queue = make_queue(tmp_path)
+        job = await queue.submit("alice", "profile", callback_url="https://example.com/hook")
+        await queue.start(handler)
+        try:
+            await wait_until_finished(queue, job["id"])
+            for _ in range(100):
+                if posted:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await queue.stop()
+
+    asyncio.run(run())
+    (url, job), = posted
+    assert url == "https://example.com/hook"
+    assert (job["status"], job["result"]) == ("done", {"name": "Alice"})
+
+
+def test_worker_survives_database_errors(tmp_path, monkeypatch):
+    queue = make_queue(tmp_path, workers=1)
+    claim = queue._claim
+    failures = []
+
+    def flaky_claim():
+        if not failures:
+            failures.append(1)
+            raise sqlite3.OperationalError("database is locked")
+        return claim()
+
+    monkeypatch.setattr(queue, "_claim", flaky_claim)
+
+    async def handler(job):
+        return {"name": "Alice"}
+
+    async def run():
+        job = await queue.submit("alice", "profile")
+        await queue.start(handler)
+        try:
+            return await wait_until_finished(queue, job["id"])
+        finally:
+            await queue.stop()
+
+    assert asyncio.run(run())["status"] == "done"
+    assert failures == [1]
+
+
+
+def test_each_job_is_claimed_by_one_process(tmp_path):
+    first, second = make_queue(tmp_path, workers=8), make_queue(tmp_path, workers=8)
+    jobs = submit(first, *[(f"job-{i}", "interactive") for i in range(20)])
+    claimed = []
+
+    def drain(queue):
+        while (job := queue._claim()) is not None:
+            claimed.append((queue.owner, job["id"]))
+
+    threads = [threading.Thread(target=drain, args=(queue,)) for queue in (first, second) * 2]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(job_id for _, job_id in claimed) == sorted(job["id"] for job in jobs)
+    with sqlite3.connect(first.db_path) as db:
+        owners = dict(db.execute("SELECT id, owner FROM jobs").fetchall())
+    assert all(owners[job_id] == owner for owner, job_id in claimed)
+
+
+def set_owner(queue, job_id, owner, heartbeat_age):
+    with sqlite3.connect(queue.db_path) as db:
+        db.execute("UPDATE jobs SET owner = ?, heartbeat_at = ? WHERE id = ?",
+                   (owner, time.time() - heartbeat_age, job_id))
+
+
+def test_jobs_of_live_processes_are_not_recovered(tmp_path):
+    queue = make_queue(tmp_path)
+    job, = submit(queue, ("alice", "interactive"))
+    queue._claim()
+    # The test runner's parent stands in for another live API process on this host
+    live_owner = f"{socket.gethostname()}:{os.getppid()}:abcd1234"
+    set_owner(queue, job["id"], live_owner, heartbeat_age=0)
+    assert make_queue(tmp_path)._recover() == 0
+    assert asyncio.run(queue.get(job["id"]))["owner"] == live_owner
+
+
+def test_jobs_of_silent_processes_are_recovered(tmp_path):
+    queue = make_queue(tmp_path, stale_after=60)
+    job, = submit(queue, ("alice", "interactive"))
+    queue._claim()
+    set_owner(queue, job["id"], "other-host:1234:abcd1234", heartbeat_age=10)
+    assert make_queue(tmp_path)._recover() == 0
+    set_owner(queue, job["id"], "other-host:1234:abcd1234", heartbeat_age=120)
+    assert make_queue(tmp_path)._recover() == 1
+    assert asyncio.run(queue.get(job["id"]))["status"] == "queued"
+
+
+def test_jobs_of_dead_local_processes_are_recovered_at_once(tmp_path):
+    exited = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited.wait()
+    queue = make_queue(tmp_path)
+    job, = submit(queue, ("alice", "interactive"))
+    queue._claim()
+    set_owner(queue, job["id"], f"{socket.gethostname()}:{exited.pid}:abcd1234", heartbeat_age=0)
+    assert make_queue(tmp_path)._recover() == 1
+
+
+def test_job_handed_to_another_process_is_not_overwritten(tmp_path):
+    first, second = make_queue(tmp_path), make_queue(tmp_path)
+    job, = submit(first, ("alice", "interactive"))
+    first._claim()
+    set_owner(first, job["id"], "other-host:1234:abcd1234", heartbeat_age=120)
+    second._recover()
+    second._claim()
+    first._finish(job["id"], "done", {"name": "stale"})
+    stored = asyncio.run(second.get(job["id"]))
+    assert (stored["status"], stored["owner"]) == ("running", second.owner)
+
+
+def test_job_keeps_its_fields(tmp_path):
+    queue = make_queue(tmp_path)
+    job = asyncio.run(queue.submit("alice", "profile", fields=["name", "headline"]))
+    assert job["fields"] == ["name", "headline"]
+    assert queue._claim()["fields"] == ["name", "headline"]
@@ -0,0 +1,90 @@
+import asyncio
+import json
+import logging
+import logging.handlers
+
+from fastapi.testclient import TestClient
+
+import main
+from services import logging_setup
+from services.logging_setup import (
+    JsonFormatter, RequestIdFilter, debug_sampled, redact, request_id_var, setup_logging, stop_logging,
+)
+from services.scrape_executor import run_scrape
+
+
+def test_payloads_are_redacted_to_their_field_names(monkeypatch):
+    monkeypatch.setattr(logging_setup.settings, "LOG_PAYLOADS", False)
+    profile = {"name": "Alice", "headline": "Engineer", "avatar": None}
+    assert redact(profile) == {"fields": ["headline", "name"], "redacted": True}
+    assert redact({"error": "Not found", "detail": "secret"}) == {"error": "Not found"}
+    monkeypatch.setattr(logging_setup.settings, "LOG_PAYLOADS", True)
+    assert redact(profile) is profile
+
+
+class RecordingLogger:
+    def __init__(self, level):
+        self.level = level
+        self.lines = []
+
+    def isEnabledFor(self, level):
+        return level >= self.level
+
+    def debug(self, msg, *args, **kwargs):
+        self.lines.append(msg)
+
+
+def test_debug_lines_are_sampled(monkeypatch):
+    monkeypatch.setattr(logging_setup.settings, "LOG_SAMPLE_RATE", 0.5)
+    draws = iter([0.1, 0.9, 0.4])
+    monkeypatch.setattr(logging_setup.random, "random", lambda: next(draws))
+    logger = RecordingLogger(logging.DEBUG)
+    for line in ("first", "second", "third"):
+        debug_sampled(logger, line)
+    assert logger.lines == ["first", "third"]
+
+
+def test_sampling_is_skipped_above_debug_level(monkeypatch):
+    monkeypatch.setattr(logging_setup.random, "random", lambda: 1 / 0)
+    logger = RecordingLogger(logging.INFO)
+    debug_sampled(logger, "hot path")
+    assert logger.lines == []
+
+
+def test_records_carry_the_request_id_and_extras():
+    record = logging.LogRecord("services.test", logging.INFO, __file__, 1, "Scraped %s", ("alice",), None)
+    record.phase = "extract"
+    token = request_id_var.set("abc123")
+    try:
+        RequestIdFilter().filter(record)
+    finally:
+        request_id_var.reset(token)
+    entry = json.loads(JsonFormatter().format(record))
+    assert (entry["request_id"], entry["msg"], entry["phase"]) == ("abc123", "Scraped alice", "extract")
+
+
+def test_request_id_is_copied_onto_the_scrape_thread():
+    async def scrape():
+        request_id_var.set("req-1")
+        return await run_scrape(request_id_var.get)
+
+    assert asyncio.run(scrape()) == "req-1"
+
+
+def test_request_id_header_is_echoed():
+    response = TestClient(main.app).get("/", headers={"X-Request-ID": "from-client"})
+    assert response.headers["X-Request-ID"] == "from-client"
+
+
+def test_stop_logging_restores_a_direct_stream_handler(monkeypatch):
+    root = logging.getLogger()
+    monkeypatch.setattr(root, "handlers", [])
+    monkeypatch.setattr(root, "level", root.level)
+    monkeypatch.setattr(logging_setup, "_listener", None)
+    monkeypatch.setattr(logging_setup, "_queue_handler", None)
+    setup_logging()
+    assert isinstance(root.handlers[0], logging.handlers.QueueHandler)
+    stop_logging()
+    handler, = root.handlers
+    assert type(handler) is logging.StreamHandler
+    assert logging_setup._listener is None
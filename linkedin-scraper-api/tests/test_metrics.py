@@ -0,0 +1,77 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from services import metrics
+from services.metrics import StatsCollector, observe_phase, record_fields, record_outcome, timed_extractor
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(metrics.settings, "ENABLE_METRICS", True)
+
+
+def sample(name, **labels):
+    return metrics.registry.get_sample_value(name, labels) or 0.0
+
+
+def test_fields_are_counted_as_hits_and_misses(enabled):
+    before = sample("linkedin_scraper_fields_total", type="profile", field="experience", result="miss")
+    record_fields("profile", {
+        "linkedin_id": "alice",
+        "name": "Alice",
+        "avatar": None,
+        "experience": {"positions": [], "institutions": [], "dates": []},
+    })
+    assert sample("linkedin_scraper_fields_total", type="profile", field="experience", result="miss") == before + 1
+    assert sample("linkedin_scraper_fields_total", type="profile", field="name", result="hit") >= 1
+    assert sample("linkedin_scraper_fields_total", type="profile", field="linkedin_id", result="hit") == 0
+
+
+def test_phases_and_outcomes_are_observed(enabled):
+    count = sample("linkedin_scraper_phase_seconds_count", type="profile", phase="navigate")
+    observe_phase("profile", "navigate", 1.5)
+    assert sample("linkedin_scraper_phase_seconds_count", type="profile", phase="navigate") == count + 1
+    outcomes = sample("linkedin_scraper_scrapes_total", type="company", outcome="throttled")
+    record_outcome("company", "throttled")
+    assert sample("linkedin_scraper_scrapes_total", type="company", outcome="throttled") == outcomes + 1
+
+
+def test_nothing_is_recorded_when_disabled():
+    count = sample("linkedin_scraper_scrapes_total", type="profile", outcome="disabled")
+    record_outcome("profile", "disabled")
+    assert sample("linkedin_scraper_scrapes_total", type="profile", outcome="disabled") == count
+
+
+def test_timed_extractor_keeps_the_result(enabled):
+    @timed_extractor
+    def search_for_test_field(driver):
+        return "found"
+
+    assert search_for_test_field(None) == "found"
+    assert sample("linkedin_scraper_extractor_seconds_count", extractor="search_for_test_field") == 1
+
+
+def test_stats_become_gauges():
+    def broken():
+        raise RuntimeError("not started")
+
+    collector = StatsCollector({
+        "pool": lambda: {"idle": 2, "valid": True, "reason": None, "lanes": {"bulk": 1}},
+        "broken": broken,
+    })
+    gauges = {family.name: family.samples[0].value for family in collector.collect()}
+    assert gauges == {
+        "linkedin_scraper_pool_idle": 2.0,
+        "linkedin_scraper_pool_valid": 1.0,
+        "linkedin_scraper_pool_lanes_bulk": 1.0,
+    }
+
+
+def test_metrics_endpoint_requires_enable_metrics(monkeypatch):
+    client = TestClient(main.app)
+    assert client.get("/metrics").status_code == 404
+    monkeypatch.setattr(metrics.settings, "ENABLE_METRICS", True)
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert "linkedin_scraper_phase_seconds" in response.text
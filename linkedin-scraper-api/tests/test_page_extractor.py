@@ -0,0 +1,95 @@
+import pytest
+
+from services import page_extractor
+from services.page_extractor import PROFILE_EXTRACTION_SCRIPT, PROFILE_FIELDS, extract_profile_fields, normalize_fields
+
+
+XPATH_FIELDS = {
+    "name": "Alice (xpath)",
+    "avatar": "https://example.com/alice.jpg",
+    "headline": "Engineer",
+    "education": {"positions": [], "institutions": [], "dates": []},
+    "experience": {"positions": [], "institutions": [], "dates": []},
+    "about": {"positions": [], "institutions": [], "dates": []},
+}
+
+
+class FakeDriver:
+    """A driver whose execute_script returns (or raises) a canned value"""
+
+    def __init__(self, script_result=None, script_error=None):
+        self.script_result = script_result
+        self.script_error = script_error
+        self.scripts = []
+
+    def execute_script(self, script, *args):
+        self.scripts.append((script, args))
+        if self.script_error:
+            raise self.script_error
+        return self.script_result
+
+
+@pytest.fixture(autouse=True)
+def xpath_path(monkeypatch):
+    """Stub the per-XPath search_for_* functions with XPATH_FIELDS"""
+    calls = []
+
+    def search_for_section(driver, name):
+        calls.append(name)
+        return XPATH_FIELDS[name.lower()]
+
+    monkeypatch.setattr(page_extractor, "search_for_candidate_name", lambda driver: XPATH_FIELDS["name"])
+    monkeypatch.setattr(page_extractor, "search_for_candidate_avatar", lambda driver: XPATH_FIELDS["avatar"])
+    monkeypatch.setattr(page_extractor, "search_for_candidate_headline", lambda driver: XPATH_FIELDS["headline"])
+    monkeypatch.setattr(page_extractor, "search_for_section", search_for_section)
+    return calls
+
+
+def test_script_mode_extracts_everything_in_one_round_trip(monkeypatch, xpath_path):
+    recorded = []
+    monkeypatch.setattr(page_extractor.selector_telemetry, "record_hits", recorded.append)
+    fields = dict(XPATH_FIELDS, name="Alice (script)")
+    driver = FakeDriver(script_result=dict(fields, selector_hits={"name": {"//h1": 1}}))
+    assert extract_profile_fields(driver, mode="script") == fields
+    (script, (config,)), = driver.scripts
+    assert script == PROFILE_EXTRACTION_SCRIPT
+    assert {"section.education", "section.experience", "section.about"} <= set(config["chains"])
+    assert recorded == [{"name": {"//h1": 1}}]
+    assert xpath_path == []
+
+
+@pytest.mark.parametrize("driver", [
+    FakeDriver(script_result={"name": None}),
+    FakeDriver(script_result=None),
+    FakeDriver(script_error=RuntimeError("javascript error")),
+])
+def test_script_mode_falls_back_to_xpath(driver):
+    assert extract_profile_fields(driver, mode="script") == XPATH_FIELDS
+
+
+def test_xpath_mode_never_runs_the_script(xpath_path):
+    driver = FakeDriver(script_result=dict(XPATH_FIELDS, name="Alice (script)"))
+    assert extract_profile_fields(driver, mode="xpath") == XPATH_FIELDS
+    assert driver.scripts == []
+    assert xpath_path == ["Education", "Experience", "About"]
+
+
+def test_xpath_mode_stops_when_no_name_is_found(monkeypatch, xpath_path):
+    monkeypatch.setattr(page_extractor, "search_for_candidate_name", lambda driver: None)
+    assert extract_profile_fields(FakeDriver(), mode="xpath") == {"name": None}
+    assert xpath_path == []
+
+
+def test_normalize_fields_orders_and_always_adds_name():
+    assert normalize_fields([" Experience", "AVATAR_URL"]) == ["name", "avatar", "experience"]
+
+
+def test_normalize_fields_returns_none_for_everything():
+    assert normalize_fields(None) is None
+    assert normalize_fields(list(PROFILE_FIELDS)) is None
+    assert normalize_fields(["avatar_url", "headline", "about", "experience", "education"]) is None
+
+
+def test_normalize_fields_rejects_unknown_fields():
+    with pytest.raises(ValueError, match="Unknown fields salary, skills"):
+        normalize_fields(["name", "skills", "salary"])
@@ -0,0 +1,96 @@
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+
+from services.page_waits import (
+    Deadline, all_xpaths_present, wait_for_any_xpath, wait_for_height_change, wait_until_expanded,
+)
+from services.timing import PhaseTimer
+
+
+class FakePage:
+    """A driver whose DOM grows every time it is polled"""
+
+    def __init__(self, appearing=(), heights=()):
+        # XPath -> number of polls before it shows up
+        self.appearing = dict(appearing)
+        self.heights = list(heights)
+        self.polls = 0
+
+    def find_elements(self, by, xpath):
+        self.polls += 1
+        return ["element"] if self.appearing.get(xpath, float("inf")) <= self.polls else []
+
+    def find_element(self, by, xpath):
+        elements = self.find_elements(by, xpath)
+        if not elements:
+            raise NoSuchElementException(xpath)
+        return elements[0]
+
+    def execute_script(self, script):
+        return self.heights.pop(0) if len(self.heights) > 1 else self.heights[0]
+
+
+class FakeButton:
+    def __init__(self, texts, displayed=True, stale=False):
+        self.texts = list(texts)
+        self.displayed = displayed
+        self.stale = stale
+
+    def is_displayed(self):
+        if self.stale:
+            raise StaleElementReferenceException("gone")
+        return self.displayed
+
+    @property
+    def text(self):
+        return self.texts.pop(0) if len(self.texts) > 1 else self.texts[0]
+
+
+def test_wait_for_any_xpath_returns_once_one_is_present():
+    page = FakePage(appearing={"//h1": 3})
+    assert wait_for_any_xpath(page, ["//main//h1", "//h1"], timeout=5)
+
+
+def test_wait_for_any_xpath_times_out():
+    assert not wait_for_any_xpath(FakePage(), ["//h1"], timeout=0.2)
+
+
+def test_all_xpaths_present():
+    page = FakePage(appearing={"//a": 0, "//b": 0})
+    assert all_xpaths_present(page, ["//a", "//b"])
+    assert not all_xpaths_present(page, ["//a", "//c"])
+
+
+def test_wait_for_height_change_returns_the_new_height():
+    assert wait_for_height_change(FakePage(heights=[1000, 1000, 1800]), 1000, timeout=5) == 1800
+
+
+def test_wait_for_height_change_gives_up_on_a_static_page():
+    assert wait_for_height_change(FakePage(heights=[1000]), 1000, timeout=0.2) == 1000
+
+
+def test_wait_until_expanded():
+    assert wait_until_expanded(FakePage(), FakeButton(["Show more", "Show more", "Show less"]), timeout=5)
+    assert wait_until_expanded(FakePage(), FakeButton(["Show more"], displayed=False), timeout=5)
+    assert wait_until_expanded(FakePage(), FakeButton(["Show more"], stale=True), timeout=5)
+    assert not wait_until_expanded(FakePage(), FakeButton(["Show more"]), timeout=0.2)
+
+
+def test_deadline_caps_each_step_by_what_is_left(clock):
+    deadline = Deadline(10)
+    assert deadline.remaining(cap=1.5) == 1.5
+    clock.now += 9
+    assert deadline.remaining(cap=1.5) == 1.0
+    assert not deadline.expired()
+    clock.now += 2
+    assert deadline.remaining() == 0.0
+    assert deadline.expired()
+
+
+def test_phase_timer_adds_up_repeated_phases():
+    timer = PhaseTimer()
+    for _ in range(2):
+        with timer.phase("scroll"):
+            pass
+    with timer.phase("extract"):
+        pass
+    assert set(timer.report()) == {"scroll", "extract"}
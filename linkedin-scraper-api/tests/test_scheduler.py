@@ -0,0 +1,125 @@
+import asyncio
+import threading
+
+import pytest
+
+from services.scheduler import SchedulerTimeoutError, SharedScheduler
+
+
+@pytest.fixture
+def scheduler(tmp_path):
+    return SharedScheduler(db_path=str(tmp_path / "scheduler.db"), poll_interval=0.01, stale_after=60, result_ttl=600)
+
+
+def status(scheduler, task_id):
+    with scheduler._lock:
+        return scheduler._connect().execute("SELECT status FROM scrape_tasks WHERE id = ?", (task_id,)).fetchone()[0]
+
+
+def task_of(scheduler, linkedin_id):
+    with scheduler._lock:
+        return scheduler._connect().execute(
+            "SELECT id FROM scrape_tasks WHERE linkedin_id = ?", (linkedin_id,)
+        ).fetchone()[0]
+
+
+def test_identical_scrapes_share_one_task(scheduler):
+    first = scheduler.submit("profile", "alice")
+    assert scheduler.submit("profile", "alice") == first
+    assert scheduler.submit("company", "alice") != first
+
+
+def test_claims_respect_the_global_concurrency(scheduler):
+    for linkedin_id in ("alice", "bob", "carol"):
+        scheduler.submit("profile", linkedin_id)
+    assert scheduler.claim("worker-1", max_concurrency=2)["linkedin_id"] == "alice"
+    assert scheduler.claim("worker-2", max_concurrency=2)["linkedin_id"] == "bob"
+    assert scheduler.claim("worker-1", max_concurrency=2) is None
+    assert scheduler.stats() == {"queued": 1, "running": 2, "busy_workers": 2}
+
+
+def test_tasks_of_silent_workers_are_requeued(tmp_path):
+    scheduler = SharedScheduler(db_path=str(tmp_path / "scheduler.db"), poll_interval=0.01, stale_after=0, result_ttl=600)
+    task_id = scheduler.submit("profile", "alice")
+    scheduler.claim("crashed", max_concurrency=1)
+    assert scheduler.claim("healthy", max_concurrency=1)["id"] == task_id
+
+
+def test_run_waits_for_a_worker_off_the_event_loop(scheduler, monkeypatch):
+    threads = []
+    submit, result = scheduler.submit, scheduler.result
+
+    def recording(func):
+        def wrapper(*args):
+            threads.append(threading.current_thread())
+            return func(*args)
+        return wrapper
+
+    monkeypatch.setattr(scheduler, "submit", recording(submit))
+    monkeypatch.setattr(scheduler, "result", recording(result))
+
+    def worker():
+        while (task := scheduler.claim("worker", max_concurrency=1)) is None:
+            threading.Event().wait(0.01)
+        scheduler.finish(task["id"], {"name": "Alice"})
+
+    threading.Thread(target=worker).start()
+    assert asyncio.run(scheduler.run("profile", "alice", timeout=5)) == {"name": "Alice"}
+    assert threads and threading.main_thread() not in threads
+
+
+def wait_for_status(scheduler, task_id, expected):
+    for _ in range(100):
+        if status(scheduler, task_id) == expected:
+            return
+        threading.Event().wait(0.01)
+    raise AssertionError(f"task is {status(scheduler, task_id)}, expected {expected}")
+
+
+def test_timed_out_task_is_cancelled(scheduler):
+    with pytest.raises(SchedulerTimeoutError):
+        asyncio.run(scheduler.run("profile", "alice", timeout=0))
+    cancelled = task_of(scheduler, "alice")
+    wait_for_status(scheduler, cancelled, "cancelled")
+    # The cancelled task is never claimed, and a new request queues a fresh one
+    assert scheduler.claim("worker", max_concurrency=5) is None
+    assert scheduler.submit("profile", "alice") != cancelled
+
+
+def test_disconnected_client_cancels_its_task(scheduler):
+    async def disconnect():
+        request = asyncio.ensure_future(scheduler.run("profile", "alice", timeout=5))
+        await asyncio.sleep(0.05)
+        request.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await request
+
+    asyncio.run(disconnect())
+    wait_for_status(scheduler, task_of(scheduler, "alice"), "cancelled")
+    assert scheduler.claim("worker", max_concurrency=1) is None
+
+
+def test_task_with_other_waiters_stays_queued(scheduler):
+    task_id = scheduler.submit("profile", "alice")
+    scheduler.submit("profile", "alice")
+    scheduler.abandon(task_id)
+    assert status(scheduler, task_id) == "queued"
+    scheduler.abandon(task_id)
+    assert status(scheduler, task_id) == "cancelled"
+
+
+def test_running_task_is_not_cancelled(scheduler):
+    task_id = scheduler.submit("profile", "alice")
+    scheduler.claim("worker", max_concurrency=1)
+    scheduler.abandon(task_id)
+    assert status(scheduler, task_id) == "running"
+
+
+def test_cancelled_and_finished_tasks_are_purged(tmp_path):
+    scheduler = SharedScheduler(db_path=str(tmp_path / "scheduler.db"), poll_interval=0.01, stale_after=60, result_ttl=-1)
+    done = scheduler.submit("profile", "alice")
+    scheduler.claim("worker", max_concurrency=1)
+    scheduler.finish(done, {"name": "Alice"})
+    scheduler.abandon(scheduler.submit("profile", "bob"))
+    scheduler.purge()
+    assert scheduler._connect().execute("SELECT COUNT(*) FROM scrape_tasks").fetchone()[0] == 0
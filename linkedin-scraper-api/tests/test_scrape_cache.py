@@ -0,0 +1,137 @@
+import sqlite3
+
+from services.scrape_cache import ScrapeCache, normalize_linkedin_id, sqlite_path_from_url
+
+
+def make_cache(**kwargs):
+    options = {"max_entries": 10, "ttls": {"profile": 100, "company": 1000}, "stale_ttl": 50}
+    options.update(kwargs)
+    return ScrapeCache(**options)
+
+
+def test_normalize_linkedin_id():
+    assert normalize_linkedin_id(" John%2DDoe/ ") == "john-doe"
+    assert ScrapeCache.key("profile", "JohnDoe/") == ScrapeCache.key("profile", "johndoe")
+
+
+def test_sqlite_path_from_url():
+    assert sqlite_path_from_url("sqlite:///cache.db") == "cache.db"
+    assert sqlite_path_from_url("sqlite:///") is None
+    assert sqlite_path_from_url("postgresql://host/db") is None
+    assert sqlite_path_from_url(None) is None
+
+
+def test_entry_is_fresh_then_stale_then_expired(clock):
+    cache = make_cache()
+    cache.set("profile", "alice", {"name": "Alice"})
+
+    clock.now += 99
+    data, state, age = cache.get("profile", "alice")
+    assert (data, state, age) == ({"name": "Alice"}, "fresh", 99)
+
+    clock.now += 2
+    assert cache.get("profile", "alice")[1] == "stale"
+
+    clock.now += 50
+    assert cache.get("profile", "alice") == (None, None, None)
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["stale_hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_ttl_is_per_type(clock):
+    cache = make_cache()
+    cache.set("profile", "acme", {"name": "profile"})
+    cache.set("company", "acme", {"name": "company"})
+    clock.now += 500
+    assert cache.get("profile", "acme")[1] is None
+    assert cache.get("company", "acme")[:2] == ({"name": "company"}, "fresh")
+
+
+def test_lru_evicts_least_recently_used(clock):
+    cache = make_cache(max_entries=2)
+    cache.set("profile", "a", {"name": "a"})
+    cache.set("profile", "b", {"name": "b"})
+    # Reading "a" makes "b" the least recently used
+    assert cache.get("profile", "a")[1] == "fresh"
+    cache.set("profile", "c", {"name": "c"})
+
+    assert cache.get("profile", "b")[1] is None
+    assert cache.get("profile", "a")[1] == "fresh"
+    assert cache.get("profile", "c")[1] == "fresh"
+    assert cache.stats()["entries"] == 2
+
+
+def test_fields_lookup_falls_back_to_full_entry(clock):
+    cache = make_cache()
+    cache.set("profile", "alice", {"name": "Alice", "experience": {}})
+    data, state, _ = cache.get("profile", "alice", ["name", "headline"])
+    assert state == "fresh"
+    assert data == {"name": "Alice", "experience": {}}
+
+
+def test_full_lookup_ignores_partial_entries(clock):
+    cache = make_cache()
+    cache.set("profile", "alice", {"name": "Alice"}, ["name", "headline"])
+    assert cache.get("profile", "alice")[1] is None
+    assert cache.get("profile", "alice", ["name", "headline"])[1] == "fresh"
+    assert cache.get("profile", "alice", ["name", "about"])[1] is None
+
+
+def test_fields_lookup_prefers_fresh_full_entry_over_stale_partial(clock):
+    cache = make_cache()
+    cache.set("profile", "alice", {"name": "old"}, ["name"])
+    clock.now += 120
+    cache.set("profile", "alice", {"name": "new"})
+    data, state, _ = cache.get("profile", "alice", ["name"])
+    assert (data, state) == ({"name": "new"}, "fresh")
+
+
+def test_fields_lookup_counts_one_miss(clock):
+    cache = make_cache()
+    assert cache.get("profile", "nobody", ["name"]) == (None, None, None)
+    assert cache.stats()["misses"] == 1
+
+
+def test_previous_ignores_age_and_stats(clock):
+    cache = make_cache()
+    assert cache.previous("profile", "alice") is None
+    cache.set("profile", "alice", {"name": "Alice"})
+    clock.now += 10_000
+    assert cache.get("profile", "alice")[1] is None
+    assert cache.previous("profile", "Alice/") == {"name": "Alice"}
+    assert cache.stats()["misses"] == 1
+
+
+def test_disk_tier_survives_restart(clock, tmp_path):
+    path = str(tmp_path / "cache.db")
+    make_cache(db_path=path).set("profile", "alice", {"name": "Alice"})
+
+    restarted = make_cache(db_path=path)
+    assert restarted.get("profile", "alice")[:2] == ({"name": "Alice"}, "fresh")
+    assert make_cache(db_path=path).previous("profile", "alice") == {"name": "Alice"}
+
+
+def _disk_keys(path):
+    with sqlite3.connect(path) as db:
+        return {row[0] for row in db.execute("SELECT key FROM scrape_cache")}
+
+
+def test_disk_rows_are_purged_after_retention(clock, tmp_path, monkeypatch):
+    monkeypatch.setattr(ScrapeCache, "PURGE_EVERY", 2)
+    path = str(tmp_path / "cache.db")
+    cache = make_cache(db_path=path, db_retention=2000)
+    cache.set("profile", "old", {"name": "old"})
+    clock.now += 2001
+    cache.set("profile", "new", {"name": "new"})
+    assert _disk_keys(path) == {"profile:new"}
+
+    # Opening the file purges as well
+    clock.now += 2001
+    make_cache(db_path=path, db_retention=2000)
+    assert _disk_keys(path) == set()
+
+
+def test_retention_never_drops_servable_rows():
+    cache = make_cache(db_retention=10)
+    assert cache.db_retention == 1000 + 50
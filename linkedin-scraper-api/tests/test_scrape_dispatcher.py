@@ -0,0 +1,82 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from services import scrape_dispatcher
+
+
+@pytest.fixture
+def backend(monkeypatch, direct_dispatch):
+    """A slow profile scraper, counting how often it is called"""
+    calls = []
+    lock = threading.Lock()
+
+    def scrape(linkedin_id, *args):
+        with lock:
+            calls.append((linkedin_id, *args))
+        time.sleep(0.2)
+        return {"linkedin_id": linkedin_id, "name": f"Fake {linkedin_id}"}
+
+    monkeypatch.setitem(scrape_dispatcher.SCRAPERS, "profile", scrape)
+    return calls
+
+
+def test_identical_scrapes_share_one_backend_call(backend):
+    waiters = 5
+
+    async def run():
+        before = scrape_dispatcher.coalescing_stats()["coalesced_total"]
+        results = await asyncio.gather(*(
+            scrape_dispatcher.dispatch_scrape("profile", "alice") for _ in range(waiters)
+        ))
+        coalesced = scrape_dispatcher.coalescing_stats()["coalesced_total"] - before
+        return results, coalesced
+
+    results, coalesced = asyncio.run(run())
+    assert backend == [("alice",)]
+    assert coalesced == waiters - 1
+    assert all(data["name"] == "Fake alice" and status == "MISS" for data, status, _ in results)
+    assert scrape_dispatcher.coalescing_stats()["in_flight"] == 0
+
+
+def test_different_ids_are_not_coalesced(backend):
+    async def run():
+        return await asyncio.gather(
+            scrape_dispatcher.dispatch_scrape("profile", "bob"),
+            scrape_dispatcher.dispatch_scrape("profile", "dave"),
+        )
+
+    asyncio.run(run())
+    assert sorted(backend) == [("bob",), ("dave",)]
+
+
+def test_different_fields_are_not_coalesced(backend):
+    async def run():
+        return await asyncio.gather(
+            scrape_dispatcher.dispatch_scrape("profile", "erin"),
+            scrape_dispatcher.dispatch_scrape("profile", "erin", ["name", "headline"]),
+        )
+
+    asyncio.run(run())
+    assert sorted(backend, key=len) == [("erin",), ("erin", ["name", "headline"])]
+
+
+def test_cancelled_waiter_does_not_cancel_shared_scrape(backend):
+    async def run():
+        before = scrape_dispatcher.coalescing_stats()["coalesced_total"]
+        waiters = [
+            asyncio.create_task(scrape_dispatcher.dispatch_scrape("profile", "carol")) for _ in range(3)
+        ]
+        await asyncio.sleep(0.05)
+        waiters[0].cancel()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        coalesced = scrape_dispatcher.coalescing_stats()["coalesced_total"] - before
+        return results, coalesced
+
+    results, coalesced = asyncio.run(run())
+    assert isinstance(results[0], asyncio.CancelledError)
+    assert [data["name"] for data, _, _ in results[1:]] == ["Fake carol", "Fake carol"]
+    assert backend == [("carol",)]
+    assert coalesced == 2
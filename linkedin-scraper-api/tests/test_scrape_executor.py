@@ -0,0 +1,30 @@
+import asyncio
+import threading
+
+from services.scrape_executor import executor_stats, run_scrape
+
+
+def test_scrape_runs_on_an_executor_thread():
+    def scrape(linkedin_id):
+        return linkedin_id, threading.current_thread().name
+
+    linkedin_id, thread = asyncio.run(run_scrape(scrape, "alice"))
+    assert linkedin_id == "alice"
+    assert thread.startswith("scraper")
+
+
+def test_event_loop_stays_free_during_a_scrape():
+    release = threading.Event()
+
+    async def run():
+        scrape = asyncio.ensure_future(run_scrape(release.wait, 5))
+        # The loop keeps serving other coroutines while the scrape blocks
+        await asyncio.sleep(0.05)
+        stats = executor_stats()
+        release.set()
+        await scrape
+        return stats
+
+    stats = asyncio.run(run())
+    assert stats["running"] == 1 and stats["queued"] == 0
+    assert executor_stats()["running"] == 0
@@ -0,0 +1,44 @@
+from services import scraping_utils
+from services.scraping_utils import apply_resource_blocking, blocked_url_patterns
+
+
+def test_blocked_patterns_cover_types_and_domains():
+    patterns = blocked_url_patterns(["font", "image"], ["doubleclick.net"])
+    assert "*.woff2" in patterns and "*.woff2?*" in patterns
+    # Images are blocked through content settings, not URL patterns
+    assert not any(pattern.startswith("*.png") or pattern.startswith("*.jpg") for pattern in patterns)
+    assert patterns[-2:] == ["*://doubleclick.net/*", "*://*.doubleclick.net/*"]
+
+
+def test_blocked_patterns_default_to_settings(monkeypatch):
+    monkeypatch.setattr(scraping_utils.settings, "RESOURCE_BLOCK_TYPES", ["media"])
+    monkeypatch.setattr(scraping_utils.settings, "RESOURCE_BLOCK_DOMAINS", [])
+    assert "*.mp4" in blocked_url_patterns()
+    assert blocked_url_patterns([], []) == []
+
+
+class FakeCdpDriver:
+    def __init__(self, error=None):
+        self.error = error
+        self.commands = []
+
+    def execute_cdp_cmd(self, command, params):
+        if self.error:
+            raise self.error
+        self.commands.append((command, params))
+
+
+def test_resource_blocking_sends_patterns_over_cdp():
+    driver = FakeCdpDriver()
+    apply_resource_blocking(driver, ["*.woff"])
+    assert driver.commands == [("Network.enable", {}), ("Network.setBlockedURLs", {"urls": ["*.woff"]})]
+
+
+def test_resource_blocking_is_skipped_without_patterns():
+    driver = FakeCdpDriver(error=AssertionError("no CDP call expected"))
+    apply_resource_blocking(driver, [])
+    assert driver.commands == []
+
+
+def test_resource_blocking_failure_does_not_break_the_driver():
+    apply_resource_blocking(FakeCdpDriver(error=RuntimeError("CDP unavailable")), ["*.woff"])
@@ -0,0 +1,89 @@
+from services.selector_stats import MISS, SelectorTelemetry
+
+
+def make_telemetry(path="", reorder_every=4, window=10, drift_threshold=0.5):
+    return SelectorTelemetry(path=path, reorder_every=reorder_every, window=window, drift_threshold=drift_threshold)
+
+
+def record(telemetry, xpath, times):
+    for _ in range(times):
+        telemetry.record("name", xpath)
+
+
+def test_chain_keeps_its_order_until_another_selector_wins():
+    telemetry = make_telemetry()
+    assert telemetry.ordered("name", ["first", "second"]) == ["first", "second"]
+    record(telemetry, "second", 3)
+    # Not reordered before reorder_every results
+    assert telemetry.ordered("name", ["first", "second"]) == ["first", "second"]
+    record(telemetry, "second", 1)
+    assert telemetry.ordered("name", ["first", "second"]) == ["second", "first"]
+
+
+def test_decay_lets_a_new_winner_overtake():
+    telemetry = make_telemetry()
+    telemetry.ordered("name", ["first", "second"])
+    record(telemetry, "second", 16)
+    record(telemetry, "first", 12)
+    # Fewer hits in total, but the recent ones weigh more
+    assert telemetry.ordered("name", ["first", "second"]) == ["first", "second"]
+    assert telemetry.stats()["name"]["hits"] == {"second": 16, "first": 12}
+
+
+def test_changed_chain_starts_from_its_written_order():
+    telemetry = make_telemetry()
+    telemetry.ordered("name", ["first", "second"])
+    record(telemetry, "second", 4)
+    assert telemetry.ordered("name", ["first", "second", "third"]) == ["second", "first", "third"]
+    assert telemetry.ordered("name", ["third"]) == ["third"]
+
+
+def test_drift_is_reported_when_the_top_selector_stops_matching():
+    telemetry = make_telemetry()
+    record(telemetry, "first", 20)
+    assert not telemetry.stats()["name"]["drifting"]
+    record(telemetry, None, 8)
+    stats = telemetry.stats()["name"]
+    assert stats["drifting"] and stats["top"] == "first"
+    assert stats["misses"] == 8
+    assert telemetry.summary() == {"chains": 1, "drifting": 1}
+    record(telemetry, "first", 12)
+    assert telemetry.summary()["drifting"] == 0
+
+
+def test_chains_that_usually_miss_do_not_drift():
+    telemetry = make_telemetry()
+    for _ in range(10):
+        record(telemetry, "date", 1)
+        record(telemetry, None, 2)
+    assert not telemetry.stats()["name"]["drifting"]
+
+
+def test_aggregated_hits_are_recorded():
+    telemetry = make_telemetry()
+    telemetry.record_hits({"name": {"first": 2, MISS: 1}, "avatar": {"img": 1}})
+    telemetry.record_hits(None)
+    stats = telemetry.stats()
+    assert stats["name"]["hits"] == {"first": 2}
+    assert stats["name"]["misses"] == 1
+    assert stats["avatar"]["top"] == "img"
+
+
+def test_counts_survive_a_restart(tmp_path):
+    path = str(tmp_path / "selector_stats.json")
+    telemetry = make_telemetry(path=path)
+    record(telemetry, "second", 4)
+    telemetry.save()
+
+    restarted = make_telemetry(path=path)
+    restarted.load()
+    assert restarted.ordered("name", ["first", "second"]) == ["second", "first"]
+    assert restarted.stats()["name"]["hits"] == {"second": 4}
+
+
+def test_unreadable_stats_file_is_ignored(tmp_path):
+    path = tmp_path / "selector_stats.json"
+    path.write_text("{not json")
+    telemetry = make_telemetry(path=str(path))
+    telemetry.load()
+    assert telemetry.stats() == {}
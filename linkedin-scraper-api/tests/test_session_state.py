@@ -0,0 +1,36 @@
+from services.session_state import SessionState, auth_wall_reason
+
+
+class FakeDriver:
+    def __init__(self, url, cookie=True):
+        self.current_url = url
+        self.cookie = {"name": "li_at"} if cookie else None
+
+    def get_cookie(self, name):
+        return self.cookie
+
+
+def test_auth_wall_is_detected_from_the_url_or_the_cookie():
+    assert auth_wall_reason(FakeDriver("https://www.linkedin.com/in/alice/")) is None
+    assert "authwall" in auth_wall_reason(FakeDriver("https://www.linkedin.com/authwall?trk=x"))
+    assert auth_wall_reason(FakeDriver("https://www.linkedin.com/in/alice/", cookie=False)) == "li_at cookie was cleared"
+
+
+def test_expired_session_fails_fast_until_one_probe_is_due(clock):
+    state = SessionState(recheck_interval=300)
+    state.mark_expired("redirected to /authwall")
+    assert not state.allow_scrape()
+    clock.now += 300
+    assert state.allow_scrape()
+    # Only the first scrape after the interval probes
+    assert not state.allow_scrape()
+    assert state.stats()["reason"] == "redirected to /authwall"
+
+
+def test_valid_probe_restores_the_session(clock):
+    state = SessionState(recheck_interval=300)
+    state.mark_expired("li_at cookie was cleared")
+    state.mark_expired("li_at cookie was cleared")
+    state.mark_valid()
+    assert state.allow_scrape()
+    assert state.stats() == {"valid": True, "reason": None, "expired_at": None, "expirations": 1}
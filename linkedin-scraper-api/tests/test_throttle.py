@@ -0,0 +1,174 @@
+import pytest
+
+from services import throttle as throttle_module
+from services.throttle import AdaptiveThrottle, ThrottleError, backoff_delay, classify_page
+
+
+@pytest.fixture(autouse=True)
+def no_jitter(monkeypatch):
+    # backoff_delay is exactly base * 2**attempt
+    monkeypatch.setattr(throttle_module.random, "uniform", lambda low, high: 1.0)
+
+
+def make_throttle(**kwargs):
+    options = {
+        "min_concurrency": 1, "max_concurrency": 8, "base_delay": 2, "max_backoff": 300,
+        "breaker_threshold": 3, "breaker_reset": 300, "soft_limit": 3, "acquire_timeout": 1,
+    }
+    options.update(kwargs)
+    return AdaptiveThrottle(**options)
+
+
+def scrape(throttle, outcome):
+    throttle.acquire()
+    throttle.release(outcome)
+
+
+def test_backoff_delay_doubles_and_caps(clock):
+    assert [backoff_delay(attempt, 2, 30) for attempt in range(6)] == [2, 4, 8, 16, 30, 30]
+
+
+def test_pushback_halves_limit_once_per_backoff_window(clock):
+    throttle = make_throttle()
+    scrape(throttle, "throttled")
+    assert throttle.stats()["concurrency_limit"] == 4
+    # Same burst: the second response inside the 4s window does not halve again
+    clock.now += 2
+    scrape(throttle, "throttled")
+    assert throttle.stats()["concurrency_limit"] == 4
+    clock.now += 10
+    scrape(throttle, "blocked")
+    assert throttle.stats()["concurrency_limit"] == 2
+
+
+def test_limit_never_drops_below_minimum(clock):
+    throttle = make_throttle(min_concurrency=3, breaker_threshold=100)
+    for _ in range(5):
+        scrape(throttle, "throttled")
+        clock.now += 1000
+    assert throttle.stats()["concurrency_limit"] == 3
+
+
+def test_success_increases_limit_additively(clock):
+    throttle = make_throttle(max_concurrency=4)
+    scrape(throttle, "throttled")
+    assert throttle.stats()["concurrency_limit"] == 2
+    clock.now += 10
+    scrape(throttle, "ok")
+    assert throttle.stats()["concurrency_limit"] == 2.5
+    scrape(throttle, "not_found")
+    assert throttle.stats()["concurrency_limit"] == 2.9
+    for _ in range(10):
+        scrape(throttle, "ok")
+    assert throttle.stats()["concurrency_limit"] == 4
+
+
+def test_acquire_fails_fast_while_backing_off(clock):
+    throttle = make_throttle(acquire_timeout=1)
+    scrape(throttle, "throttled")
+    with pytest.raises(ThrottleError, match="Backing off"):
+        throttle.acquire()
+    clock.now += 2
+    throttle.acquire()
+
+
+def test_limit_caps_concurrent_scrapes(clock):
+    throttle = make_throttle(max_concurrency=2, acquire_timeout=0)
+    throttle.acquire()
+    throttle.acquire()
+    with pytest.raises(ThrottleError, match="Timed out"):
+        throttle.acquire()
+    throttle.release("ok")
+    throttle.acquire()
+
+
+def test_breaker_opens_after_consecutive_pushback(clock):
+    throttle = make_throttle(breaker_threshold=3, breaker_reset=300)
+    for _ in range(2):
+        scrape(throttle, "throttled")
+        clock.now += 100
+    assert throttle.stats()["state"] == "closed"
+    scrape(throttle, "blocked")
+    assert throttle.stats()["state"] == "open"
+    with pytest.raises(ThrottleError, match="circuit open"):
+        throttle.acquire()
+
+
+def test_success_resets_pushback_streak(clock):
+    throttle = make_throttle(breaker_threshold=3)
+    for outcome in ("throttled", "throttled", "ok", "throttled", "throttled"):
+        scrape(throttle, outcome)
+        clock.now += 100
+    assert throttle.stats()["state"] == "closed"
+
+
+def open_breaker(throttle, clock):
+    for _ in range(throttle.breaker_threshold):
+        scrape(throttle, "throttled")
+        clock.now += 100
+    assert throttle.stats()["state"] == "open"
+    clock.now += throttle.breaker_reset
+
+
+def test_half_open_allows_one_probe_then_closes(clock):
+    throttle = make_throttle(acquire_timeout=0)
+    open_breaker(throttle, clock)
+    throttle.acquire()
+    assert throttle.stats()["state"] == "half_open"
+    with pytest.raises(ThrottleError):
+        throttle.acquire()
+    throttle.release("ok")
+    assert throttle.stats()["state"] == "closed"
+    throttle.acquire()
+    throttle.acquire()
+
+
+def test_failed_probe_reopens_breaker(clock):
+    throttle = make_throttle()
+    open_breaker(throttle, clock)
+    limit = throttle.stats()["concurrency_limit"]
+    scrape(throttle, "throttled")
+    assert throttle.stats()["state"] == "open"
+    assert throttle.stats()["concurrency_limit"] == max(1, limit / 2)
+    with pytest.raises(ThrottleError, match="circuit open"):
+        throttle.acquire()
+
+
+def test_repeated_unavailable_counts_as_one_pushback(clock):
+    throttle = make_throttle(soft_limit=3)
+    scrape(throttle, "unavailable")
+    scrape(throttle, "unavailable")
+    assert throttle.stats()["pushback_streak"] == 0
+    scrape(throttle, "unavailable")
+    assert throttle.stats()["pushback_streak"] == 1
+    assert throttle.stats()["concurrency_limit"] == 4
+    assert throttle.stats()["outcomes"] == {"unavailable": 3}
+
+
+class FakeDriver:
+    def __init__(self, url, text="", cookie=True):
+        self.current_url = url
+        self.text = text
+        self.cookie = cookie
+
+    def execute_script(self, script):
+        return self.text
+
+    def get_cookie(self, name):
+        return {"name": name, "value": "token"} if self.cookie else None
+
+
+@pytest.mark.parametrize("driver, expected", [
+    (FakeDriver("https://www.linkedin.com/in/alice/"), None),
+    (FakeDriver("https://www.linkedin.com/checkpoint/challenge/abc"), "blocked"),
+    (FakeDriver("https://www.linkedin.com/in/alice/", "HTTP ERROR 429 This page isn't working"), "throttled"),
+    (FakeDriver("https://www.linkedin.com/in/alice/", "Too Many Requests"), "throttled"),
+    (FakeDriver("https://www.linkedin.com/in/alice/", "HTTP ERROR 999"), "throttled"),
+    (FakeDriver("https://www.linkedin.com/authwall?trk=foo"), "expired"),
+    (FakeDriver("https://www.linkedin.com/login"), "expired"),
+    (FakeDriver("https://www.linkedin.com/in/alice/", cookie=False), "expired"),
+])
+def test_classify_page(driver, expected):
+    outcome, reason = classify_page(driver)
+    assert outcome == expected
+    assert (reason is None) == (expected is None)
@@ -0,0 +1,130 @@
+"""
+Browser worker processes for SCHEDULER_MODE=shared.
+
+The API processes queue scrapes in the shared scheduler (SCHEDULER_DB_PATH);
+this supervisor starts WORKER_PROCESSES browser workers (each with its own
+WebDriver pool of SCRAPER_MAX_WORKERS browsers) that claim and run them, and
+restarts any worker that dies. At most SCHEDULER_MAX_CONCURRENCY scrapes run
+at once across all workers.
+
+Usage: python worker.py [--processes N|auto]
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from services.logging_setup import setup_logging, stop_logging
+from services.scheduler import shared_scheduler, worker_processes, global_concurrency
+from config import settings
+
+logger = logging.getLogger("worker")
+
+HEARTBEAT_INTERVAL = 10
+
+
+def run_scrape_task(task):
+    from services.scrape_dispatcher import SCRAPERS, scraper_args
+    try:
+        result = SCRAPERS[task["type"]](*scraper_args(task["linkedin_id"], task.get("fields")))
+    except Exception as e:
+        logger.exception(f"Scrape task {task['id']} crashed: {e}")
+        result = {"error": f"Error fetching {task['type']} details for {task['linkedin_id']}"}
+    shared_scheduler.finish(task["id"], result)
+
+
+def worker_main(index, processes, max_concurrency):
+    """One browser worker process: claim tasks while a browser slot is free"""
+    setup_logging()
+    from services.account_registry import account_registry
+    from services.driver_pool import driver_pool
+    from services.browser_engine import browser_engine
+
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+    signal.signal(signal.SIGINT, lambda *_: stopping.set())
+
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    # Every process routes through the same accounts, so each gets its share of the budget
+    account_registry.share(processes)
+    if settings.SCRAPER_BACKEND != "fake":
+        browser_engine.start()
+        driver_pool.start(account_registry.accounts)
+    slots = settings.SCRAPER_MAX_WORKERS
+    logger.info(f"Browser worker {index} ({worker_id}) ready with {slots} slots")
+
+    running = set()
+    last_heartbeat = 0.0
+    with ThreadPoolExecutor(max_workers=slots, thread_name_prefix=f"worker{index}") as executor:
+        while not stopping.is_set():
+            running = {future for future in running if not future.done()}
+            if time.monotonic() - last_heartbeat >= HEARTBEAT_INTERVAL:
+                shared_scheduler.heartbeat(worker_id)
+                last_heartbeat = time.monotonic()
+            task = shared_scheduler.claim(worker_id, max_concurrency) if len(running) < slots else None
+            if task is None:
+                stopping.wait(shared_scheduler.poll_interval)
+                continue
+            logger.info(f"Worker {index} claimed {task['type']} {task['linkedin_id']} ({task['id']})")
+            running.add(executor.submit(run_scrape_task, task))
+        logger.info(f"Browser worker {index} stopping, waiting for {len(running)} scrapes")
+        # Keep heartbeating so the running tasks are not handed to another worker
+        while any(not future.done() for future in running):
+            shared_scheduler.heartbeat(worker_id)
+            time.sleep(1)
+    driver_pool.close()
+    browser_engine.close()
+    stop_logging()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", default=settings.WORKER_PROCESSES, help='worker processes, or "auto"')
+    args = parser.parse_args()
+    settings.WORKER_PROCESSES = str(args.processes).lower()
+
+    setup_logging()
+    processes = worker_processes()
+    max_concurrency = global_concurrency(processes)
+    logger.info(
+        f"Starting {processes} browser workers x {settings.SCRAPER_MAX_WORKERS} browsers, "
+        f"global concurrency {max_concurrency}, scheduler {settings.SCHEDULER_DB_PATH}"
+    )
+
+    context = multiprocessing.get_context("spawn")
+    workers = {}
+
+    def spawn(index):
+        process = context.Process(target=worker_main, args=(index, processes, max_concurrency), name=f"worker-{index}")
+        process.start()
+        workers[index] = process
+
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+    signal.signal(signal.SIGINT, lambda *_: stopping.set())
+    for index in range(processes):
+        spawn(index)
+    while not stopping.wait(5):
+        shared_scheduler.purge()
+        for index, process in list(workers.items()):
+            if not process.is_alive():
+                logger.error(f"Browser worker {index} exited with {process.exitcode}, restarting it")
+                spawn(index)
+
+    for process in workers.values():
+        process.terminate()
+    for process in workers.values():
+        process.join()
+    stop_logging()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())